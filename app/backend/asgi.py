@@ -0,0 +1,339 @@
+"""
+ASGI entry point for the async serving mode
+
+Read-only endpoints that spend their time waiting on Cosmos DB and Azure Search are served
+natively on the event loop with azure.cosmos.aio and the aio Search client, so one process can
+hold hundreds of them in flight. Every other route falls through to the Flask app in run.py,
+which asgiref runs on a thread pool.
+
+Usage (from app/backend):
+    uvicorn asgi:app --host 0.0.0.0 --port 5001
+"""
+import asyncio
+import logging
+import re
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.http import parse_accept_header
+
+from run import app as flask_app
+from db.config import DB_NAME
+from db.cosmos_client import get_async_cosmos_client, get_async_database
+from db.repositories.aio.job_repository import JobRepository
+from db.repositories.aio.participant_repository import ParticipantRepository
+from db.repositories.aio.session_repository import SessionRepository
+from db.repositories.aio.job_match_repository import JobMatchRepository
+from db.diagnostics import begin_request, current_request_stats, end_request
+from extensions.admission import Admission, AdmissionRejected, AsyncAdmissionBackend, retry_after_seconds
+from extensions.compression import compress, get_compression_settings, negotiate_encoding
+from routes.job_matches import build_job_suggestions, suggested_job_ids
+from services.job_matches.catalogue import get_job_catalogue
+from services.job_matches.main import arun as arun_job_matching_service, get_async_search_client
+from services.singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+class AsyncBackend:
+    """Async clients and repositories, opened on lifespan startup and closed on shutdown"""
+
+    def __init__(self):
+        self.cosmos_client = None
+        self.search_client = None
+        self.jobs = None
+        self.participants = None
+        self.sessions = None
+        self.job_matches = None
+
+    async def open(self):
+        self.cosmos_client = get_async_cosmos_client()
+        database = await get_async_database(self.cosmos_client, DB_NAME)
+        self.jobs, self.participants, self.sessions, self.job_matches = await asyncio.gather(
+            JobRepository.create(database),
+            ParticipantRepository.create(database),
+            SessionRepository.create(database),
+            JobMatchRepository.create(database)
+        )
+        try:
+            self.search_client = get_async_search_client()
+        except ValueError as e:
+            # Job suggestions are unavailable, everything else still works
+            logger.warning(f"Azure Search is not configured: {e}")
+
+    async def close(self):
+        if self.search_client:
+            await self.search_client.close()
+        if self.cosmos_client:
+            await self.cosmos_client.close()
+
+backend = AsyncBackend()
+
+# The ADMISSION_LIMITS that init_admission applies to Flask routes, enforced per process for
+# the natively served ones
+admission = Admission.from_environment(AsyncAdmissionBackend())
+
+# Handlers return (status, body); body is serialised with the Flask app's JSON provider
+
+async def get_jobs(query):
+    """Get all jobs with optional filtering"""
+    return 200, await backend.jobs.get_all_jobs(
+        status=query.get('status'),
+        employment_type=query.get('employmentType'),
+        industry=query.get('industry'),
+        location=query.get('location')
+    )
+
+async def search_jobs(query):
+    """Search jobs by various criteria"""
+    skills = query.get('skills')
+    return 200, await backend.jobs.search_jobs(
+        query=query.get('query'),
+        skills=skills.split(',') if skills else None,
+        location=query.get('location'),
+        employment_type=query.get('employmentType')
+    )
+
+async def get_job(query, job_id):
+    """Get a specific job by ID"""
+    job = await backend.jobs.get_job(job_id)
+    if not job:
+        return 404, {"error": "Job not found"}
+    return 200, job
+
+async def get_participants(query):
+    """Get all participants with optional filtering"""
+    return 200, await backend.participants.get_all_participants(
+        status=query.get('status'),
+        disability_type=query.get('disabilityType'),
+        skill_type=query.get('skillType'),
+        coach_id=query.get('coachId')
+    )
+
+async def get_participant(query, participant_id):
+    """Get a specific participant by ID"""
+    participant = await backend.participants.get_participant(participant_id)
+    if not participant:
+        return 404, {"error": "Participant not found"}
+    return 200, participant
+
+async def get_participant_sessions(query, participant_id):
+    """Get all sessions for a specific participant"""
+    participant, sessions = await asyncio.gather(
+        backend.participants.get_participant(participant_id),
+        backend.participants.get_participant_sessions(participant_id)
+    )
+    if not participant:
+        return 404, {"error": "Participant not found"}
+    return 200, sessions
+
+async def get_participant_job_matches(query, participant_id):
+    """Get job matches for a specific participant"""
+    participant, job_matches = await asyncio.gather(
+        backend.participants.get_participant(participant_id),
+        backend.participants.get_participant_job_matches(participant_id, query.get('includeArchived') == 'true')
+    )
+    if not participant:
+        return 404, {"error": "Participant not found"}
+    return 200, job_matches
+
+async def get_sessions(query):
+    """Get all sessions with optional filtering"""
+    return 200, await backend.sessions.get_all_sessions(
+        coach_id=query.get('coachId'),
+        participant_id=query.get('participantId'),
+        status=query.get('status'),
+        session_type=query.get('type')
+    )
+
+async def get_session(query, session_id):
+    """Get a specific session by ID"""
+    session = await backend.sessions.get_session(session_id, query.get('participantId'))
+    if not session:
+        return 404, {"error": "Session not found"}
+    return 200, session
+
+async def get_session_observations(query, session_id):
+    """Get a page of a session's observations, oldest first"""
+    try:
+        limit = min(max(int(query.get('limit', 20)), 1), 100)
+        after = int(query.get('after', 0))
+    except ValueError:
+        return 400, {"error": "limit and after must be integers"}
+    page = await backend.sessions.get_observations(session_id, limit, after, query.get('participantId'))
+    if not page:
+        return 404, {"error": "Session not found"}
+    return 200, page
+
+async def get_job_matches(query):
+    """Get all job matches with optional filtering"""
+    include_archived = query.get('includeArchived') == 'true'
+    if query.get('participantId'):
+        return 200, await backend.job_matches.get_job_matches_for_participant(query['participantId'], include_archived)
+    if query.get('jobId'):
+        return 200, await backend.job_matches.get_job_matches_for_job(query['jobId'], include_archived)
+    if query.get('status'):
+        return 200, await backend.job_matches.get_job_matches_by_status(query['status'], include_archived)
+    return 200, await backend.job_matches.get_all_job_matches(include_archived=include_archived)
+
+async def get_job_match(query, match_id):
+    """Get a specific job match by ID"""
+    match = await backend.job_matches.get_job_match(match_id, query.get('includeArchived') == 'true')
+    if not match:
+        return 404, {"error": "Job match not found"}
+    return 200, match
+
+async def get_job_match_history(query, match_id):
+    """Get a page of a job match's status history, newest first"""
+    try:
+        limit = min(max(int(query.get('limit', 20)), 1), 100)
+        before = int(query['before']) if query.get('before') else None
+    except ValueError:
+        return 400, {"error": "limit and before must be integers"}
+    history = await backend.job_matches.get_status_history(match_id, limit, before, query.get('includeArchived') == 'true')
+    if not history:
+        return 404, {"error": "Job match not found"}
+    return 200, history
+
+async def get_job_suggestions(query, participant_id):
+    """Get job suggestions for a participant"""
+    try:
+        limit = int(query.get('limit', 10))
+    except ValueError:
+        limit = 10
+
+    if backend.search_client is None:
+        return 503, {"error": "Job matching service is not configured"}
+
+    async with admission.admitted_async("job_matches.get_job_suggestions"):
+        participant = await backend.job_matches._get_participant(participant_id)
+        if not participant:
+            return 404, {"error": "Participant not found"}
+
+        matching_results = await arun_job_matching_service(participant, backend.search_client)
+
+        # Take the jobs from the worker's catalogue (built off the event loop on first use), and
+        # look up the ones created since concurrently
+        catalogue = await asyncio.to_thread(get_job_catalogue)
+        job_ids = suggested_job_ids(matching_results)
+        complete_jobs = {job_id: catalogue.get(job_id) for job_id in job_ids}
+        missing = [job_id for job_id, job in complete_jobs.items() if job is None]
+        jobs = await asyncio.gather(*(backend.job_matches._get_job(job_id) for job_id in missing))
+        complete_jobs.update(zip(missing, jobs))
+
+        return 200, build_job_suggestions(participant, matching_results, complete_jobs, limit)
+
+# Routes served natively; anything else, and every non-GET method, goes to Flask
+ROUTES = [
+    (re.compile(pattern), handler) for pattern, handler in (
+        (r'/api/jobs', get_jobs),
+        (r'/api/jobs/search', search_jobs),
+        (r'/api/jobs/([^/]+)', get_job),
+        (r'/api/participants', get_participants),
+        (r'/api/participants/([^/]+)', get_participant),
+        (r'/api/participants/([^/]+)/sessions', get_participant_sessions),
+        (r'/api/participants/([^/]+)/job-matches', get_participant_job_matches),
+        (r'/api/sessions', get_sessions),
+        (r'/api/sessions/([^/]+)', get_session),
+        (r'/api/sessions/([^/]+)/observations', get_session_observations),
+        (r'/api/job-matches', get_job_matches),
+        (r'/api/job-matches/suggestions/([^/]+)', get_job_suggestions),
+        (r'/api/job-matches/([^/]+)', get_job_match),
+        (r'/api/job-matches/([^/]+)/history', get_job_match_history),
+    )
+]
+
+def match_route(method, path):
+    if method != 'GET':
+        return None, ()
+    for pattern, handler in ROUTES:
+        match = pattern.fullmatch(path)
+        if match:
+            return handler, match.groups()
+    return None, ()
+
+def cors_headers(scope):
+    """Mirror the Flask-CORS configuration in run.py: any origin, with credentials"""
+    origin = dict(scope['headers']).get(b'origin')
+    if not origin:
+        return []
+    return [
+        (b'access-control-allow-origin', origin),
+        (b'access-control-allow-credentials', b'true'),
+        (b'vary', b'Origin'),
+    ]
+
+COMPRESSION_SETTINGS = get_compression_settings()
+
+async def send_json(scope, send, status, body, extra_headers=()):
+    # Same bytes jsonify would produce, whichever JSON provider the Flask app uses
+    payload = flask_app.json.response(body).get_data()
+    headers = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding'), *extra_headers]
+
+    # Same negotiation as extensions.compression applies to the Flask routes
+    min_bytes, zstd_level, gzip_level = COMPRESSION_SETTINGS
+    encoding = negotiate_encoding(parse_accept_header(dict(scope['headers']).get(b'accept-encoding', b'').decode()))
+    if encoding and len(payload) >= min_bytes:
+        payload = compress(payload, encoding, zstd_level, gzip_level)
+        headers.append((b'content-encoding', encoding.encode()))
+
+    stats = current_request_stats()
+    if stats is not None and stats.operations:
+        headers.append((b'server-timing', stats.server_timing().encode()))
+        headers.append((b'x-cosmos-request-charge', f"{stats.charge:.2f}".encode()))
+
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': headers + [(b'content-length', str(len(payload)).encode())] + cors_headers(scope),
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await backend.open()
+            except Exception as e:
+                logger.error(f"Async backend failed to start: {e}")
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await backend.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+wsgi_fallback = WsgiToAsgi(flask_app)
+
+# Identical GETs in flight at the same time share one handler call
+flight = AsyncSingleFlight()
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    handler, args = match_route(scope.get('method'), scope.get('path', '').rstrip('/') or '/')
+    if scope['type'] != 'http' or handler is None:
+        await wsgi_fallback(scope, receive, send)
+        return
+
+    # Repeated parameters keep the first value, like request.args.get
+    query = {key: values[0] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+    # Each ASGI request runs in its own task, so the Cosmos totals stay per request
+    token = begin_request()
+    extra_headers = []
+    try:
+        key = (scope['path'], tuple(sorted(query.items())))
+        status, body = await flight.do(key, lambda: handler(query, *args))
+    except AdmissionRejected as e:
+        status, body = 429, {"error": "Too many concurrent requests for this endpoint, retry later"}
+        extra_headers.append((b'retry-after', retry_after_seconds(e.limit).encode()))
+    except Exception as e:
+        logger.error(f"Internal Server Error (500): {e}")
+        status, body = 500, {"error": "Internal server error"}
+    try:
+        await send_json(scope, send, status, body, extra_headers)
+    finally:
+        end_request(token)
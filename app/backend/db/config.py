@@ -1,10 +1,53 @@
 # Database configuration settings
 
+def indexing_policy(excluded_paths=(), composite_indexes=(), included_paths=('/*',)):
+    """
+    Build a consistent indexing policy
+
+    Everything under included_paths is indexed except excluded_paths. Exclude large fields that no
+    query filters or sorts on: each indexed term costs write RU on every create and replace.
+    Composite indexes are lists of (path, 'ascending' | 'descending') and serve ORDER BY on more than
+    one property, or an equality filter followed by ORDER BY.
+    """
+    return {
+        'indexingMode': 'consistent',
+        'automatic': True,
+        'includedPaths': [{'path': path} for path in included_paths],
+        'excludedPaths': [{'path': path} for path in excluded_paths],
+        'compositeIndexes': [
+            [{'path': path, 'order': order} for path, order in composite]
+            for composite in composite_indexes
+        ],
+    }
+
+# Sessions are filtered by coachId, participantId, status and type; the free text and the AI output are only read
+# (observations only remain inline on sessions written before session_observations existed)
+SESSION_INDEXING_POLICY = indexing_policy(
+    excluded_paths=(
+        '/notes/?',
+        '/progressNotes/?',
+        '/observations/*',
+        '/aiSuggestions/*',
+        '/topics/*',
+        '/goals/*',
+    ),
+)
+
 # Container definitions
 CONTAINERS = {
     'participants': {
         'name': 'participants',
-        'partition_key': '/id'
+        'partition_key': '/id',
+        # Filtered by currentStatus, disabilityType, coachId and skills
+        'indexing_policy': indexing_policy(
+            excluded_paths=(
+                '/workHistory/*',
+                '/goals/*',
+                '/jobMatches/*',
+                '/jobMatchSummary/*',
+                '/accommodationsNeeded/*',
+            ),
+        ),
     },
     # 'coaches': {
     #     'name': 'coaches',
@@ -12,15 +55,97 @@ CONTAINERS = {
     # },
     'sessions': {
         'name': 'sessions',
-        'partition_key': '/id'
+        'partition_key': '/id',
+        'indexing_policy': SESSION_INDEXING_POLICY,
+    },
+    # Target of the sessions partition key migration (see SESSIONS_MIGRATION_PHASE)
+    'sessions_by_participant': {
+        'name': 'sessions_by_participant',
+        'partition_key': '/participantId',
+        'indexing_policy': SESSION_INDEXING_POLICY,
+    },
+    # Session observations, one item each; read a session at a time, in seq order
+    'session_observations': {
+        'name': 'session_observations',
+        'partition_key': '/sessionId',
+        'indexing_policy': indexing_policy(excluded_paths=('/text/?', '/analysis/*')),
     },
     'jobs': {
-        'name': 'jobs', 
-        'partition_key': '/id'
+        'name': 'jobs',
+        'partition_key': '/id',
+        # description stays indexed: the job search filters on it with CONTAINS
+        'indexing_policy': indexing_policy(
+            excluded_paths=(
+                '/availableAccommodations/*',
+                '/accessibilityFeatures/*',
+                '/supportiveEnvironment/*',
+                '/schedule/*',
+                '/address/?',
+            ),
+            composite_indexes=(
+                # Latest active jobs: WHERE c.status = 'active' ORDER BY c.postedDate DESC
+                (('/status', 'ascending'), ('/postedDate', 'descending')),
+            ),
+        ),
     },
     'job_matches': {
         'name': 'job_matches',
-        'partition_key': '/participantId'
+        'partition_key': '/participantId',
+        # Items expire only when given a ttl: archived matches, once copied to job_matches_archive
+        'default_ttl': -1,
+        # Filtered by participantId, jobId and status; the history and the snapshots are only read
+        'indexing_policy': indexing_policy(
+            excluded_paths=(
+                '/statusHistory/*',
+                '/compatibilityElements/*',
+                '/jobReference/*',
+                '/participantReference/*',
+                '/coachNotes/?',
+                '/recommendedActions/*',
+            ),
+            composite_indexes=(
+                # A participant's matches: WHERE c.participantId = @participantId ORDER BY c.updatedAt DESC
+                (('/participantId', 'ascending'), ('/updatedAt', 'descending')),
+            ),
+        ),
+    },
+    # Matches closed for longer than JOB_MATCH_ARCHIVE_AFTER_DAYS, moved out of job_matches;
+    # read only when a route is asked to includeArchived
+    'job_matches_archive': {
+        'name': 'job_matches_archive',
+        'partition_key': '/participantId',
+        'indexing_policy': indexing_policy(
+            excluded_paths=(
+                '/statusHistory/*',
+                '/compatibilityElements/*',
+                '/jobReference/*',
+                '/participantReference/*',
+                '/participantAttributesUsed/*',
+                '/coachNotes/?',
+                '/recommendedActions/*',
+            ),
+            composite_indexes=(
+                (('/participantId', 'ascending'), ('/updatedAt', 'descending')),
+            ),
+        ),
+    },
+    # Status history entries moved off their job match; partitioned like job_matches
+    'job_match_history': {
+        'name': 'job_match_history',
+        'partition_key': '/participantId',
+        'indexing_policy': indexing_policy(
+            excluded_paths=('/notes/?',),
+            composite_indexes=(
+                # A match's history, newest first: WHERE c.matchId = @matchId AND c.seq < @before ORDER BY c.seq DESC
+                (('/matchId', 'ascending'), ('/seq', 'descending')),
+            ),
+        ),
+    },
+    # Change-feed processor checkpoints; only ever point-read by id, so nothing is indexed
+    'leases': {
+        'name': 'leases',
+        'partition_key': '/id',
+        'indexing_policy': indexing_policy(excluded_paths=('/*',), included_paths=()),
     },
     # 'documents': {
     #     'name': 'documents',
@@ -29,4 +154,18 @@ CONTAINERS = {
 }
 
 # Database name
-DB_NAME = 'ms-challenge'
\ No newline at end of file
+DB_NAME = 'ms-challenge'
+
+def get_indexing_policy(container_name):
+    """Declared indexing policy of a container by its name, or None to keep the Cosmos DB default"""
+    for config in CONTAINERS.values():
+        if config['name'] == container_name:
+            return config.get('indexing_policy')
+    return None
+
+def get_default_ttl(container_name):
+    """Declared default TTL of a container by its name, or None to keep the container's own"""
+    for config in CONTAINERS.values():
+        if config['name'] == container_name:
+            return config.get('default_ttl')
+    return None
@@ -1,13 +1,20 @@
+import logging
 import os
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
 from azure.cosmos import CosmosClient, PartitionKey
+from .config import get_default_ttl, get_indexing_policy
+from .diagnostics import AsyncInstrumentedContainer, InstrumentedContainer
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
 load_dotenv()
 
-def get_cosmos_client():
+def get_cosmos_settings():
     """
-    Initialize and return an Azure Cosmos DB client
+    Get the Azure Cosmos DB endpoint and key from the environment
     """
     # os.environ will now include values from .env file
     cosmos_endpoint = os.environ.get("COSMOS_ENDPOINT")
@@ -16,20 +23,152 @@ def get_cosmos_client():
     if not cosmos_endpoint or not cosmos_key:
         raise ValueError("Azure Cosmos DB connection details not found in environment variables")
     
-    return CosmosClient(url=cosmos_endpoint, credential=cosmos_key)
+    return cosmos_endpoint, cosmos_key
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_cosmos_client():
+    """
+    Return the Azure Cosmos DB client shared by every repository in this process
+
+    The client is created on first use, so importing the app does not need Cosmos DB settings
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                cosmos_endpoint, cosmos_key = get_cosmos_settings()
+                _client = CosmosClient(url=cosmos_endpoint, credential=cosmos_key)
+    return _client
+
+def get_async_cosmos_client():
+    """
+    Initialize and return an asyncio Azure Cosmos DB client
+
+    The client must be closed with `await client.close()` when the event loop shuts down
+    """
+    # Imported here so the sync app does not load aiohttp at start-up
+    from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+    cosmos_endpoint, cosmos_key = get_cosmos_settings()
+    return AsyncCosmosClient(url=cosmos_endpoint, credential=cosmos_key)
 
+@lru_cache(maxsize=None)
 def get_database(client, database_name="ms-challenge"):
     """
-    Get or create a database
+    Get or create a database; cached so repositories sharing a client reuse the same proxy
     """
     return client.create_database_if_not_exists(id=database_name)
 
+def normalize_indexing_policy(policy):
+    """
+    Comparable form of an indexing policy
+
+    Cosmos DB adds the _etag exclusion and default index orders to every policy it returns, so
+    those are left out of the comparison.
+    """
+    return {
+        'indexingMode': policy.get('indexingMode', 'consistent').lower(),
+        'includedPaths': sorted(path['path'] for path in policy.get('includedPaths', [])),
+        'excludedPaths': sorted(
+            path['path'] for path in policy.get('excludedPaths', []) if path['path'] != '/"_etag"/?'
+        ),
+        'compositeIndexes': sorted(
+            tuple((index['path'], index.get('order', 'ascending').lower()) for index in composite)
+            for composite in policy.get('compositeIndexes', [])
+        ),
+    }
+
+def reconcile_indexing_enabled():
+    """
+    Whether get_container brings existing containers in line with db/config.py (COSMOS_RECONCILE_INDEXING)
+
+    Off by default: a policy change rebuilds the index, so it is rolled out deliberately with
+    python -m tools.indexing_report --apply rather than by whichever worker starts first.
+    """
+    return os.environ.get("COSMOS_RECONCILE_INDEXING", "false").lower() == "true"
+
+def _policy_replacement(properties, policy, default_ttl=None):
+    """Keyword arguments for replace_container when the declared policy or default TTL differs, otherwise None"""
+    current_ttl = properties.get('defaultTtl')
+    ttl = current_ttl if default_ttl is None else default_ttl
+    if (normalize_indexing_policy(properties.get('indexingPolicy', {})) == normalize_indexing_policy(policy)
+            and ttl == current_ttl):
+        return None
+    # replace_container resets every setting it is not given
+    return {'indexing_policy': policy, 'default_ttl': ttl}
+
+def _container_options(container_name):
+    """create_container_if_not_exists arguments declared for a container in db/config.py"""
+    options = {}
+    policy = get_indexing_policy(container_name)
+    if policy is not None:
+        options['indexing_policy'] = policy
+    default_ttl = get_default_ttl(container_name)
+    if default_ttl is not None:
+        options['default_ttl'] = default_ttl
+    return options
+
+def reconcile_indexing_policy(database, container, partition_key_path, policy, default_ttl=None):
+    """
+    Replace the indexing policy of an existing container when it, or the declared default TTL,
+    differs from the declared one
+
+    Cosmos DB rebuilds the index in the background; queries keep working meanwhile, with
+    composite indexes taking effect once the transformation completes.
+
+    Returns:
+        True if the policy was replaced
+    """
+    replacement = _policy_replacement(container.read(), policy, default_ttl)
+    if replacement is None:
+        return False
+    logger.info(f"Updating the indexing policy or default TTL of container {container.id}")
+    database.replace_container(container, partition_key=PartitionKey(path=partition_key_path), **replacement)
+    return True
+
+@lru_cache(maxsize=None)
 def get_container(database, container_name, partition_key_path):
     """
-    Get or create a container in the database
+    Get or create a container in the database, instrumented for request-charge accounting
+
+    Cached per database and container, so the create-if-not-exists round trip happens once.
+    New containers get the indexing policy and default TTL declared in db/config.py; existing
+    ones are reconciled with them only when COSMOS_RECONCILE_INDEXING is enabled.
+    """
+    options = _container_options(container_name)
+    policy = options.get('indexing_policy')
+    container = database.create_container_if_not_exists(
+        id=container_name,
+        partition_key=PartitionKey(path=partition_key_path),
+        offer_throughput=400,
+        **options
+    )
+    if policy is not None and reconcile_indexing_enabled():
+        reconcile_indexing_policy(database, container, partition_key_path, policy, options.get('default_ttl'))
+    return InstrumentedContainer(container)
+
+async def get_async_database(client, database_name="ms-challenge"):
+    """
+    Get or create a database with an asyncio client
+    """
+    return await client.create_database_if_not_exists(id=database_name)
+
+async def get_async_container(database, container_name, partition_key_path):
+    """
+    Get or create a container with an asyncio client, instrumented for request-charge accounting
     """
-    return database.create_container_if_not_exists(
+    options = _container_options(container_name)
+    policy = options.get('indexing_policy')
+    container = await database.create_container_if_not_exists(
         id=container_name,
         partition_key=PartitionKey(path=partition_key_path),
-        offer_throughput=400
-    )
\ No newline at end of file
+        offer_throughput=400,
+        **options
+    )
+    if policy is not None and reconcile_indexing_enabled():
+        replacement = _policy_replacement(await container.read(), policy, options.get('default_ttl'))
+        if replacement is not None:
+            logger.info(f"Updating the indexing policy or default TTL of container {container.id}")
+            await database.replace_container(container, partition_key=PartitionKey(path=partition_key_path), **replacement)
+    return AsyncInstrumentedContainer(container)
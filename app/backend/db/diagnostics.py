@@ -0,0 +1,213 @@
+"""
+Request-charge and query diagnostics for Cosmos DB calls
+
+get_container and get_async_container wrap every container in an instrumented proxy. Each query
+or point operation records its request charge (x-ms-request-charge), item and page counts and
+duration. The figures are exported as Prometheus metrics, rolled up into the totals of the
+HTTP request being served, and logged with the query text when slow or expensive.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from azure.core.async_paging import AsyncItemPaged
+from azure.core.paging import ItemPaged
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Queries slower or more expensive than this are logged with their text and parameters
+SLOW_OPERATION_MS = float(os.environ.get("COSMOS_SLOW_OPERATION_MS", 500))
+EXPENSIVE_OPERATION_RU = float(os.environ.get("COSMOS_EXPENSIVE_OPERATION_RU", 50))
+
+POINT_OPERATIONS = frozenset({
+    "read_item", "create_item", "replace_item", "upsert_item", "delete_item", "patch_item"
+})
+
+COSMOS_CHARGE = Counter(
+    "cosmos_request_charge",
+    "Request units consumed",
+    ["container", "operation"],
+)
+COSMOS_OPERATIONS = Counter(
+    "cosmos_operations",
+    "Cosmos DB operations issued",
+    ["container", "operation"],
+)
+COSMOS_PAGES = Counter(
+    "cosmos_query_pages",
+    "Result pages fetched by queries",
+    ["container"],
+)
+COSMOS_DURATION = Histogram(
+    "cosmos_operation_duration_seconds",
+    "Time spent in a Cosmos DB operation, including every page of a query",
+    ["container", "operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+class RequestCosmosStats:
+    """Cosmos DB totals for one HTTP request"""
+    __slots__ = ("charge", "operations", "items", "pages", "duration")
+
+    def __init__(self):
+        self.charge = 0.0
+        self.operations = 0
+        self.items = 0
+        self.pages = 0
+        self.duration = 0.0
+
+    def server_timing(self) -> str:
+        return f'cosmos;dur={self.duration * 1000:.1f};desc="{self.charge:.2f} RU, {self.operations} ops, {self.items} items"'
+
+_request_stats: ContextVar[Optional[RequestCosmosStats]] = ContextVar("cosmos_request_stats", default=None)
+
+def begin_request():
+    """Start collecting totals for the current request; returns a token for end_request"""
+    return _request_stats.set(RequestCosmosStats())
+
+def current_request_stats() -> Optional[RequestCosmosStats]:
+    return _request_stats.get()
+
+def end_request(token) -> None:
+    _request_stats.reset(token)
+
+class OperationStats:
+    """Response hook collecting the headers of every response of one operation"""
+    __slots__ = ("charge", "items", "pages", "status")
+
+    def __init__(self):
+        self.charge = 0.0
+        self.items = 0
+        self.pages = 0
+        self.status = "ok"
+
+    def __call__(self, headers, result) -> None:
+        # query_items also calls the hook once with the pager itself, before any page is fetched
+        if isinstance(result, (ItemPaged, AsyncItemPaged)):
+            return
+        self.charge += float(headers.get("x-ms-request-charge", 0) or 0)
+        if "x-ms-item-count" in headers:
+            self.pages += 1
+            self.items += int(headers["x-ms-item-count"])
+        elif result is not None:
+            self.items += 1
+
+def _record(container: str, operation: str, stats: OperationStats, duration: float,
+            query: Optional[str] = None, parameters: Optional[List[Dict[str, Any]]] = None) -> None:
+    COSMOS_CHARGE.labels(container, operation).inc(stats.charge)
+    COSMOS_OPERATIONS.labels(container, operation).inc()
+    COSMOS_DURATION.labels(container, operation).observe(duration)
+    if stats.pages:
+        COSMOS_PAGES.labels(container).inc(stats.pages)
+
+    request_stats = _request_stats.get()
+    if request_stats is not None:
+        request_stats.charge += stats.charge
+        request_stats.operations += 1
+        request_stats.items += stats.items
+        request_stats.pages += stats.pages
+        request_stats.duration += duration
+
+    if duration * 1000 >= SLOW_OPERATION_MS or stats.charge >= EXPENSIVE_OPERATION_RU:
+        logger.warning(
+            f"Slow or expensive Cosmos {operation} on {container} ({stats.status}): "
+            f"{stats.charge:.2f} RU, {duration * 1000:.0f} ms, {stats.items} items, {stats.pages} pages; "
+            f"query={query!r} parameters={parameters!r}"
+        )
+
+def _hooked(kwargs: Dict[str, Any], stats: OperationStats) -> Dict[str, Any]:
+    # Keep any hook the caller passed
+    caller_hook = kwargs.get("response_hook")
+    if caller_hook is None:
+        kwargs["response_hook"] = stats
+    else:
+        def hook(headers, result):
+            stats(headers, result)
+            caller_hook(headers, result)
+        kwargs["response_hook"] = hook
+    return kwargs
+
+class InstrumentedContainer:
+    """Proxy for a ContainerProxy that accounts for the cost of queries and point operations"""
+
+    def __init__(self, container):
+        self._container = container
+
+    def __getattr__(self, name):
+        attribute = getattr(self._container, name)
+        if name not in POINT_OPERATIONS:
+            return attribute
+
+        def operation(*args, **kwargs):
+            stats = OperationStats()
+            start = time.perf_counter()
+            try:
+                return attribute(*args, **_hooked(kwargs, stats))
+            except Exception as e:
+                # Failed operations (a 404 read, a 409 create) are still charged
+                stats(getattr(e, "headers", None) or {}, None)
+                stats.status = type(e).__name__
+                raise
+            finally:
+                _record(self._container.id, name, stats, time.perf_counter() - start)
+        return operation
+
+    def query_items(self, query, parameters=None, **kwargs):
+        stats = OperationStats()
+        start = time.perf_counter()
+        items = self._container.query_items(query=query, parameters=parameters, **_hooked(kwargs, stats))
+
+        # Pages are fetched lazily, so the operation ends when the caller stops iterating
+        def iterate():
+            try:
+                yield from items
+            except Exception as e:
+                stats.status = type(e).__name__
+                raise
+            finally:
+                _record(self._container.id, "query_items", stats, time.perf_counter() - start, query, parameters)
+        return iterate()
+
+class AsyncInstrumentedContainer:
+    """asyncio counterpart of InstrumentedContainer for azure.cosmos.aio containers"""
+
+    def __init__(self, container):
+        self._container = container
+
+    def __getattr__(self, name):
+        attribute = getattr(self._container, name)
+        if name not in POINT_OPERATIONS:
+            return attribute
+
+        async def operation(*args, **kwargs):
+            stats = OperationStats()
+            start = time.perf_counter()
+            try:
+                return await attribute(*args, **_hooked(kwargs, stats))
+            except Exception as e:
+                # Failed operations (a 404 read, a 409 create) are still charged
+                stats(getattr(e, "headers", None) or {}, None)
+                stats.status = type(e).__name__
+                raise
+            finally:
+                _record(self._container.id, name, stats, time.perf_counter() - start)
+        return operation
+
+    def query_items(self, query, parameters=None, **kwargs):
+        stats = OperationStats()
+        start = time.perf_counter()
+        items = self._container.query_items(query=query, parameters=parameters, **_hooked(kwargs, stats))
+
+        async def iterate():
+            try:
+                async for item in items:
+                    yield item
+            except Exception as e:
+                stats.status = type(e).__name__
+                raise
+            finally:
+                _record(self._container.id, "query_items", stats, time.perf_counter() - start, query, parameters)
+        return iterate()
@@ -1,5 +1,5 @@
 from typing import List, Dict, Optional, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 # Job match status types
@@ -28,6 +28,7 @@ class CompatibilityElement(BaseModel):
 
 # Status history entry
 class StatusHistoryEntry(BaseModel):
+    seq: Optional[int] = None  # 1-based position in the match's full history
     status: str
     date: str
     notes: Optional[str] = None
@@ -67,7 +68,9 @@ class JobMatch(BaseModel):
     
     # Status tracking
     status: str
+    # Only the newest JOB_MATCH_INLINE_HISTORY entries; older ones are in job_match_history
     statusHistory: List[StatusHistoryEntry] = []
+    statusSeq: int = 0  # seq of the newest entry
     
     # Coach input
     coachNotes: Optional[str] = None
@@ -81,8 +84,13 @@ class JobMatch(BaseModel):
     nextAppointment: Optional[str] = None
     applicationDeadline: Optional[str] = None
     
-    class Config:
-        schema_extra = {
+    # Set once the match is moved to job_matches_archive
+    archivedAt: Optional[str] = None
+    
+    model_config = ConfigDict(
+        # Stored documents carry more than the model declares; responses pass it through
+        extra='allow',
+        json_schema_extra={
             "example": {
                 "id": "match-123",
                 "participantId": "participant-458",
@@ -130,4 +138,34 @@ class JobMatch(BaseModel):
                     "currentStatus": "job-search"
                 }
             }
-        }
+        },
+    )
+
+# Body of POST /job-matches; fields beyond these are stored as sent
+class JobMatchCreateRequest(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    participantId: str
+    jobId: str
+    status: Optional[str] = None
+    source: Optional[str] = None
+    matchScore: Optional[int] = None
+    compatibilityElements: Optional[List[CompatibilityElement]] = None
+    coachNotes: Optional[str] = None
+
+# Body of PUT /job-matches/<id>
+class JobMatchUpdate(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    status: Optional[str] = None
+    matchScore: Optional[int] = None
+    compatibilityElements: Optional[List[CompatibilityElement]] = None
+    coachNotes: Optional[str] = None
+    recommendedActions: Optional[List[str]] = None
+    nextAppointment: Optional[str] = None
+    applicationDeadline: Optional[str] = None
+
+# Body of PUT /job-matches/<id>/status
+class JobMatchStatusUpdate(BaseModel):
+    status: str
+    notes: Optional[str] = None
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 # Define models for participant data
@@ -16,13 +16,26 @@ class Goal(BaseModel):
     targetDate: str
     status: str
 
+# A row of GET /participants/<id>/job-matches, projected from job_matches
 class JobMatch(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    id: str
     jobId: str
     title: str
     employer: str
     description: str
     matchScore: float
     status: str
+    updatedAt: Optional[str] = None
+    archivedAt: Optional[str] = None  # only on matches listed with includeArchived
+
+# Maintained from the participant's job_matches; the matches themselves are only in job_matches
+class JobMatchSummary(BaseModel):
+    total: int = 0
+    byStatus: Dict[str, int] = {}
+    topMatches: List[Dict[str, Any]] = []
+    updatedAt: Optional[str] = None
 
 class Skills(BaseModel):
     technical: List[str]
@@ -48,17 +61,33 @@ class ParticipantBase(BaseModel):
     preferredLocations: List[str] = []
     preferredIndustries: List[str] = []
     goals: List[Goal] = []
-    jobMatches: List[JobMatch] = []
+    jobMatchSummary: Optional[JobMatchSummary] = None
 
 class ParticipantCreate(ParticipantBase):
     pass
 
+# Body of POST /participants; fields beyond these are stored as sent
+class ParticipantCreateRequest(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    firstName: str
+    lastName: str
+    email: str
+    disabilityType: str
+    currentStatus: str
+    fullName: Optional[str] = None
+
 class Participant(ParticipantBase):
+    # Stored documents carry more than the model declares; responses pass it through
+    model_config = ConfigDict(extra='allow')
+
     id: str
     createdAt: Optional[str] = None
     updatedAt: Optional[str] = None
 
 class ParticipantPreview(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
     id: str
     fullName: str
     email: str
@@ -69,7 +98,10 @@ class ParticipantPreview(BaseModel):
     sessionCount: Optional[int] = 0
     jobMatchCount: Optional[int] = 0
 
+# Body of PUT /participants/<id>
 class ParticipantUpdate(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
     firstName: Optional[str] = None
     lastName: Optional[str] = None
     fullName: Optional[str] = None
@@ -89,4 +121,3 @@ class ParticipantUpdate(BaseModel):
     preferredLocations: Optional[List[str]] = None
     preferredIndustries: Optional[List[str]] = None
     goals: Optional[List[Goal]] = None
-    jobMatches: Optional[List[JobMatch]] = None
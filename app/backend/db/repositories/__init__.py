@@ -0,0 +1,24 @@
+import threading
+
+class LazyRepository:
+    """
+    Builds a repository on first use
+
+    Route modules create their repositories at import; wrapping them in this keeps the Cosmos DB
+    connection out of worker start-up and lets the app boot before Cosmos DB is configured.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
@@ -0,0 +1,6 @@
+# asyncio counterparts of the repositories, backed by azure.cosmos.aio
+from typing import Any, AsyncIterable, Dict, List
+
+async def collect(items: AsyncIterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drain an async query iterator into a list"""
+    return [item async for item in items]
@@ -0,0 +1,193 @@
+import asyncio
+from ...cosmos_client import get_async_container
+from ...config import CONTAINERS
+from ..job_match_repository import (
+    JOB_REFERENCE_QUERY, PARTICIPANT_REFERENCE_QUERY, STATUS_HISTORY_QUERY, PARTICIPANT_MATCHES_QUERY, NOT_ARCHIVED,
+    merge_tiers, build_job_match_summary, summary_patch, apply_job_match_defaults, apply_job_match_update, apply_status_update,
+    trim_status_history, inline_history_page, status_history_page
+)
+from . import collect
+from typing import List, Dict, Any, Optional
+
+class JobMatchRepository:
+    """asyncio counterpart of db.repositories.job_match_repository.JobMatchRepository"""
+
+    def __init__(self, container, jobs_container, participants_container, history_container, archive_container):
+        self.container = container
+        self.jobs_container = jobs_container
+        self.participants_container = participants_container
+        self.history_container = history_container
+        self.archive_container = archive_container
+
+    @classmethod
+    async def create(cls, database) -> "JobMatchRepository":
+        containers = await asyncio.gather(*(
+            get_async_container(database, CONTAINERS[key]['name'], CONTAINERS[key]['partition_key'])
+            for key in ('job_matches', 'jobs', 'participants', 'job_match_history', 'job_matches_archive')
+        ))
+        return cls(*containers)
+
+    async def get_all_job_matches(self, limit: int = 100, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Get all job matches with pagination"""
+        query = f"SELECT TOP {limit} * FROM c WHERE {NOT_ARCHIVED} ORDER BY c.updatedAt DESC"
+        if not include_archived:
+            return await collect(self.container.query_items(query=query))
+        matches, archived = await asyncio.gather(
+            collect(self.container.query_items(query=query)),
+            collect(self.archive_container.query_items(query=f"SELECT TOP {limit} * FROM c ORDER BY c.updatedAt DESC"))
+        )
+        return merge_tiers(matches, archived, limit)
+
+    async def get_job_match(self, match_id: str, include_archived: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a specific job match by ID; archived matches only when include_archived is set"""
+        try:
+            query = f"SELECT * FROM c WHERE c.id = @id AND {NOT_ARCHIVED}"
+            params = [{"name": "@id", "value": match_id}]
+            items = await collect(self.container.query_items(query=query, parameters=params))
+            if not items and include_archived:
+                items = await collect(self.archive_container.query_items(query="SELECT * FROM c WHERE c.id = @id", parameters=params))
+            return items[0] if items else None
+        except Exception as e:
+            print(f"Error retrieving job match: {e}")
+            return None
+
+    async def create_job_match(self, match_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new job match"""
+        apply_job_match_defaults(match_data)
+
+        # Job and participant snapshots are independent reads
+        job, participant = await asyncio.gather(
+            self._get_reference(self.jobs_container, JOB_REFERENCE_QUERY, match_data.get('jobId'))
+            if 'jobReference' not in match_data else _none(),
+            self._get_reference(self.participants_container, PARTICIPANT_REFERENCE_QUERY, match_data.get('participantId'))
+            if 'participantReference' not in match_data else _none()
+        )
+        if job:
+            match_data['jobReference'] = job
+        if participant:
+            match_data['participantReference'] = participant
+
+        created = await self.container.create_item(body=match_data)
+        await self._refresh_summary(created['participantId'])
+        return created
+
+    async def update_job_match(self, match_id: str, match_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update job match data"""
+        try:
+            existing = await self.get_job_match(match_id)
+            if not existing:
+                return None
+            apply_job_match_update(existing, match_data)
+            updated = await self.container.replace_item(item=match_id, body=existing)
+            await self._refresh_summary(updated['participantId'])
+            return updated
+        except Exception as e:
+            print(f"Error updating job match: {e}")
+            return None
+
+    async def update_job_match_status(self, match_id: str, status: str, notes: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Update job match status and add to status history"""
+        try:
+            existing = await self.get_job_match(match_id)
+            if not existing:
+                return None
+            apply_status_update(existing, status, notes)
+            # History items share the match's partition, so these writes land on one partition
+            await asyncio.gather(*(self.history_container.upsert_item(body=item) for item in trim_status_history(existing)))
+            updated = await self.container.replace_item(item=match_id, body=existing)
+            await self._refresh_summary(updated['participantId'])
+            return updated
+        except Exception as e:
+            print(f"Error updating job match status: {e}")
+            return None
+
+    async def _refresh_summary(self, participant_id: str) -> None:
+        """Bring the participant's jobMatchSummary up to date after a write to its matches"""
+        try:
+            matches = await collect(self.container.query_items(
+                query=PARTICIPANT_MATCHES_QUERY,
+                parameters=[{"name": "@participantId", "value": participant_id}],
+                partition_key=participant_id
+            ))
+            await self.participants_container.patch_item(
+                item=participant_id,
+                partition_key=participant_id,
+                patch_operations=summary_patch(build_job_match_summary(matches))
+            )
+        except Exception as e:
+            print(f"Error refreshing job match summary: {e}")
+
+    async def get_status_history(self, match_id: str, limit: int = 20, before: Optional[int] = None,
+                                 include_archived: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a newest-first page of a match's status history, with entries older than `before`"""
+        match = await self.get_job_match(match_id, include_archived)
+        if not match:
+            return None
+        entries, overflow_before, overflow_limit = inline_history_page(match, before, limit)
+        overflow = []
+        if overflow_limit:
+            overflow = await collect(self.history_container.query_items(
+                query=STATUS_HISTORY_QUERY,
+                parameters=[
+                    {"name": "@limit", "value": overflow_limit},
+                    {"name": "@matchId", "value": match_id},
+                    {"name": "@before", "value": overflow_before}
+                ],
+                partition_key=match['participantId']
+            ))
+        return status_history_page(match, entries, overflow)
+
+    async def get_job_matches_for_participant(self, participant_id: str, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Get all job matches for a specific participant"""
+        query = "SELECT * FROM c WHERE c.participantId = @participantId"
+        params = [{"name": "@participantId", "value": participant_id}]
+        # Matches are partitioned by participant, so scope the query to one partition
+        return await self._query_tiers(query, params, include_archived, "ORDER BY c.updatedAt DESC", participant_id)
+
+    async def get_job_matches_for_job(self, job_id: str, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Get all job matches for a specific job"""
+        query = "SELECT * FROM c WHERE c.jobId = @jobId"
+        params = [{"name": "@jobId", "value": job_id}]
+        return await self._query_tiers(query, params, include_archived)
+
+    async def get_job_matches_by_status(self, status: str, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Get all job matches with a specific status"""
+        query = "SELECT * FROM c WHERE c.status = @status"
+        params = [{"name": "@status", "value": status}]
+        return await self._query_tiers(query, params, include_archived)
+
+    async def _query_tiers(self, query: str, params: List[Dict[str, Any]], include_archived: bool,
+                           order_by: str = "", partition_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Run a WHERE query on job_matches, and concurrently on job_matches_archive when asked"""
+        options = {'partition_key': partition_key} if partition_key is not None else {}
+        hot = collect(self.container.query_items(query=f"{query} AND {NOT_ARCHIVED} {order_by}".rstrip(), parameters=params, **options))
+        if not include_archived:
+            return await hot
+        matches, archived = await asyncio.gather(
+            hot,
+            collect(self.archive_container.query_items(query=f"{query} {order_by}".rstrip(), parameters=params, **options))
+        )
+        return merge_tiers(matches, archived)
+
+    async def _get_reference(self, container, query: str, item_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get simplified reference data for a job or participant"""
+        if not item_id:
+            return None
+        try:
+            params = [{"name": "@id", "value": item_id}]
+            items = await collect(container.query_items(query=query, parameters=params, partition_key=item_id))
+            return items[0] if items else None
+        except Exception as e:
+            print(f"Error retrieving reference: {e}")
+            return None
+
+    async def _get_participant(self, participant_id: str) -> Optional[Dict[str, Any]]:
+        """Get a participant by ID"""
+        return await self._get_reference(self.participants_container, "SELECT * FROM c WHERE c.id = @id", participant_id)
+
+    async def _get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID"""
+        return await self._get_reference(self.jobs_container, "SELECT * FROM c WHERE c.id = @id", job_id)
+
+async def _none():
+    return None
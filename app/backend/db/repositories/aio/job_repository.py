@@ -0,0 +1,77 @@
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from ...cosmos_client import get_async_container
+from ...config import CONTAINERS
+from ..job_repository import build_jobs_query, build_search_jobs_query, apply_job_defaults, apply_job_update
+from . import collect
+from typing import List, Dict, Any, Optional
+
+class JobRepository:
+    """asyncio counterpart of db.repositories.job_repository.JobRepository"""
+
+    def __init__(self, container):
+        self.container = container
+
+    @classmethod
+    async def create(cls, database) -> "JobRepository":
+        container_config = CONTAINERS['jobs']
+        container = await get_async_container(
+            database,
+            container_config['name'],
+            container_config['partition_key']
+        )
+        return cls(container)
+
+    async def get_all_jobs(self,
+                           status: Optional[str] = None,
+                           employment_type: Optional[str] = None,
+                           industry: Optional[str] = None,
+                           location: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get all jobs with optional filtering"""
+        query, params = build_jobs_query(status, employment_type, industry, location)
+        return await collect(self.container.query_items(query=query, parameters=params))
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific job by ID"""
+        try:
+            # Jobs are partitioned by id, so this is a single point read
+            return await self.container.read_item(item=job_id, partition_key=job_id)
+        except CosmosResourceNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error retrieving job: {e}")
+            return None
+
+    async def create_job(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new job"""
+        apply_job_defaults(job_data)
+        return await self.container.create_item(body=job_data)
+
+    async def update_job(self, job_id: str, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an existing job"""
+        try:
+            existing = await self.get_job(job_id)
+            if not existing:
+                return None
+            apply_job_update(existing, job_data)
+            return await self.container.replace_item(item=job_id, body=existing)
+        except Exception as e:
+            print(f"Error updating job: {e}")
+            return None
+
+    async def delete_job(self, job_id: str) -> bool:
+        """Delete a job"""
+        try:
+            await self.container.delete_item(item=job_id, partition_key=job_id)
+            return True
+        except Exception as e:
+            print(f"Error deleting job: {e}")
+            return False
+
+    async def search_jobs(self,
+                          query: Optional[str] = None,
+                          skills: Optional[List[str]] = None,
+                          location: Optional[str] = None,
+                          employment_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search jobs by various criteria"""
+        query, params = build_search_jobs_query(query, skills, location, employment_type)
+        return await collect(self.container.query_items(query=query, parameters=params))
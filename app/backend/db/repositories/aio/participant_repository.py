@@ -0,0 +1,134 @@
+import asyncio
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from ...cosmos_client import get_async_container
+from ...config import CONTAINERS
+from ..participant_repository import (
+    map_to_preview, build_participants_query, apply_participant_defaults, apply_participant_update
+)
+from ..session_repository import get_migration_phase, reads_partitioned, sessions_read_config
+from ..job_match_repository import ARCHIVED_PARTICIPANT_MATCHES_QUERY, PARTICIPANT_MATCHES_QUERY, merge_tiers
+from . import collect
+from typing import List, Dict, Any, Optional
+
+class ParticipantRepository:
+    """asyncio counterpart of db.repositories.participant_repository.ParticipantRepository"""
+
+    def __init__(self, container, sessions_container, sessions_phase, job_matches_container, job_matches_archive_container):
+        self.container = container
+        self.sessions_container = sessions_container
+        self.sessions_phase = sessions_phase
+        self.job_matches_container = job_matches_container
+        self.job_matches_archive_container = job_matches_archive_container
+
+    @classmethod
+    async def create(cls, database) -> "ParticipantRepository":
+        container_config = CONTAINERS['participants']
+        sessions_phase = get_migration_phase()
+        sessions_config = sessions_read_config(sessions_phase)
+        matches_config = CONTAINERS['job_matches']
+        archive_config = CONTAINERS['job_matches_archive']
+        container, sessions_container, job_matches_container, job_matches_archive_container = await asyncio.gather(
+            get_async_container(database, container_config['name'], container_config['partition_key']),
+            get_async_container(database, sessions_config['name'], sessions_config['partition_key']),
+            get_async_container(database, matches_config['name'], matches_config['partition_key']),
+            get_async_container(database, archive_config['name'], archive_config['partition_key'])
+        )
+        return cls(container, sessions_container, sessions_phase, job_matches_container, job_matches_archive_container)
+
+    def _session_query_options(self, participant_id: str) -> Dict[str, Any]:
+        # One partition once sessions are read from the container partitioned by participantId
+        return {'partition_key': participant_id} if reads_partitioned(self.sessions_phase) else {}
+
+    async def get_all_participants(self,
+                                   status: Optional[str] = None,
+                                   disability_type: Optional[str] = None,
+                                   skill_type: Optional[str] = None,
+                                   coach_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get all participants with optional filtering"""
+        query, params = build_participants_query(status, disability_type, skill_type, coach_id)
+        items = await collect(self.container.query_items(query=query, parameters=params))
+
+        previews = [map_to_preview(item) for item in items]
+
+        # Session counts are independent queries, so run them concurrently
+        counts = await asyncio.gather(*(self.get_session_count(preview["id"]) for preview in previews))
+        for preview, count in zip(previews, counts):
+            preview["sessionCount"] = count
+
+        return previews
+
+    async def get_session_count(self, participant_id: str) -> int:
+        """Get the count of sessions for a participant"""
+        query = "SELECT VALUE COUNT(1) FROM c WHERE c.participantId = @participantId"
+        params = [{"name": "@participantId", "value": participant_id}]
+
+        try:
+            results = await collect(self.sessions_container.query_items(
+                query=query, parameters=params, **self._session_query_options(participant_id)
+            ))
+            return results[0] if results else 0
+        except Exception:
+            # If there's an error, just return 0
+            return 0
+
+    async def get_participant(self, participant_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific participant by ID"""
+        try:
+            # Participants are partitioned by id, so this is a single point read
+            return await self.container.read_item(item=participant_id, partition_key=participant_id)
+        except CosmosResourceNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error retrieving participant: {e}")
+            return None
+
+    async def create_participant(self, participant_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new participant"""
+        apply_participant_defaults(participant_data)
+        return await self.container.create_item(body=participant_data)
+
+    async def update_participant(self, participant_id: str, participant_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an existing participant"""
+        try:
+            existing = await self.get_participant(participant_id)
+            if not existing:
+                return None
+            apply_participant_update(existing, participant_data)
+            return await self.container.replace_item(item=participant_id, body=existing)
+        except Exception as e:
+            print(f"Error updating participant: {e}")
+            return None
+
+    async def delete_participant(self, participant_id: str) -> bool:
+        """Delete a participant"""
+        try:
+            await self.container.delete_item(item=participant_id, partition_key=participant_id)
+            return True
+        except Exception as e:
+            print(f"Error deleting participant: {e}")
+            return False
+
+    async def get_participant_sessions(self, participant_id: str) -> List[Dict[str, Any]]:
+        """Get all sessions for a specific participant"""
+        query = "SELECT * FROM c WHERE c.participantId = @participantId"
+        params = [{"name": "@participantId", "value": participant_id}]
+        return await collect(self.sessions_container.query_items(
+            query=query, parameters=params, **self._session_query_options(participant_id)
+        ))
+
+    async def get_participant_job_matches(self, participant_id: str, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Get job matches for a specific participant, newest first"""
+        params = [{"name": "@participantId", "value": participant_id}]
+        hot = collect(self.job_matches_container.query_items(
+            query=PARTICIPANT_MATCHES_QUERY,
+            parameters=params,
+            partition_key=participant_id
+        ))
+        if not include_archived:
+            return await hot
+        matches, archived = await asyncio.gather(hot, collect(self.job_matches_archive_container.query_items(
+            query=ARCHIVED_PARTICIPANT_MATCHES_QUERY,
+            parameters=params,
+            partition_key=participant_id
+        )))
+        return merge_tiers(matches, archived)
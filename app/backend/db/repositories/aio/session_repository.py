@@ -0,0 +1,248 @@
+import asyncio
+from azure.cosmos.exceptions import CosmosResourceExistsError, CosmosResourceNotFoundError
+from ...cosmos_client import get_async_container
+from ...config import CONTAINERS
+from ..session_repository import (
+    OBSERVATION_APPEND_ATTEMPTS, OBSERVATIONS_PAGE_QUERY, PENDING_OBSERVATIONS_QUERY, LAST_OBSERVATION_SEQ_QUERY,
+    build_sessions_query, apply_session_defaults, new_observation, observation_id, set_observation_summary, take_inline_observations,
+    analyze_pending_observations, observations_page,
+    get_migration_phase, reads_partitioned, writes_legacy, writes_partitioned, without_system_properties
+)
+from . import collect
+
+class SessionRepository:
+    """asyncio counterpart of db.repositories.session_repository.SessionRepository"""
+
+    def __init__(self, container, observations_container, partitioned_container=None, phase='legacy'):
+        self.container = container
+        self.observations_container = observations_container
+        self.partitioned_container = partitioned_container
+        self.phase = phase
+
+    @classmethod
+    async def create(cls, database):
+        phase = get_migration_phase()
+        container_config = CONTAINERS['sessions']
+        container = await get_async_container(
+            database,
+            container_config['name'],
+            container_config['partition_key']
+        )
+        partitioned_container = None
+        if writes_partitioned(phase):
+            partitioned_config = CONTAINERS['sessions_by_participant']
+            partitioned_container = await get_async_container(
+                database,
+                partitioned_config['name'],
+                partitioned_config['partition_key']
+            )
+        observations_config = CONTAINERS['session_observations']
+        observations_container = await get_async_container(
+            database,
+            observations_config['name'],
+            observations_config['partition_key']
+        )
+        return cls(container, observations_container, partitioned_container, phase)
+
+    async def _dual_write(self, legacy_write, partitioned_write):
+        """Run the writes of the current phase and return the result from the container reads use"""
+        writes = []
+        if writes_legacy(self.phase):
+            writes.append(legacy_write)
+        if writes_partitioned(self.phase):
+            writes.append(partitioned_write)
+        if reads_partitioned(self.phase):
+            writes.reverse()
+
+        result = await writes[0]()
+        for write in writes[1:]:
+            try:
+                await write()
+            except Exception as e:
+                # The copy is repaired by `python -m tools.migrate_sessions verify --repair`
+                print(f"Error mirroring session write: {e}")
+        return result
+
+    async def _read_partitioned(self, session_id, participant_id=None):
+        if participant_id:
+            try:
+                return await self.partitioned_container.read_item(item=session_id, partition_key=participant_id)
+            except CosmosResourceNotFoundError:
+                return None
+        items = await collect(self.partitioned_container.query_items(
+            query="SELECT * FROM c WHERE c.id = @id",
+            parameters=[{"name": "@id", "value": session_id}]
+        ))
+        return items[0] if items else None
+
+    async def _store_inline_observations(self, session):
+        """Move a session's inline observations into observation items; the caller saves the session"""
+        await asyncio.gather(*(
+            self.observations_container.upsert_item(body=observation)
+            for observation in take_inline_observations(session)
+        ))
+        # Sessions moved before notes were dropped still carry them, possibly edited since
+        notes = session.pop("notes", None)
+        if notes and notes != await self._observation_text(session["id"], 1):
+            observation = await self._append_observation(session, notes)
+            set_observation_summary(session, observation, max(session["observationCount"], observation["seq"]))
+
+    async def _observation_text(self, session_id, seq):
+        try:
+            observation = await self.observations_container.read_item(item=observation_id(session_id, seq), partition_key=session_id)
+            return observation["text"]
+        except CosmosResourceNotFoundError:
+            return None
+
+    async def _append_observation(self, session, text):
+        """Create the next observation item of a session and return it"""
+        seq = session["observationCount"] + 1
+        for _ in range(OBSERVATION_APPEND_ATTEMPTS):
+            try:
+                return await self.observations_container.create_item(body=new_observation(session["id"], seq, text))
+            except CosmosResourceExistsError:
+                last = await collect(self.observations_container.query_items(
+                    query=LAST_OBSERVATION_SEQ_QUERY,
+                    parameters=[{"name": "@sessionId", "value": session["id"]}],
+                    partition_key=session["id"]
+                ))
+                seq = (last[0] if last and last[0] else seq) + 1
+        raise RuntimeError(f"Could not append an observation to session {session['id']}")
+
+    async def get_all_sessions(self, coach_id=None, participant_id=None, status=None, session_type=None):
+        """Get all sessions with optional filtering"""
+        query, parameters = build_sessions_query(coach_id, participant_id, status, session_type)
+        if reads_partitioned(self.phase):
+            # A participant's sessions share one partition
+            options = {'partition_key': participant_id} if participant_id else {}
+            return await collect(self.partitioned_container.query_items(query=query, parameters=parameters, **options))
+        return await collect(self.container.query_items(query=query, parameters=parameters))
+
+    async def get_session(self, session_id, participant_id=None):
+        """Get a specific session by ID; participant_id, when known, makes it a point read after the migration"""
+        try:
+            if reads_partitioned(self.phase):
+                session = await self._read_partitioned(session_id, participant_id)
+                if session is not None or self.phase == 'migrated':
+                    return session
+            return await self.container.read_item(item=session_id, partition_key=session_id)
+        except CosmosResourceNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error retrieving session: {e}")
+            return None
+
+    async def create_session(self, session_data):
+        """Create a new session"""
+        await asyncio.gather(*(
+            self.observations_container.create_item(body=observation)
+            for observation in apply_session_defaults(session_data)
+        ))
+        return await self._dual_write(
+            lambda: self.container.create_item(body=dict(session_data)),
+            lambda: self.partitioned_container.upsert_item(body=dict(session_data))
+        )
+
+    async def update_session(self, session_id, session_data):
+        """Update an existing session"""
+        try:
+            session_data['id'] = session_id
+            return await self._dual_write(
+                lambda: self.container.replace_item(item=session_id, body=session_data),
+                lambda: self.partitioned_container.upsert_item(body=without_system_properties(session_data))
+            )
+        except Exception as e:
+            print(f"Error updating session: {e}")
+            return None
+
+    async def delete_session(self, session_id, participant_id=None):
+        """Delete a session"""
+        try:
+            async def delete_partitioned():
+                session = await self._read_partitioned(session_id) if not participant_id else {'participantId': participant_id}
+                if session is None:
+                    return None
+                return await self.partitioned_container.delete_item(item=session_id, partition_key=session['participantId'])
+
+            result = await self._dual_write(
+                lambda: self.container.delete_item(item=session_id, partition_key=session_id),
+                delete_partitioned
+            )
+            observations = await collect(self.observations_container.query_items(
+                query="SELECT c.id FROM c",
+                partition_key=session_id
+            ))
+            await asyncio.gather(*(
+                self.observations_container.delete_item(item=observation['id'], partition_key=session_id)
+                for observation in observations
+            ))
+            return result
+        except Exception as e:
+            print(f"Error deleting session: {e}")
+            return None
+
+    async def get_observations(self, session_id, limit=20, after=0, participant_id=None):
+        """Get a page of a session's observations, oldest first, with seq greater than `after`"""
+        try:
+            session = await self.get_session(session_id, participant_id)
+            if not session:
+                return None
+            if "observationCount" not in session:
+                inline = [observation for observation in take_inline_observations(session) if observation["seq"] > after]
+                return observations_page(session, inline[:limit], limit)
+            observations = await collect(self.observations_container.query_items(
+                query=OBSERVATIONS_PAGE_QUERY,
+                parameters=[
+                    {"name": "@limit", "value": limit},
+                    {"name": "@sessionId", "value": session_id},
+                    {"name": "@after", "value": after}
+                ],
+                partition_key=session_id
+            ))
+            return observations_page(session, observations, limit)
+        except Exception as e:
+            print(f"Error retrieving observations: {e}")
+            return None
+
+    async def add_observations(self, session_id, observations_data, participant_id=None):
+        """Add observations to a session"""
+        try:
+            session = await self.get_session(session_id, participant_id)
+            if not session:
+                return None
+            if "notes" in observations_data:
+                await self._store_inline_observations(session)
+                observation = await self._append_observation(session, observations_data["notes"])
+                set_observation_summary(session, observation, max(session["observationCount"], observation["seq"]))
+            return await self.update_session(session_id, session)
+        except Exception as e:
+            print(f"Error adding observations: {e}")
+            return None
+
+    async def generate_analysis(self, session_id, ai_service=None, participant_id=None):
+        """Generate AI analysis for a session, analyzing only observations added since the last run"""
+        try:
+            session = await self.get_session(session_id, participant_id)
+            if not session:
+                return None
+            await self._store_inline_observations(session)
+            if not session["observationCount"]:
+                return {"error": "Session has no notes to analyze"}
+
+            pending = await collect(self.observations_container.query_items(
+                query=PENDING_OBSERVATIONS_QUERY,
+                parameters=[{"name": "@sessionId", "value": session_id}],
+                partition_key=session_id
+            ))
+            # AI services are synchronous clients, so keep them off the event loop
+            ai_analysis = await asyncio.to_thread(analyze_pending_observations, session, pending, ai_service)
+            await asyncio.gather(*(
+                self.observations_container.replace_item(item=observation["id"], body=observation)
+                for observation in pending
+            ))
+            session["aiSuggestions"] = ai_analysis
+            await self.update_session(session_id, session)
+            return ai_analysis
+        except Exception as e:
+            print(f"Error generating analysis: {e}")
+            return None
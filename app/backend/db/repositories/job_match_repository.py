@@ -1,10 +1,286 @@
 from ..cosmos_client import get_cosmos_client, get_database, get_container
 from ..config import CONTAINERS, DB_NAME
+import os
 import uuid
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError, CosmosResourceNotFoundError
 from db.models.job_match import JobMatchStatus, MatchSource
 
+# Fields snapshotted from a job and a participant into each match that references them
+JOB_REFERENCE_FIELDS = (
+    'title',
+    'employer',
+    'companyName',
+    'location',
+    'employmentType',
+    'shortDescription',
+    'salary',
+    'postedDate',
+)
+PARTICIPANT_REFERENCE_FIELDS = (
+    'fullName',
+    'email',
+    'disabilityType',
+    'currentStatus',
+)
+
+def _reference_query(fields) -> str:
+    return "SELECT " + ", ".join(f"c.{field}" for field in fields) + " FROM c WHERE c.id = @id"
+
+# Projections used to snapshot job and participant data into a match
+JOB_REFERENCE_QUERY = _reference_query(JOB_REFERENCE_FIELDS)
+PARTICIPANT_REFERENCE_QUERY = _reference_query(PARTICIPANT_REFERENCE_FIELDS)
+
+def make_reference(document: Dict[str, Any], fields) -> Dict[str, Any]:
+    """Project a job or participant document like the reference queries do; missing fields are left out"""
+    return {field: document[field] for field in fields if field in document}
+
+# Fields that identify a match and its partition; updates never change them
+IMMUTABLE_MATCH_FIELDS = ('id', 'participantId', 'jobId')
+
+# Maintained by status updates only
+STATUS_HISTORY_FIELDS = ('statusHistory', 'statusSeq')
+
+# Status entries kept on the match itself; older ones move to the job_match_history container
+INLINE_STATUS_HISTORY = int(os.environ.get("JOB_MATCH_INLINE_HISTORY", 10))
+
+# Overflowed status entries of one match, newest first; single-partition, as history shares the match's partition key
+STATUS_HISTORY_QUERY = (
+    "SELECT TOP @limit * FROM c WHERE c.matchId = @matchId AND c.seq < @before ORDER BY c.seq DESC"
+)
+
+# Properties of a history item that are not part of the status entry
+HISTORY_ITEM_FIELDS = ('id', 'matchId', 'participantId')
+
+# Statuses a match ends in; they are counted in a participant's summary but never listed as a top match
+TERMINAL_MATCH_STATUSES = (JobMatchStatus.ACCEPTED, JobMatchStatus.REJECTED, JobMatchStatus.NOT_SUITABLE)
+
+# Open matches listed in a participant's jobMatchSummary
+SUMMARY_TOP_MATCHES = 3
+
+# Matches in a terminal status for this many days are moved to job_matches_archive
+ARCHIVE_AFTER_DAYS = int(os.environ.get("JOB_MATCH_ARCHIVE_AFTER_DAYS", 90))
+
+# Seconds an archived match stays in job_matches before Cosmos DB deletes it; TTL deletes
+# run on leftover throughput rather than the archival job's
+ARCHIVED_HOT_TTL_SECONDS = int(os.environ.get("JOB_MATCH_ARCHIVED_HOT_TTL_SECONDS", 3600))
+
+# archivedAt is set on a match once it is copied to job_matches_archive; reads of job_matches skip it from then on
+NOT_ARCHIVED = "NOT IS_DEFINED(c.archivedAt)"
+
+# Matches due for the archive; cross-partition, run by `python -m tools.archive_job_matches`
+ARCHIVE_CANDIDATES_QUERY = (
+    f"SELECT * FROM c WHERE ARRAY_CONTAINS(@statuses, c.status) AND c.updatedAt < @before AND {NOT_ARCHIVED}"
+)
+
+_PARTICIPANT_MATCHES_SELECT = (
+    "SELECT c.id, c.jobId, c.jobReference.title AS title, c.jobReference.employer AS employer, "
+    "c.jobReference.shortDescription AS description, c.matchScore, c.status, c.updatedAt, c.archivedAt "
+    "FROM c WHERE c.participantId = @participantId"
+)
+
+# A participant's matches in the shape the participant job-matches route returns; partition-local
+PARTICIPANT_MATCHES_QUERY = f"{_PARTICIPANT_MATCHES_SELECT} AND {NOT_ARCHIVED} ORDER BY c.updatedAt DESC"
+
+# The same, from job_matches_archive
+ARCHIVED_PARTICIPANT_MATCHES_QUERY = f"{_PARTICIPANT_MATCHES_SELECT} ORDER BY c.updatedAt DESC"
+
+def build_job_match_summary(matches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Counts per status and the best open matches of a participant, from PARTICIPANT_MATCHES_QUERY rows"""
+    open_matches = sorted(
+        (match for match in matches if match.get('status') not in TERMINAL_MATCH_STATUSES),
+        key=lambda match: match.get('matchScore') or 0,
+        reverse=True
+    )
+    return {
+        'total': len(matches),
+        'byStatus': dict(Counter(match.get('status') for match in matches)),
+        'topMatches': [
+            {key: match[key] for key in ('id', 'jobId', 'title', 'employer', 'matchScore', 'status') if key in match}
+            for match in open_matches[:SUMMARY_TOP_MATCHES]
+        ],
+        'updatedAt': datetime.utcnow().isoformat()
+    }
+
+def summary_patch(summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # updatedAt of the participant is left alone: its matches changed, not the participant
+    return [{"op": "set", "path": "/jobMatchSummary", "value": summary}]
+
+def refresh_job_match_summary(matches_container, participants_container, participant_id: str) -> Dict[str, Any]:
+    """Recompute a participant's jobMatchSummary from its job_matches partition and patch it onto the participant"""
+    matches = list(matches_container.query_items(
+        query=PARTICIPANT_MATCHES_QUERY,
+        parameters=[{"name": "@participantId", "value": participant_id}],
+        partition_key=participant_id
+    ))
+    summary = build_job_match_summary(matches)
+    participants_container.patch_item(
+        item=participant_id,
+        partition_key=participant_id,
+        patch_operations=summary_patch(summary)
+    )
+    return summary
+
+def merge_tiers(hot: List[Dict[str, Any]], archived: List[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Matches from job_matches and job_matches_archive, newest first; one caught mid-archival is listed once, from job_matches"""
+    hot_ids = {match['id'] for match in hot}
+    merged = hot + [match for match in archived if match['id'] not in hot_ids]
+    merged.sort(key=lambda match: match.get('updatedAt') or '', reverse=True)
+    return merged[:limit] if limit is not None else merged
+
+def archive_cutoff(days: int = ARCHIVE_AFTER_DAYS) -> str:
+    """updatedAt before which a closed match is archived"""
+    return (datetime.utcnow() - timedelta(days=days)).isoformat()
+
+def archive_document(match: Dict[str, Any], archived_at: str) -> Dict[str, Any]:
+    """The job_matches_archive item of a match: the match without system properties or TTL"""
+    document = {key: value for key, value in match.items() if not key.startswith('_') and key != 'ttl'}
+    document['archivedAt'] = archived_at
+    return document
+
+def archive_job_match(container, archive_container, match: Dict[str, Any], hot_ttl: int = ARCHIVED_HOT_TTL_SECONDS) -> bool:
+    """
+    Copy a match to job_matches_archive, then mark it archived in job_matches and give it a TTL
+
+    The match is marked only if it is unchanged since it was read. Otherwise the archive copy is
+    deleted again and False returned; a later run archives the match if it is still closed.
+    """
+    archived_at = datetime.utcnow().isoformat()
+    archive_container.upsert_item(body=archive_document(match, archived_at))
+    try:
+        container.patch_item(
+            item=match['id'],
+            partition_key=match['participantId'],
+            patch_operations=[
+                {"op": "set", "path": "/archivedAt", "value": archived_at},
+                {"op": "set", "path": "/ttl", "value": hot_ttl}
+            ],
+            etag=match['_etag'],
+            match_condition=MatchConditions.IfNotModified
+        )
+    except (CosmosAccessConditionFailedError, CosmosResourceNotFoundError):
+        archive_container.delete_item(item=match['id'], partition_key=match['participantId'])
+        return False
+    return True
+
+def apply_job_match_defaults(match_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Set the ID, timestamps, source, status history and compatibility defaults of a new match"""
+    # Generate ID if not provided
+    if 'id' not in match_data:
+        match_data['id'] = str(uuid.uuid4())
+    
+    # Set timestamps
+    now = datetime.utcnow().isoformat()
+    match_data['createdAt'] = now
+    match_data['updatedAt'] = now
+    
+    # Set default source if not specified
+    if 'source' not in match_data:
+        match_data['source'] = MatchSource.COACH_ASSIGNED
+        
+    # Initialize status history if needed
+    if 'statusHistory' not in match_data:
+        match_data['statusHistory'] = [{
+            'status': match_data.get('status', JobMatchStatus.CONSIDERING),
+            'date': now,
+            'notes': 'Initial match created'
+        }]
+    number_status_history(match_data)
+    
+    # Initialize empty compatibility elements array if not provided
+    if 'compatibilityElements' not in match_data:
+        match_data['compatibilityElements'] = []
+    return match_data
+
+def apply_job_match_update(existing: Dict[str, Any], match_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge non-None, mutable fields into an existing match and touch updatedAt"""
+    for key, value in match_data.items():
+        if value is not None and key not in IMMUTABLE_MATCH_FIELDS and key not in STATUS_HISTORY_FIELDS:
+            existing[key] = value
+    
+    # Update timestamp
+    existing['updatedAt'] = datetime.utcnow().isoformat()
+    return existing
+
+def number_status_history(match: Dict[str, Any]) -> Dict[str, Any]:
+    """Number the status entries of a match that predates sequence numbers; statusSeq is the last one used"""
+    if 'statusSeq' not in match:
+        history = match.get('statusHistory', [])
+        for seq, entry in enumerate(history, start=1):
+            entry['seq'] = seq
+        match['statusSeq'] = len(history)
+    return match
+
+def apply_status_update(existing: Dict[str, Any], status: str, notes: Optional[str] = None) -> Dict[str, Any]:
+    """Set a new status on a match and record it in the status history"""
+    now = datetime.utcnow().isoformat()
+    existing['status'] = status
+    existing['updatedAt'] = now
+    number_status_history(existing)
+    existing['statusSeq'] += 1
+    
+    # Add to status history
+    status_entry = {
+        'seq': existing['statusSeq'],
+        'status': status,
+        'date': now
+    }
+    
+    if notes:
+        status_entry['notes'] = notes
+        
+    if 'statusHistory' not in existing:
+        existing['statusHistory'] = []
+        
+    existing['statusHistory'].append(status_entry)
+    return existing
+
+def trim_status_history(match: Dict[str, Any], limit: int = INLINE_STATUS_HISTORY) -> List[Dict[str, Any]]:
+    """Keep the newest `limit` status entries on the match and return the older ones as history items"""
+    history = match.get('statusHistory', [])
+    if len(history) <= limit:
+        return []
+    overflow = history[:len(history) - limit]
+    match['statusHistory'] = history[len(history) - limit:]
+    return [
+        {'id': f"{match['id']}.{entry['seq']:08d}", 'matchId': match['id'], 'participantId': match['participantId'], **entry}
+        for entry in overflow
+    ]
+
+def inline_history_page(match: Dict[str, Any], before: Optional[int], limit: int):
+    """
+    Start a newest-first page of status history from the entries kept on the match
+
+    Returns:
+        (entries, overflow_before, overflow_limit): the inline entries on the page, and the
+        STATUS_HISTORY_QUERY bounds for the rest of it; no query is needed when overflow_limit is 0
+    """
+    number_status_history(match)
+    history = match.get('statusHistory', [])
+    before = before if before is not None else match['statusSeq'] + 1
+    entries = sorted((entry for entry in history if entry['seq'] < before), key=lambda entry: entry['seq'], reverse=True)[:limit]
+    
+    # Inline entries are always newer than the overflowed ones
+    overflow_before = min([before] + [entry['seq'] for entry in history])
+    overflow_limit = limit - len(entries) if overflow_before > 1 else 0
+    return entries, overflow_before, overflow_limit
+
+def status_history_page(match: Dict[str, Any], entries: List[Dict[str, Any]], overflow: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Response body for a page of status history; nextBefore is the cursor for the following page"""
+    page = entries + [
+        {key: value for key, value in item.items() if key not in HISTORY_ITEM_FIELDS and not key.startswith('_')}
+        for item in overflow
+    ]
+    return {
+        'matchId': match['id'],
+        'total': match['statusSeq'],
+        'entries': page,
+        'nextBefore': page[-1]['seq'] if page and page[-1]['seq'] > 1 else None
+    }
+
 class JobMatchRepository:
     def __init__(self):
         client = get_cosmos_client()
@@ -25,26 +301,48 @@ class JobMatchRepository:
             CONTAINERS['participants']['name'],
             CONTAINERS['participants']['partition_key']
         )
+        self.history_container = get_container(
+            database,
+            CONTAINERS['job_match_history']['name'],
+            CONTAINERS['job_match_history']['partition_key']
+        )
+        self.archive_container = get_container(
+            database,
+            CONTAINERS['job_matches_archive']['name'],
+            CONTAINERS['job_matches_archive']['partition_key']
+        )
 
-    def get_all_job_matches(self, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_all_job_matches(self, limit: int = 100, include_archived: bool = False) -> List[Dict[str, Any]]:
         """Get all job matches with pagination"""
-        query = f"SELECT TOP {limit} * FROM c ORDER BY c.updatedAt DESC"
+        query = f"SELECT TOP {limit} * FROM c WHERE {NOT_ARCHIVED} ORDER BY c.updatedAt DESC"
         matches = list(self.container.query_items(
             query=query,
             enable_cross_partition_query=True
         ))
+        if include_archived:
+            archived = list(self.archive_container.query_items(
+                query=f"SELECT TOP {limit} * FROM c ORDER BY c.updatedAt DESC",
+                enable_cross_partition_query=True
+            ))
+            matches = merge_tiers(matches, archived, limit)
         return matches
 
-    def get_job_match(self, match_id: str) -> Optional[Dict[str, Any]]:
-        """Get a specific job match by ID"""
+    def get_job_match(self, match_id: str, include_archived: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a specific job match by ID; archived matches only when include_archived is set"""
         try:
-            query = "SELECT * FROM c WHERE c.id = @id"
+            query = f"SELECT * FROM c WHERE c.id = @id AND {NOT_ARCHIVED}"
             params = [{"name": "@id", "value": match_id}]
             items = list(self.container.query_items(
                 query=query,
                 parameters=params,
                 enable_cross_partition_query=True
             ))
+            if not items and include_archived:
+                items = list(self.archive_container.query_items(
+                    query="SELECT * FROM c WHERE c.id = @id",
+                    parameters=params,
+                    enable_cross_partition_query=True
+                ))
             
             return items[0] if items else None
         except Exception as e:
@@ -53,26 +351,7 @@ class JobMatchRepository:
 
     def create_job_match(self, match_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new job match"""
-        # Generate ID if not provided
-        if 'id' not in match_data:
-            match_data['id'] = str(uuid.uuid4())
-        
-        # Set timestamps
-        now = datetime.utcnow().isoformat()
-        match_data['createdAt'] = now
-        match_data['updatedAt'] = now
-        
-        # Set default source if not specified
-        if 'source' not in match_data:
-            match_data['source'] = MatchSource.COACH_ASSIGNED
-            
-        # Initialize status history if needed
-        if 'statusHistory' not in match_data:
-            match_data['statusHistory'] = [{
-                'status': match_data.get('status', JobMatchStatus.CONSIDERING),
-                'date': now,
-                'notes': 'Initial match created'
-            }]
+        apply_job_match_defaults(match_data)
             
         # Get job and participant reference data
         if 'jobReference' not in match_data and 'jobId' in match_data:
@@ -85,11 +364,9 @@ class JobMatchRepository:
             if participant:
                 match_data['participantReference'] = participant
                 
-        # Initialize empty compatibility elements array if not provided
-        if 'compatibilityElements' not in match_data:
-            match_data['compatibilityElements'] = []
-        
-        return self.container.create_item(body=match_data)
+        created = self.container.create_item(body=match_data)
+        self._refresh_summary(created['participantId'])
+        return created
 
     def update_job_match(self, match_id: str, match_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update job match data"""
@@ -99,19 +376,16 @@ class JobMatchRepository:
             if not existing:
                 return None
                 
-            # Update fields
-            for key, value in match_data.items():
-                if value is not None and key != 'id' and key != 'participantId' and key != 'jobId':
-                    existing[key] = value
-            
-            # Update timestamp
-            existing['updatedAt'] = datetime.utcnow().isoformat()
+            # Update fields and timestamp
+            apply_job_match_update(existing, match_data)
             
             # Save back to database
-            return self.container.replace_item(
+            updated = self.container.replace_item(
                 item=match_id,
                 body=existing
             )
+            self._refresh_summary(updated['participantId'])
+            return updated
         except Exception as e:
             print(f"Error updating job match: {e}")
             return None
@@ -124,89 +398,98 @@ class JobMatchRepository:
             if not existing:
                 return None
                 
-            # Update status
-            now = datetime.utcnow().isoformat()
-            existing['status'] = status
-            existing['updatedAt'] = now
-            
-            # Add to status history
-            status_entry = {
-                'status': status,
-                'date': now
-            }
+            # Update status and add to status history
+            apply_status_update(existing, status, notes)
             
-            if notes:
-                status_entry['notes'] = notes
-                
-            if 'statusHistory' not in existing:
-                existing['statusHistory'] = []
-                
-            existing['statusHistory'].append(status_entry)
+            # Move the oldest entries out first: if the replace then fails, the history route
+            # still sees each entry once, and the next update rewrites the same items
+            for item in trim_status_history(existing):
+                self.history_container.upsert_item(body=item)
             
             # Save back to database
-            return self.container.replace_item(
+            updated = self.container.replace_item(
                 item=match_id,
                 body=existing
             )
+            self._refresh_summary(updated['participantId'])
+            return updated
         except Exception as e:
             print(f"Error updating job match status: {e}")
             return None
 
-    def get_job_matches_for_participant(self, participant_id: str) -> List[Dict[str, Any]]:
+    def _refresh_summary(self, participant_id: str) -> None:
+        """Bring the participant's jobMatchSummary up to date after a write to its matches"""
+        try:
+            refresh_job_match_summary(self.container, self.participants_container, participant_id)
+        except Exception as e:
+            # The match is saved; the next write to the participant's matches, or
+            # `python -m tools.job_match_summaries`, brings the summary up to date
+            print(f"Error refreshing job match summary: {e}")
+
+    def get_status_history(self, match_id: str, limit: int = 20, before: Optional[int] = None,
+                           include_archived: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a newest-first page of a match's status history, with entries older than `before`"""
+        match = self.get_job_match(match_id, include_archived)
+        if not match:
+            return None
+        
+        entries, overflow_before, overflow_limit = inline_history_page(match, before, limit)
+        overflow = []
+        if overflow_limit:
+            overflow = list(self.history_container.query_items(
+                query=STATUS_HISTORY_QUERY,
+                parameters=[
+                    {"name": "@limit", "value": overflow_limit},
+                    {"name": "@matchId", "value": match_id},
+                    {"name": "@before", "value": overflow_before}
+                ],
+                partition_key=match['participantId']
+            ))
+        return status_history_page(match, entries, overflow)
+
+    def get_job_matches_for_participant(self, participant_id: str, include_archived: bool = False) -> List[Dict[str, Any]]:
         """Get all job matches for a specific participant"""
-        query = "SELECT * FROM c WHERE c.participantId = @participantId ORDER BY c.updatedAt DESC"
+        query = "SELECT * FROM c WHERE c.participantId = @participantId"
         params = [{"name": "@participantId", "value": participant_id}]
         
-        matches = list(self.container.query_items(
-            query=query,
-            parameters=params,
-            enable_cross_partition_query=True
-        ))
-        
-        return matches
+        # A participant's matches share one partition, in both containers
+        return self._query_tiers(query, params, include_archived, "ORDER BY c.updatedAt DESC", participant_id)
 
-    def get_job_matches_for_job(self, job_id: str) -> List[Dict[str, Any]]:
+    def get_job_matches_for_job(self, job_id: str, include_archived: bool = False) -> List[Dict[str, Any]]:
         """Get all job matches for a specific job"""
         query = "SELECT * FROM c WHERE c.jobId = @jobId"
         params = [{"name": "@jobId", "value": job_id}]
+        return self._query_tiers(query, params, include_archived)
         
-        matches = list(self.container.query_items(
-            query=query,
-            parameters=params,
-            enable_cross_partition_query=True
-        ))
-        
-        return matches
-        
-    def get_job_matches_by_status(self, status: str) -> List[Dict[str, Any]]:
+    def get_job_matches_by_status(self, status: str, include_archived: bool = False) -> List[Dict[str, Any]]:
         """Get all job matches with a specific status"""
         query = "SELECT * FROM c WHERE c.status = @status"
         params = [{"name": "@status", "value": status}]
-        
+        return self._query_tiers(query, params, include_archived)
+
+    def _query_tiers(self, query: str, params: List[Dict[str, Any]], include_archived: bool,
+                     order_by: str = "", partition_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Run a WHERE query on job_matches, and on job_matches_archive when asked; cross-partition unless given a partition key"""
+        options = {'partition_key': partition_key} if partition_key is not None else {'enable_cross_partition_query': True}
         matches = list(self.container.query_items(
-            query=query,
+            query=f"{query} AND {NOT_ARCHIVED} {order_by}".rstrip(),
             parameters=params,
-            enable_cross_partition_query=True
+            **options
         ))
+        if include_archived:
+            archived = list(self.archive_container.query_items(
+                query=f"{query} {order_by}".rstrip(),
+                parameters=params,
+                **options
+            ))
+            matches = merge_tiers(matches, archived)
         
         return matches
         
     def _get_job_reference(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get simplified reference data for a job"""
         try:
-            query = """
-            SELECT 
-                c.title, 
-                c.employer, 
-                c.companyName, 
-                c.location, 
-                c.employmentType, 
-                c.shortDescription, 
-                c.salary, 
-                c.postedDate 
-            FROM c 
-            WHERE c.id = @id
-            """
+            query = JOB_REFERENCE_QUERY
             params = [{"name": "@id", "value": job_id}]
             items = list(self.jobs_container.query_items(
                 query=query,
@@ -222,15 +505,7 @@ class JobMatchRepository:
     def _get_participant_reference(self, participant_id: str) -> Optional[Dict[str, Any]]:
         """Get simplified reference data for a participant"""
         try:
-            query = """
-            SELECT 
-                c.fullName, 
-                c.email, 
-                c.disabilityType, 
-                c.currentStatus 
-            FROM c 
-            WHERE c.id = @id
-            """
+            query = PARTICIPANT_REFERENCE_QUERY
             params = [{"name": "@id", "value": participant_id}]
             items = list(self.participants_container.query_items(
                 query=query,
@@ -2,7 +2,127 @@ from ..cosmos_client import get_cosmos_client, get_database, get_container
 from ..config import CONTAINERS, DB_NAME
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+def build_jobs_query(status: Optional[str] = None,
+                     employment_type: Optional[str] = None,
+                     industry: Optional[str] = None,
+                     location: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """Build the filtered job listing query and its parameters"""
+    query_parts = ["SELECT * FROM c"]
+    params = []
+    
+    # Build WHERE clause dynamically based on provided filters
+    where_clauses = []
+    param_index = 0
+    
+    if status and status != "all":
+        param_index += 1
+        where_clauses.append(f"c.status = @p{param_index}")
+        params.append({"name": f"@p{param_index}", "value": status})
+        
+    if employment_type and employment_type != "all":
+        param_index += 1
+        where_clauses.append(f"c.employmentType = @p{param_index}")
+        params.append({"name": f"@p{param_index}", "value": employment_type})
+        
+    if industry and industry != "all":
+        param_index += 1
+        where_clauses.append(f"c.industry = @p{param_index}")
+        params.append({"name": f"@p{param_index}", "value": industry})
+    
+    if location and location != "all":
+        param_index += 1
+        # Use CONTAINS for more flexible location matching
+        where_clauses.append(f"CONTAINS(LOWER(c.location), LOWER(@p{param_index}))")
+        params.append({"name": f"@p{param_index}", "value": location})
+    
+    # Combine all where clauses
+    if where_clauses:
+        query_parts.append("WHERE " + " AND ".join(where_clauses))
+    
+    return " ".join(query_parts), params
+
+def build_search_jobs_query(query: Optional[str] = None,
+                            skills: Optional[List[str]] = None,
+                            location: Optional[str] = None,
+                            employment_type: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """Build the job search query and its parameters"""
+    query_parts = ["SELECT * FROM c"]
+    params = []
+    
+    # Build WHERE clause dynamically based on provided search criteria
+    where_clauses = []
+    param_index = 0
+    
+    # Search by text query (title, description, company)
+    if query:
+        param_index += 1
+        where_clauses.append(f"""(
+            CONTAINS(LOWER(c.title), LOWER(@p{param_index})) OR 
+            CONTAINS(LOWER(c.description), LOWER(@p{param_index})) OR 
+            CONTAINS(LOWER(c.shortDescription), LOWER(@p{param_index})) OR
+            CONTAINS(LOWER(c.companyName), LOWER(@p{param_index}))
+        )""")
+        params.append({"name": f"@p{param_index}", "value": query})
+    
+    # Filter by location
+    if location:
+        param_index += 1
+        where_clauses.append(f"CONTAINS(LOWER(c.location), LOWER(@p{param_index}))")
+        params.append({"name": f"@p{param_index}", "value": location})
+    
+    # Filter by employment type
+    if employment_type:
+        param_index += 1
+        where_clauses.append(f"c.employmentType = @p{param_index}")
+        params.append({"name": f"@p{param_index}", "value": employment_type})
+    
+    # Filter by required skills
+    if skills and len(skills) > 0:
+        skill_conditions = []
+        for skill in skills:
+            param_index += 1
+            # Check if skill is in the requiredSkills array
+            skill_conditions.append(f"ARRAY_CONTAINS(c.requiredSkills, @p{param_index})")
+            params.append({"name": f"@p{param_index}", "value": skill})
+        
+        # If we have multiple skills, match any of them
+        where_clauses.append("(" + " OR ".join(skill_conditions) + ")")
+    
+    # Combine all where clauses
+    if where_clauses:
+        query_parts.append("WHERE " + " AND ".join(where_clauses))
+    
+    # Only return active jobs by default
+    if not where_clauses:
+        query_parts.append("WHERE c.status = 'active'")
+    elif all("c.status" not in clause for clause in where_clauses):
+        query_parts[-1] += " AND c.status = 'active'"
+    
+    return " ".join(query_parts), params
+
+def apply_job_defaults(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Set the ID and timestamps of a new job"""
+    if 'id' not in job_data:
+        job_data['id'] = str(uuid.uuid4())
+    
+    if 'postedDate' not in job_data:
+        job_data['postedDate'] = datetime.utcnow().isoformat()
+        
+    job_data['createdAt'] = datetime.utcnow().isoformat()
+    job_data['updatedAt'] = job_data['createdAt']
+    return job_data
+
+def apply_job_update(existing: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge non-None fields into an existing job and touch updatedAt"""
+    for key, value in job_data.items():
+        if value is not None:  # Only update non-None values
+            existing[key] = value
+    
+    # Update timestamp
+    existing['updatedAt'] = datetime.utcnow().isoformat()
+    return existing
 
 class JobRepository:
     def __init__(self):
@@ -31,39 +151,7 @@ class JobRepository:
                     industry: Optional[str] = None,
                     location: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all jobs with optional filtering"""
-        query_parts = ["SELECT * FROM c"]
-        params = []
-        
-        # Build WHERE clause dynamically based on provided filters
-        where_clauses = []
-        param_index = 0
-        
-        if status and status != "all":
-            param_index += 1
-            where_clauses.append(f"c.status = @p{param_index}")
-            params.append({"name": f"@p{param_index}", "value": status})
-            
-        if employment_type and employment_type != "all":
-            param_index += 1
-            where_clauses.append(f"c.employmentType = @p{param_index}")
-            params.append({"name": f"@p{param_index}", "value": employment_type})
-            
-        if industry and industry != "all":
-            param_index += 1
-            where_clauses.append(f"c.industry = @p{param_index}")
-            params.append({"name": f"@p{param_index}", "value": industry})
-        
-        if location and location != "all":
-            param_index += 1
-            # Use CONTAINS for more flexible location matching
-            where_clauses.append(f"CONTAINS(LOWER(c.location), LOWER(@p{param_index}))")
-            params.append({"name": f"@p{param_index}", "value": location})
-        
-        # Combine all where clauses
-        if where_clauses:
-            query_parts.append("WHERE " + " AND ".join(where_clauses))
-        
-        query = " ".join(query_parts)
+        query, params = build_jobs_query(status, employment_type, industry, location)
         
         items = list(self.container.query_items(
             query=query,
@@ -91,15 +179,7 @@ class JobRepository:
 
     def create_job(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new job"""
-        if 'id' not in job_data:
-            job_data['id'] = str(uuid.uuid4())
-        
-        if 'postedDate' not in job_data:
-            job_data['postedDate'] = datetime.utcnow().isoformat()
-            
-        job_data['createdAt'] = datetime.utcnow().isoformat()
-        job_data['updatedAt'] = job_data['createdAt']
-        
+        apply_job_defaults(job_data)
         return self.container.create_item(body=job_data)
 
     def update_job(self, job_id: str, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -110,13 +190,8 @@ class JobRepository:
             if not existing:
                 return None
                 
-            # Update fields
-            for key, value in job_data.items():
-                if value is not None:  # Only update non-None values
-                    existing[key] = value
-            
-            # Update timestamp
-            existing['updatedAt'] = datetime.utcnow().isoformat()
+            # Update fields and timestamp
+            apply_job_update(existing, job_data)
             
             # Save back to database
             return self.container.replace_item(
@@ -147,60 +222,7 @@ class JobRepository:
         """Search jobs by various criteria"""
         # In the future, this will use AI Search for more intelligent results
         # For now, we'll keep the existing implementation
-        
-        query_parts = ["SELECT * FROM c"]
-        params = []
-        
-        # Build WHERE clause dynamically based on provided search criteria
-        where_clauses = []
-        param_index = 0
-        
-        # Search by text query (title, description, company)
-        if query:
-            param_index += 1
-            where_clauses.append(f"""(
-                CONTAINS(LOWER(c.title), LOWER(@p{param_index})) OR 
-                CONTAINS(LOWER(c.description), LOWER(@p{param_index})) OR 
-                CONTAINS(LOWER(c.shortDescription), LOWER(@p{param_index})) OR
-                CONTAINS(LOWER(c.companyName), LOWER(@p{param_index}))
-            )""")
-            params.append({"name": f"@p{param_index}", "value": query})
-        
-        # Filter by location
-        if location:
-            param_index += 1
-            where_clauses.append(f"CONTAINS(LOWER(c.location), LOWER(@p{param_index}))")
-            params.append({"name": f"@p{param_index}", "value": location})
-        
-        # Filter by employment type
-        if employment_type:
-            param_index += 1
-            where_clauses.append(f"c.employmentType = @p{param_index}")
-            params.append({"name": f"@p{param_index}", "value": employment_type})
-        
-        # Filter by required skills
-        if skills and len(skills) > 0:
-            skill_conditions = []
-            for skill in skills:
-                param_index += 1
-                # Check if skill is in the requiredSkills array
-                skill_conditions.append(f"ARRAY_CONTAINS(c.requiredSkills, @p{param_index})")
-                params.append({"name": f"@p{param_index}", "value": skill})
-            
-            # If we have multiple skills, match any of them
-            where_clauses.append("(" + " OR ".join(skill_conditions) + ")")
-        
-        # Combine all where clauses
-        if where_clauses:
-            query_parts.append("WHERE " + " AND ".join(where_clauses))
-        
-        # Only return active jobs by default
-        if not where_clauses:
-            query_parts.append("WHERE c.status = 'active'")
-        elif all("c.status" not in clause for clause in where_clauses):
-            query_parts[-1] += " AND c.status = 'active'"
-        
-        query = " ".join(query_parts)
+        query, params = build_search_jobs_query(query, skills, location, employment_type)
         
         items = list(self.container.query_items(
             query=query,
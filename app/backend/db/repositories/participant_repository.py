@@ -2,7 +2,100 @@ from ..cosmos_client import get_cosmos_client, get_database, get_container
 from ..config import CONTAINERS, DB_NAME
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from .session_repository import get_migration_phase, participant_query_options, sessions_read_config
+from .job_match_repository import ARCHIVED_PARTICIPANT_MATCHES_QUERY, PARTICIPANT_MATCHES_QUERY, merge_tiers
+
+# Maintained from job_matches writes (see refresh_job_match_summary); never taken from a request
+SERVER_MANAGED_FIELDS = ('jobMatchSummary',)
+
+# Embedded copy of the participant's matches, replaced by jobMatchSummary and dropped on the next write
+LEGACY_MATCH_FIELD = 'jobMatches'
+
+def map_to_preview(participant: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a full participant record to preview format"""
+    preview = {
+        "id": participant["id"],
+        "fullName": participant["fullName"],
+        "email": participant["email"],
+        "disabilityType": participant["disabilityType"],
+        "currentStatus": participant["currentStatus"],
+        "employmentGoal": participant["employmentGoal"],
+    }
+
+    # Add optional fields if present
+    if "avatar" in participant:
+        preview["avatar"] = participant["avatar"]
+
+    # Job match count from the summary maintained by job_matches writes
+    preview["jobMatchCount"] = (participant.get("jobMatchSummary") or {}).get("total", 0)
+
+    # Session count will be filled in separately when needed
+    preview["sessionCount"] = 0
+
+    return preview
+
+def build_participants_query(status: Optional[str] = None,
+                             disability_type: Optional[str] = None,
+                             skill_type: Optional[str] = None,
+                             coach_id: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """Build the filtered participant listing query and its parameters"""
+    query_parts = ["SELECT * FROM c"]
+    params = []
+
+    # Build WHERE clause dynamically based on provided filters
+    where_clauses = []
+    param_index = 0
+
+    if status and status != "all":
+        param_index += 1
+        where_clauses.append(f"c.currentStatus = @p{param_index}")
+        params.append({"name": f"@p{param_index}", "value": status})
+
+    if disability_type and disability_type != "all":
+        param_index += 1
+        where_clauses.append(f"c.disabilityType = @p{param_index}")
+        params.append({"name": f"@p{param_index}", "value": disability_type})
+
+    if coach_id:
+        param_index += 1
+        where_clauses.append(f"c.coachId = @p{param_index}")
+        params.append({"name": f"@p{param_index}", "value": coach_id})
+
+    # Add skill filter (more complex since skills is an array property)
+    if skill_type and skill_type != "all":
+        param_index += 1
+        where_clauses.append(f"ARRAY_LENGTH(c.skills.{skill_type}) > 0")
+
+    # Combine all where clauses
+    if where_clauses:
+        query_parts.append("WHERE " + " AND ".join(where_clauses))
+
+    return " ".join(query_parts), params
+
+def apply_participant_defaults(participant_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Set the ID and timestamps of a new participant"""
+    if 'id' not in participant_data:
+        participant_data['id'] = str(uuid.uuid4())
+    
+    # A new participant has no matches yet
+    participant_data.pop(LEGACY_MATCH_FIELD, None)
+    participant_data['jobMatchSummary'] = None
+    
+    participant_data['createdAt'] = datetime.utcnow().isoformat()
+    participant_data['updatedAt'] = participant_data['createdAt']
+    return participant_data
+
+def apply_participant_update(existing: Dict[str, Any], participant_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge non-None fields into an existing participant and touch updatedAt"""
+    for key, value in participant_data.items():
+        if value is not None and key not in SERVER_MANAGED_FIELDS:  # Only update non-None values
+            existing[key] = value
+    existing.pop(LEGACY_MATCH_FIELD, None)
+    
+    # Update timestamp
+    existing['updatedAt'] = datetime.utcnow().isoformat()
+    return existing
 
 class ParticipantRepository:
     def __init__(self):
@@ -14,34 +107,30 @@ class ParticipantRepository:
             container_config['name'], 
             container_config['partition_key']
         )
+        # Sessions are read from whichever container the sessions migration phase reads from
+        self.sessions_phase = get_migration_phase()
+        sessions_config = sessions_read_config(self.sessions_phase)
         self.sessions_container = get_container(
             database,
-            CONTAINERS['sessions']['name'],
-            CONTAINERS['sessions']['partition_key']
+            sessions_config['name'],
+            sessions_config['partition_key']
+        )
+        matches_config = CONTAINERS['job_matches']
+        self.job_matches_container = get_container(
+            database,
+            matches_config['name'],
+            matches_config['partition_key']
+        )
+        archive_config = CONTAINERS['job_matches_archive']
+        self.job_matches_archive_container = get_container(
+            database,
+            archive_config['name'],
+            archive_config['partition_key']
         )
 
     def map_to_preview(self, participant: Dict[str, Any]) -> Dict[str, Any]:
         """Convert a full participant record to preview format"""
-        preview = {
-            "id": participant["id"],
-            "fullName": participant["fullName"],
-            "email": participant["email"],
-            "disabilityType": participant["disabilityType"],
-            "currentStatus": participant["currentStatus"],
-            "employmentGoal": participant["employmentGoal"],
-        }
-        
-        # Add optional fields if present
-        if "avatar" in participant:
-            preview["avatar"] = participant["avatar"]
-        
-        # Calculate job match count
-        preview["jobMatchCount"] = len(participant.get("jobMatches", []))
-        
-        # Session count will be filled in separately when needed
-        preview["sessionCount"] = 0
-        
-        return preview
+        return map_to_preview(participant)
 
     def get_all_participants(self, 
                            status: Optional[str] = None, 
@@ -49,38 +138,7 @@ class ParticipantRepository:
                            skill_type: Optional[str] = None,
                            coach_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all participants with optional filtering"""
-        query_parts = ["SELECT * FROM c"]
-        params = []
-        
-        # Build WHERE clause dynamically based on provided filters
-        where_clauses = []
-        param_index = 0
-        
-        if status and status != "all":
-            param_index += 1
-            where_clauses.append(f"c.currentStatus = @p{param_index}")
-            params.append({"name": f"@p{param_index}", "value": status})
-            
-        if disability_type and disability_type != "all":
-            param_index += 1
-            where_clauses.append(f"c.disabilityType = @p{param_index}")
-            params.append({"name": f"@p{param_index}", "value": disability_type})
-            
-        if coach_id:
-            param_index += 1
-            where_clauses.append(f"c.coachId = @p{param_index}")
-            params.append({"name": f"@p{param_index}", "value": coach_id})
-        
-        # Add skill filter (more complex since skills is an array property)
-        if skill_type and skill_type != "all":
-            param_index += 1
-            where_clauses.append(f"ARRAY_LENGTH(c.skills.{skill_type}) > 0")
-        
-        # Combine all where clauses
-        if where_clauses:
-            query_parts.append("WHERE " + " AND ".join(where_clauses))
-        
-        query = " ".join(query_parts)
+        query, params = build_participants_query(status, disability_type, skill_type, coach_id)
         
         items = list(self.container.query_items(
             query=query,
@@ -106,7 +164,7 @@ class ParticipantRepository:
             results = list(self.sessions_container.query_items(
                 query=query,
                 parameters=params,
-                enable_cross_partition_query=True
+                **participant_query_options(self.sessions_phase, participant_id)
             ))
             return results[0] if results else 0
         except Exception:
@@ -131,12 +189,7 @@ class ParticipantRepository:
 
     def create_participant(self, participant_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new participant"""
-        if 'id' not in participant_data:
-            participant_data['id'] = str(uuid.uuid4())
-        
-        participant_data['createdAt'] = datetime.utcnow().isoformat()
-        participant_data['updatedAt'] = participant_data['createdAt']
-        
+        apply_participant_defaults(participant_data)
         return self.container.create_item(body=participant_data)
 
     def update_participant(self, participant_id: str, participant_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -147,13 +200,8 @@ class ParticipantRepository:
             if not existing:
                 return None
                 
-            # Update fields
-            for key, value in participant_data.items():
-                if value is not None:  # Only update non-None values
-                    existing[key] = value
-            
-            # Update timestamp
-            existing['updatedAt'] = datetime.utcnow().isoformat()
+            # Update fields and timestamp
+            apply_participant_update(existing, participant_data)
             
             # Save back to database
             return self.container.replace_item(
@@ -184,15 +232,25 @@ class ParticipantRepository:
         sessions = list(self.sessions_container.query_items(
             query=query,
             parameters=params,
-            enable_cross_partition_query=True
+            **participant_query_options(self.sessions_phase, participant_id)
         ))
         
         return sessions
 
-    def get_participant_job_matches(self, participant_id: str) -> List[Dict[str, Any]]:
-        """Get job matches for a specific participant"""
-        participant = self.get_participant(participant_id)
-        if not participant:
-            return []
-        
-        return participant.get("jobMatches", [])
+    def get_participant_job_matches(self, participant_id: str, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Get job matches for a specific participant, newest first"""
+        # job_matches is partitioned by participantId, so this reads a single partition
+        params = [{"name": "@participantId", "value": participant_id}]
+        matches = list(self.job_matches_container.query_items(
+            query=PARTICIPANT_MATCHES_QUERY,
+            parameters=params,
+            partition_key=participant_id
+        ))
+        if include_archived:
+            archived = list(self.job_matches_archive_container.query_items(
+                query=ARCHIVED_PARTICIPANT_MATCHES_QUERY,
+                parameters=params,
+                partition_key=participant_id
+            ))
+            matches = merge_tiers(matches, archived)
+        return matches
@@ -1,42 +1,312 @@
 from ..cosmos_client import get_cosmos_client, get_database, get_container
 from ..config import CONTAINERS, DB_NAME
+import os
 import uuid
+from datetime import datetime
+from azure.cosmos.exceptions import CosmosResourceExistsError, CosmosResourceNotFoundError
+from services.session_analysis.main import analyze_segment, merge_analyses
+
+# Sessions move from 'sessions' (partitioned by /id) to 'sessions_by_participant' (partitioned by
+# /participantId) in phases, selected with SESSIONS_MIGRATION_PHASE:
+#   legacy      read and write the old container only
+#   dual_write  write both, read the old one; run `python -m tools.migrate_sessions copy` and `verify`
+#   dual_read   write both, read the new one, falling back to the old one for a session it lacks
+#   migrated    read and write the new container only
+MIGRATION_PHASES = ('legacy', 'dual_write', 'dual_read', 'migrated')
+
+# Properties Cosmos DB sets on every item; they are not copied between containers
+SYSTEM_PROPERTIES = ('_rid', '_self', '_etag', '_attachments', '_ts')
+
+def get_migration_phase():
+    """Current sessions migration phase from SESSIONS_MIGRATION_PHASE (default: legacy)"""
+    phase = os.environ.get("SESSIONS_MIGRATION_PHASE", "legacy")
+    if phase not in MIGRATION_PHASES:
+        raise ValueError(f"SESSIONS_MIGRATION_PHASE must be one of: {', '.join(MIGRATION_PHASES)}")
+    return phase
+
+def reads_partitioned(phase):
+    return phase in ('dual_read', 'migrated')
+
+def writes_legacy(phase):
+    return phase != 'migrated'
+
+def writes_partitioned(phase):
+    return phase != 'legacy'
+
+def sessions_read_config(phase):
+    """Configuration of the container session reads are served from in a phase"""
+    return CONTAINERS['sessions_by_participant'] if reads_partitioned(phase) else CONTAINERS['sessions']
+
+def participant_query_options(phase, participant_id):
+    """Query options for one participant's sessions: a single partition once reads use the new container"""
+    if reads_partitioned(phase):
+        return {'partition_key': participant_id}
+    return {'enable_cross_partition_query': True}
+
+def without_system_properties(session):
+    return {key: value for key, value in session.items() if key not in SYSTEM_PROPERTIES}
+
+def build_sessions_query(coach_id=None, participant_id=None, status=None, session_type=None):
+    """Build the filtered session listing query and its parameters"""
+    query = "SELECT * FROM c"
+    parameters = []
+    where_clauses = []
+
+    if coach_id:
+        where_clauses.append("c.coachId = @coachId")
+        parameters.append({"name": "@coachId", "value": coach_id})
+
+    if participant_id:
+        where_clauses.append("c.participantId = @participantId")
+        parameters.append({"name": "@participantId", "value": participant_id})
+
+    if status:
+        where_clauses.append("c.status = @status")
+        parameters.append({"name": "@status", "value": status})
+
+    if session_type:
+        where_clauses.append("c.type = @type")
+        parameters.append({"name": "@type", "value": session_type})
+
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+
+    return query, parameters
+
+# Observations are items of their own in the session_observations container, partitioned by
+# /sessionId; the session keeps only their count and a preview of the latest one
+OBSERVATION_SUMMARY_FIELDS = ('observationCount', 'latestObservation')
+
+# Characters of the latest observation previewed on the session
+OBSERVATION_PREVIEW_LENGTH = 280
+
+# Attempts at the next seq before an append gives up; each conflict means a concurrent append won
+OBSERVATION_APPEND_ATTEMPTS = 3
+
+OBSERVATIONS_PAGE_QUERY = (
+    "SELECT TOP @limit * FROM c WHERE c.sessionId = @sessionId AND c.seq > @after ORDER BY c.seq"
+)
+PENDING_OBSERVATIONS_QUERY = "SELECT * FROM c WHERE c.sessionId = @sessionId AND c.analyzed = false ORDER BY c.seq"
+LAST_OBSERVATION_SEQ_QUERY = "SELECT VALUE MAX(c.seq) FROM c WHERE c.sessionId = @sessionId"
+
+def observation_id(session_id, seq):
+    return f"{session_id}.{seq:06d}"
+
+def new_observation(session_id, seq, text, created_at=None, analysis=None):
+    """Build an observation item; seq numbers a session's observations from 1 and is part of the id"""
+    return {
+        "id": observation_id(session_id, seq),
+        "sessionId": session_id,
+        "seq": seq,
+        "text": text,
+        "createdAt": created_at or datetime.utcnow().isoformat(),
+        "analyzed": analysis is not None,
+        "analysis": analysis
+    }
+
+def set_observation_summary(session, latest, count):
+    """Record the observation count and a preview of the latest observation on a session"""
+    session["observationCount"] = count
+    session["latestObservation"] = {
+        "seq": latest["seq"],
+        "text": latest["text"][:OBSERVATION_PREVIEW_LENGTH],
+        "createdAt": latest["createdAt"]
+    } if latest else None
+    return session
+
+def take_inline_observations(session):
+    """
+    Remove the observations a session still keeps inline and return them as observation items
+
+    Sessions written before observation items existed hold them in an observations list, or only
+    in notes; those become items numbered from 1, and the session keeps only their summary, not
+    the notes. Sessions that already have a count return [].
+    """
+    if "observationCount" in session:
+        return []
+    segments = session.pop("observations", None)
+    notes = session.pop("notes", None)
+    if segments is None:
+        segments = [{"text": notes}] if notes else []
+    items = [
+        new_observation(session["id"], seq, segment["text"], segment.get("createdAt"), segment.get("analysis"))
+        for seq, segment in enumerate(segments, start=1)
+    ]
+    set_observation_summary(session, items[-1] if items else None, len(items))
+    return items
+
+def apply_session_defaults(session_data):
+    """Set the ID of a new session; its initial notes become the first observation"""
+    if 'id' not in session_data:
+        session_data['id'] = f"session-{uuid.uuid4().hex[:8]}"
+    return take_inline_observations(session_data)
+
+def analyze_pending_observations(session, pending, ai_service=None):
+    """
+    Analyze observations added since the last run and merge them into the session analysis
+
+    Only the new observations go to the analysis service; their analyses are merged into the
+    session's existing aiSuggestions, so older observations are never read again.
+    """
+    for observation in pending:
+        observation["analysis"] = analyze_segment(observation["text"], ai_service)
+        observation["analyzed"] = True
+    return merge_analyses([session.get("aiSuggestions")] + [observation["analysis"] for observation in pending])
+
+def observations_page(session, observations, limit):
+    """Response body for a page of observations; nextAfter is the cursor for the following page"""
+    observations = [
+        {key: value for key, value in observation.items() if key not in SYSTEM_PROPERTIES}
+        for observation in observations
+    ]
+    last_seq = observations[-1]["seq"] if observations else None
+    return {
+        "sessionId": session["id"],
+        "total": session.get("observationCount", 0),
+        "observations": observations,
+        "nextAfter": last_seq if len(observations) == limit and last_seq < session.get("observationCount", 0) else None
+    }
 
 class SessionRepository:
     def __init__(self):
         client = get_cosmos_client()
         database = get_database(client, DB_NAME)
+        self.phase = get_migration_phase()
         container_config = CONTAINERS['sessions']
         self.container = get_container(
             database, 
             container_config['name'], 
             container_config['partition_key']
         )
+        # The partitioned container is only touched once the migration has started
+        self.partitioned_container = None
+        if writes_partitioned(self.phase):
+            partitioned_config = CONTAINERS['sessions_by_participant']
+            self.partitioned_container = get_container(
+                database,
+                partitioned_config['name'],
+                partitioned_config['partition_key']
+            )
+        observations_config = CONTAINERS['session_observations']
+        self.observations_container = get_container(
+            database,
+            observations_config['name'],
+            observations_config['partition_key']
+        )
 
-    def get_all_sessions(self, coach_id=None, participant_id=None, status=None, session_type=None):
-        """Get all sessions with optional filtering"""
-        query = "SELECT * FROM c"
-        parameters = []
-        where_clauses = []
-        
-        if coach_id:
-            where_clauses.append("c.coachId = @coachId")
-            parameters.append({"name": "@coachId", "value": coach_id})
+    def _dual_write(self, legacy_write, partitioned_write):
+        """Run the writes of the current phase and return the result from the container reads use"""
+        writes = []
+        if writes_legacy(self.phase):
+            writes.append(legacy_write)
+        if writes_partitioned(self.phase):
+            writes.append(partitioned_write)
+        if reads_partitioned(self.phase):
+            writes.reverse()
         
+        result = writes[0]()
+        for write in writes[1:]:
+            try:
+                write()
+            except Exception as e:
+                # The copy is repaired by `python -m tools.migrate_sessions verify --repair`
+                print(f"Error mirroring session write: {e}")
+        return result
+
+    def _read_partitioned(self, session_id, participant_id=None):
         if participant_id:
-            where_clauses.append("c.participantId = @participantId")
-            parameters.append({"name": "@participantId", "value": participant_id})
+            try:
+                return self.partitioned_container.read_item(item=session_id, partition_key=participant_id)
+            except CosmosResourceNotFoundError:
+                return None
         
-        if status:
-            where_clauses.append("c.status = @status")
-            parameters.append({"name": "@status", "value": status})
+        # Without the participant the lookup fans out, but each partition answers from the id index
+        items = list(self.partitioned_container.query_items(
+            query="SELECT * FROM c WHERE c.id = @id",
+            parameters=[{"name": "@id", "value": session_id}],
+            enable_cross_partition_query=True
+        ))
+        return items[0] if items else None
+
+    def _store_inline_observations(self, session):
+        """Move a session's inline observations into observation items; the caller saves the session"""
+        for observation in take_inline_observations(session):
+            # Upserted, so a move interrupted before the session was saved can simply run again
+            self.observations_container.upsert_item(body=observation)
         
-        if session_type:
-            where_clauses.append("c.type = @type")
-            parameters.append({"name": "@type", "value": session_type})
+        # Sessions moved before notes were dropped still carry them, possibly edited since
+        notes = session.pop("notes", None)
+        if notes and notes != self._observation_text(session["id"], 1):
+            self._add_observation(session, notes)
+
+    def move_inline_observations(self, session):
+        """Move the observations a session still keeps inline into items and save it; returns the session"""
+        if "observationCount" in session and "notes" not in session:
+            return session
+        try:
+            self._store_inline_observations(session)
+        except Exception as e:
+            print(f"Error moving observations: {e}")
+            return None
+        return self.update_session(session["id"], session)
+
+    def _observation_text(self, session_id, seq):
+        try:
+            return self.observations_container.read_item(item=observation_id(session_id, seq), partition_key=session_id)["text"]
+        except CosmosResourceNotFoundError:
+            return None
+
+    def _add_observation(self, session, text):
+        """Append an observation and update the session's summary; the caller saves the session"""
+        observation = self._append_observation(session, text)
+        set_observation_summary(session, observation, max(session["observationCount"], observation["seq"]))
+        return observation
+
+    def add_notes(self, session, notes):
+        """
+        Add notes sent with a session update as an observation, unless they repeat the latest one
+
+        Sessions keep no notes text; an edit sent through PUT becomes an observation, so the next
+        analysis includes it. The caller saves the session. Returns False if the notes could not be added.
+        """
+        try:
+            self._store_inline_observations(session)
+            latest = session.get("latestObservation")
+            if not latest or notes != self._observation_text(session["id"], latest["seq"]):
+                self._add_observation(session, notes)
+            return True
+        except Exception as e:
+            print(f"Error adding notes: {e}")
+            return False
+
+    def _append_observation(self, session, text):
+        """Create the next observation item of a session and return it"""
+        seq = session["observationCount"] + 1
+        for _ in range(OBSERVATION_APPEND_ATTEMPTS):
+            try:
+                return self.observations_container.create_item(body=new_observation(session["id"], seq, text))
+            except CosmosResourceExistsError:
+                # A concurrent append took this seq; continue after the last one stored
+                last = list(self.observations_container.query_items(
+                    query=LAST_OBSERVATION_SEQ_QUERY,
+                    parameters=[{"name": "@sessionId", "value": session["id"]}],
+                    partition_key=session["id"]
+                ))
+                seq = (last[0] if last and last[0] else seq) + 1
+        raise RuntimeError(f"Could not append an observation to session {session['id']}")
+
+    def get_all_sessions(self, coach_id=None, participant_id=None, status=None, session_type=None):
+        """Get all sessions with optional filtering"""
+        query, parameters = build_sessions_query(coach_id, participant_id, status, session_type)
         
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
+        if reads_partitioned(self.phase):
+            # A participant's sessions share one partition
+            options = {'partition_key': participant_id} if participant_id else {'enable_cross_partition_query': True}
+            return list(self.partitioned_container.query_items(
+                query=query,
+                parameters=parameters,
+                **options
+            ))
         
         results = list(self.container.query_items(
             query=query,
@@ -46,9 +316,14 @@ class SessionRepository:
         
         return results
         
-    def get_session(self, session_id):
-        """Get a specific session by ID"""
+    def get_session(self, session_id, participant_id=None):
+        """Get a specific session by ID; participant_id, when known, makes it a point read after the migration"""
         try:
+            if reads_partitioned(self.phase):
+                session = self._read_partitioned(session_id, participant_id)
+                if session is not None or self.phase == 'migrated':
+                    return session
+            
             return self.container.read_item(
                 item=session_id,
                 partition_key=session_id
@@ -59,48 +334,98 @@ class SessionRepository:
 
     def create_session(self, session_data):
         """Create a new session"""
-        if 'id' not in session_data:
-            session_data['id'] = f"session-{uuid.uuid4().hex[:8]}"
-        
-        return self.container.create_item(body=session_data)
+        for observation in apply_session_defaults(session_data):
+            self.observations_container.create_item(body=observation)
+        return self._dual_write(
+            lambda: self.container.create_item(body=dict(session_data)),
+            lambda: self.partitioned_container.upsert_item(body=dict(session_data))
+        )
 
     def update_session(self, session_id, session_data):
         """Update an existing session"""
         try:
             session_data['id'] = session_id
-            return self.container.replace_item(
-                item=session_id,
-                body=session_data
+            return self._dual_write(
+                lambda: self.container.replace_item(
+                    item=session_id,
+                    body=session_data
+                ),
+                # Upserted, since the session may not have been copied yet
+                lambda: self.partitioned_container.upsert_item(body=without_system_properties(session_data))
             )
         except Exception as e:
             print(f"Error updating session: {e}")
             return None
 
-    def delete_session(self, session_id):
+    def delete_session(self, session_id, participant_id=None):
         """Delete a session"""
         try:
-            return self.container.delete_item(
-                item=session_id, 
-                partition_key=session_id
+            def delete_partitioned():
+                session = self._read_partitioned(session_id) if not participant_id else {'participantId': participant_id}
+                if session is None:
+                    return None
+                return self.partitioned_container.delete_item(
+                    item=session_id,
+                    partition_key=session['participantId']
+                )
+            
+            result = self._dual_write(
+                lambda: self.container.delete_item(
+                    item=session_id, 
+                    partition_key=session_id
+                ),
+                delete_partitioned
             )
+            
+            # The observations share one partition, so this stays partition-local
+            for observation in self.observations_container.query_items(
+                query="SELECT c.id FROM c",
+                partition_key=session_id
+            ):
+                self.observations_container.delete_item(item=observation['id'], partition_key=session_id)
+            return result
         except Exception as e:
             print(f"Error deleting session: {e}")
             return None
     
-    def add_observations(self, session_id, observations_data):
+    def get_observations(self, session_id, limit=20, after=0, participant_id=None):
+        """Get a page of a session's observations, oldest first, with seq greater than `after`"""
+        try:
+            session = self.get_session(session_id, participant_id)
+            if not session:
+                return None
+            
+            if "observationCount" not in session:
+                # Not moved out of the session yet
+                inline = [observation for observation in take_inline_observations(session) if observation["seq"] > after]
+                return observations_page(session, inline[:limit], limit)
+            
+            observations = list(self.observations_container.query_items(
+                query=OBSERVATIONS_PAGE_QUERY,
+                parameters=[
+                    {"name": "@limit", "value": limit},
+                    {"name": "@sessionId", "value": session_id},
+                    {"name": "@after", "value": after}
+                ],
+                partition_key=session_id
+            ))
+            return observations_page(session, observations, limit)
+        except Exception as e:
+            print(f"Error retrieving observations: {e}")
+            return None
+    
+    def add_observations(self, session_id, observations_data, participant_id=None):
         """Add observations to a session"""
         try:
             # First, get the session
-            session = self.get_session(session_id)
+            session = self.get_session(session_id, participant_id)
             if not session:
                 return None
                 
-            # Update the notes field only
+            # Store the observation as an item of its own; the session only keeps the summary
             if "notes" in observations_data:
-                if session["notes"]:
-                    session["notes"] += f"\n\n{observations_data['notes']}"
-                else:
-                    session["notes"] = observations_data["notes"]
+                self._store_inline_observations(session)
+                self._add_observation(session, observations_data["notes"])
             
             # Update the session
             return self.update_session(session_id, session)
@@ -109,65 +434,30 @@ class SessionRepository:
             print(f"Error adding observations: {e}")
             return None
     
-    def generate_analysis(self, session_id, ai_service=None):
-        """Generate AI analysis for a session"""
+    def generate_analysis(self, session_id, ai_service=None, participant_id=None):
+        """Generate AI analysis for a session, analyzing only observations added since the last run"""
         try:
             # Get the session
-            session = self.get_session(session_id)
+            session = self.get_session(session_id, participant_id)
             if not session:
                 return None
-                
+            
+            self._store_inline_observations(session)
+            
             # Check if notes are provided to analyze
-            if not session.get("notes"):
+            if not session["observationCount"]:
                 return {"error": "Session has no notes to analyze"}
-                
-            # In a real implementation, this would call an AI service
-            # Here we'll use either the provided AI service or return mock data
-            if ai_service:
-                ai_analysis = ai_service.analyze_session_notes(session["notes"])
-            else:
-                # Mock AI analysis
-                ai_analysis = {
-                    "recommendedTopics": [
-                        "Communication skills",
-                        "Interview preparation",
-                        "Job search strategies"
-                    ],
-                    "sentimentAnalysis": {
-                        "positive": [
-                            "Excited about new opportunities",
-                            "Confident in technical abilities",
-                            "Eager to learn new skills"
-                        ],
-                        "negative": [
-                            "Concerned about transportation",
-                            "Anxious about interviews",
-                            "Worried about schedule flexibility"
-                        ]
-                    },
-                    "jobRecommendations": [
-                        {
-                            "id": "job-789",
-                            "title": "Sales Assistant - Department Store",
-                            "match": 92,
-                            "reason": "Compatible with previous experience and communication skills"
-                        },
-                        {
-                            "id": "job-456",
-                            "title": "Customer Service Assistant",
-                            "match": 85,
-                            "reason": "Interactive environment that matches preferences"
-                        },
-                        {
-                            "id": "job-234",
-                            "title": "Retail Associate",
-                            "match": 78,
-                            "reason": "Good fit for skill level and interests"
-                        }
-                    ]
-                }
             
-            # Update session with AI analysis
+            pending = list(self.observations_container.query_items(
+                query=PENDING_OBSERVATIONS_QUERY,
+                parameters=[{"name": "@sessionId", "value": session_id}],
+                partition_key=session_id
+            ))
+                
+            # Merge the new observations' analyses into the session's
+            ai_analysis = analyze_pending_observations(session, pending, ai_service)
+            for observation in pending:
+                self.observations_container.replace_item(item=observation["id"], body=observation)
             session["aiSuggestions"] = ai_analysis
             self.update_session(session_id, session)
             
@@ -0,0 +1 @@
+# Flask app extensions registered in run.py
@@ -0,0 +1,294 @@
+import asyncio
+import fcntl
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from flask import Flask, g, jsonify, request
+from prometheus_client import Counter, Histogram
+
+# Expensive endpoints and their limits: concurrency:queue:retry-after seconds. Keys are endpoint
+# names ("blueprint.view") or blueprint names; an endpoint entry wins over its blueprint's.
+# Other names are limits held around a piece of work with admitted(): call_center.analysis
+# covers cache misses, the worker running an analysis and those waiting for it in other
+# workers, so cache hits are never held back and waiters cannot take every worker. With 5 sync workers these leave at least one worker free.
+DEFAULT_LIMITS = "job_matches.get_job_suggestions=2:1:2,call_center.analysis=1:2:30"
+DEFAULT_QUEUE_TIMEOUT_SECONDS = 5
+DEFAULT_LOCK_DIR = "/tmp/admission"
+
+# How often a queued request in another worker checks for a free slot
+POLL_INTERVAL_SECONDS = 0.05
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected",
+    "Requests rejected with 429 because a concurrency limit and its queue were full",
+    ["limit"],
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent queued for a slot",
+    ["limit"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+class Limit(NamedTuple):
+    name: str
+    concurrency: int
+    queue: int
+    retry_after: int
+
+class AdmissionRejected(Exception):
+    """Raised when a limit and its queue are full; init_admission answers it with 429"""
+
+    def __init__(self, limit: Limit):
+        super().__init__(f"Admission limit {limit.name} is full")
+        self.limit = limit
+
+def retry_after_seconds(limit: Limit) -> str:
+    return str(max(1, math.ceil(limit.retry_after)))
+
+def parse_limits(spec: str) -> Dict[str, Limit]:
+    """Parse "name=concurrency[:queue[:retry_after]],..." into limits by name"""
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = entry.partition("=")
+        numbers = [int(value) for value in values.split(":")]
+        concurrency = numbers[0]
+        queue = numbers[1] if len(numbers) > 1 else 0
+        retry_after = numbers[2] if len(numbers) > 2 else 1
+        if concurrency < 1 or queue < 0:
+            raise ValueError(f"Invalid admission limit: {entry}")
+        limits[name.strip()] = Limit(name.strip(), concurrency, queue, retry_after)
+    return limits
+
+class LocalAdmissionBackend:
+    """Limits concurrent requests within this process; suited to threaded or single-process servers"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._running: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+
+    def acquire(self, limit: Limit, timeout: float) -> Optional[object]:
+        with self._condition:
+            if self._running.get(limit.name, 0) >= limit.concurrency:
+                if self._waiting.get(limit.name, 0) >= limit.queue:
+                    return None
+                self._waiting[limit.name] = self._waiting.get(limit.name, 0) + 1
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self._running.get(limit.name, 0) < limit.concurrency, timeout
+                    )
+                finally:
+                    self._waiting[limit.name] -= 1
+                if not admitted:
+                    return None
+            self._running[limit.name] = self._running.get(limit.name, 0) + 1
+            return limit.name
+
+    def release(self, slot: object) -> None:
+        with self._condition:
+            self._running[slot] -= 1
+            self._condition.notify_all()
+
+class FileLockAdmissionBackend:
+    """
+    Limits concurrent requests across every worker on the host with one lock file per slot
+
+    A request holds an flock on one of the limit's slot files while it runs, and on one of its
+    queue files while it waits. The kernel drops the locks of a worker that dies, so a crash
+    never leaks a slot.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _try_lock(self, prefix: str, count: int) -> Optional[int]:
+        for index in range(count):
+            fd = os.open(self.directory / f"{prefix}.{index}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def _unlock(self, fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def acquire(self, limit: Limit, timeout: float) -> Optional[object]:
+        slot = self._try_lock(f"{limit.name}.slot", limit.concurrency)
+        if slot is not None or limit.queue == 0:
+            return slot
+
+        place = self._try_lock(f"{limit.name}.queue", limit.queue)
+        if place is None:
+            return None
+        try:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL_SECONDS)
+                slot = self._try_lock(f"{limit.name}.slot", limit.concurrency)
+                if slot is not None:
+                    return slot
+            return None
+        finally:
+            self._unlock(place)
+
+    def release(self, slot: object) -> None:
+        self._unlock(slot)
+
+class AsyncAdmissionBackend:
+    """
+    Limits concurrent handlers on one event loop, for the routes asgi.py serves natively
+
+    Per process, like LocalAdmissionBackend: an asyncio.Semaphore per limit, created on first
+    use so it belongs to the running loop, and a count of the handlers queued for it.
+    """
+
+    def __init__(self):
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._waiting: Dict[str, int] = {}
+
+    async def acquire(self, limit: Limit, timeout: float) -> Optional[object]:
+        semaphore = self._semaphores.get(limit.name)
+        if semaphore is None:
+            semaphore = self._semaphores[limit.name] = asyncio.Semaphore(limit.concurrency)
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return semaphore
+        if self._waiting.get(limit.name, 0) >= limit.queue:
+            return None
+        self._waiting[limit.name] = self._waiting.get(limit.name, 0) + 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+            return semaphore
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiting[limit.name] -= 1
+
+    def release(self, slot: object) -> None:
+        slot.release()
+
+def get_admission_backend():
+    """Backend named by ADMISSION_BACKEND: local (default) or file, shared by all workers"""
+    if os.environ.get("ADMISSION_BACKEND", "local") == "file":
+        return FileLockAdmissionBackend(os.environ.get("ADMISSION_LOCK_DIR", DEFAULT_LOCK_DIR))
+    return LocalAdmissionBackend()
+
+class Admission:
+    """The limits from ADMISSION_LIMITS and the backend that enforces them"""
+
+    def __init__(self, limits: Dict[str, Limit], queue_timeout: float, backend):
+        self.limits = limits
+        self.queue_timeout = queue_timeout
+        self.backend = backend
+
+    @classmethod
+    def from_environment(cls, backend) -> "Admission":
+        return cls(
+            parse_limits(os.environ.get("ADMISSION_LIMITS", DEFAULT_LIMITS)),
+            float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", DEFAULT_QUEUE_TIMEOUT_SECONDS)),
+            backend,
+        )
+
+    def _admitted(self, limit: Limit, slot: Optional[object], start: float) -> object:
+        if slot is None:
+            ADMISSION_REJECTED.labels(limit.name).inc()
+            raise AdmissionRejected(limit)
+        ADMISSION_WAIT.labels(limit.name).observe(time.perf_counter() - start)
+        return slot
+
+    def acquire(self, limit: Limit) -> object:
+        """Take a slot of limit, queueing for it if allowed; raises AdmissionRejected"""
+        start = time.perf_counter()
+        return self._admitted(limit, self.backend.acquire(limit, self.queue_timeout), start)
+
+    @contextmanager
+    def admitted(self, name: str):
+        """Hold a slot of the named limit for the duration of the block; a no-op for names without a limit"""
+        limit = self.limits.get(name)
+        if limit is None:
+            yield
+            return
+        slot = self.acquire(limit)
+        try:
+            yield
+        finally:
+            self.backend.release(slot)
+
+    @asynccontextmanager
+    async def admitted_async(self, name: str):
+        """admitted() for coroutines, with an AsyncAdmissionBackend"""
+        limit = self.limits.get(name)
+        if limit is None:
+            yield
+            return
+        start = time.perf_counter()
+        slot = self._admitted(limit, await self.backend.acquire(limit, self.queue_timeout), start)
+        try:
+            yield
+        finally:
+            self.backend.release(slot)
+
+_admission: Optional[Admission] = None
+_admission_lock = threading.Lock()
+
+def get_admission() -> Admission:
+    """Return the process-wide admission limits, configured from the environment on first use"""
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            _admission = Admission.from_environment(get_admission_backend())
+        return _admission
+
+def admitted(name: str):
+    """Hold a slot of the named limit around a block of work; raises AdmissionRejected when it is full"""
+    return get_admission().admitted(name)
+
+def rejection_response(limit: Limit):
+    response = jsonify({"error": "Too many concurrent requests for this endpoint, retry later"})
+    response.status_code = 429
+    response.headers["Retry-After"] = retry_after_seconds(limit)
+    return response
+
+def init_admission(app: Flask) -> None:
+    """
+    Cap concurrent requests to expensive endpoints and reject the overflow with 429
+
+    Requests over a limit wait in a bounded queue for up to ADMISSION_QUEUE_TIMEOUT_SECONDS; once
+    the queue is full, or the wait times out, they get 429 with Retry-After. Everything without
+    a limit is never held back, so cheap CRUD calls keep a free worker. Work limited from inside
+    a view with admitted() is answered the same way.
+    """
+    admission = get_admission()
+
+    @app.errorhandler(AdmissionRejected)
+    def admission_rejected(error: AdmissionRejected):
+        return rejection_response(error.limit)
+
+    @app.before_request
+    def admit_request():
+        limit = admission.limits.get(request.endpoint) or admission.limits.get(request.blueprint)
+        if limit is None or request.method == "OPTIONS":
+            return None
+
+        try:
+            g.admission_slot = admission.acquire(limit)
+        except AdmissionRejected:
+            return rejection_response(limit)
+        return None
+
+    @app.teardown_request
+    def release_slot(exc):
+        # Runs after a streamed response has been fully sent
+        slot = g.pop("admission_slot", None)
+        if slot is not None:
+            admission.backend.release(slot)
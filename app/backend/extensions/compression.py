@@ -0,0 +1,134 @@
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+import zstandard
+from flask import Flask, request
+from werkzeug.datastructures import Accept
+
+# Preferred first when the client rates encodings equally
+ENCODINGS = ("zstd", "gzip")
+
+# Bodies that are already compressed, or not worth compressing, are sent as they are
+INCOMPRESSIBLE_MIMETYPE_PREFIXES = ("audio/", "image/", "video/")
+INCOMPRESSIBLE_MIMETYPES = {
+    "application/gzip",
+    "application/zip",
+    "application/zstd",
+    "application/octet-stream",
+    "application/pdf",
+}
+
+DEFAULT_MIN_BYTES = 1024
+DEFAULT_ZSTD_LEVEL = 3
+DEFAULT_GZIP_LEVEL = 6
+
+def get_compression_settings():
+    """Minimum body size and compression levels from the environment"""
+    return (
+        int(os.environ.get("COMPRESSION_MIN_BYTES", DEFAULT_MIN_BYTES)),
+        int(os.environ.get("COMPRESSION_ZSTD_LEVEL", DEFAULT_ZSTD_LEVEL)),
+        int(os.environ.get("COMPRESSION_GZIP_LEVEL", DEFAULT_GZIP_LEVEL)),
+    )
+
+def negotiate_encoding(accept_encoding: Accept) -> Optional[str]:
+    """Pick the supported encoding the client rates highest, or None for identity"""
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accept_encoding[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+class Compressor:
+    """Incremental zstd or gzip compressor; flush() ends a block so streamed chunks reach the client"""
+
+    def __init__(self, encoding: str, zstd_level: int = DEFAULT_ZSTD_LEVEL, gzip_level: int = DEFAULT_GZIP_LEVEL):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "zstd":
+            return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+def compress(data: bytes, encoding: str, zstd_level: int = DEFAULT_ZSTD_LEVEL, gzip_level: int = DEFAULT_GZIP_LEVEL) -> bytes:
+    """Compress a complete body"""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=zstd_level).compress(data)
+    compressor = Compressor(encoding, zstd_level, gzip_level)
+    return compressor.compress(data) + compressor.finish()
+
+def compress_chunks(chunks: Iterable[bytes], compressor: Compressor) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk, flushing after each so the client is not kept waiting"""
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+
+def is_compressible(response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if "Content-Encoding" in response.headers or response.direct_passthrough:
+        return False
+    mimetype = response.mimetype or ""
+    return not (mimetype in INCOMPRESSIBLE_MIMETYPES or mimetype.startswith(INCOMPRESSIBLE_MIMETYPE_PREFIXES))
+
+def init_compression(app: Flask) -> None:
+    """
+    Compress responses with zstd or gzip, negotiated from Accept-Encoding
+
+    Buffered bodies smaller than COMPRESSION_MIN_BYTES are sent uncompressed. Streamed responses
+    are always compressed, one flushed block per chunk. send_file responses, already-encoded
+    bodies and binary media types are left alone.
+    """
+    min_bytes, zstd_level, gzip_level = get_compression_settings()
+
+    @app.after_request
+    def compress_response(response):
+        if request.method == "HEAD" or not is_compressible(response):
+            return response
+
+        # The body depends on Accept-Encoding even when it ends up uncompressed
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_chunks(response.response, Compressor(encoding, zstd_level, gzip_level))
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_bytes:
+                return response
+            compressed = compress(data, encoding, zstd_level, gzip_level)
+            if len(compressed) >= len(data):
+                return response
+            response.set_data(compressed)
+
+        response.headers["Content-Encoding"] = encoding
+        if response.get_etag()[0]:
+            # A strong ETag identifies the uncompressed bytes
+            response.set_etag(response.get_etag()[0], weak=True)
+        return response
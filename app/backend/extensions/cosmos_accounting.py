@@ -0,0 +1,38 @@
+from flask import Flask, g, request
+from prometheus_client import Histogram
+
+from db.diagnostics import begin_request, current_request_stats, end_request
+
+REQUEST_CHARGE = Histogram(
+    "http_request_cosmos_charge",
+    "Cosmos DB request units consumed while handling a request",
+    ["blueprint", "endpoint"],
+    buckets=(1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+def init_cosmos_accounting(app: Flask) -> None:
+    """
+    Total the request charge, items and time of the Cosmos DB calls made by each request
+
+    The totals are returned in Server-Timing and X-Cosmos-Request-Charge headers and recorded
+    per endpoint in the http_request_cosmos_charge histogram.
+    """
+
+    @app.before_request
+    def start_accounting():
+        g.cosmos_accounting_token = begin_request()
+
+    @app.after_request
+    def report_accounting(response):
+        stats = current_request_stats()
+        if stats is not None and stats.operations:
+            response.headers.add("Server-Timing", stats.server_timing())
+            response.headers["X-Cosmos-Request-Charge"] = f"{stats.charge:.2f}"
+            REQUEST_CHARGE.labels(request.blueprint or "app", request.endpoint or "unmatched").observe(stats.charge)
+        return response
+
+    @app.teardown_request
+    def stop_accounting(exc):
+        token = g.pop("cosmos_accounting_token", None)
+        if token is not None:
+            end_request(token)
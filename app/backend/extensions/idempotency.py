@@ -0,0 +1,92 @@
+import hashlib
+import os
+from typing import Optional
+
+from flask import Flask, Response, g, jsonify, request
+from prometheus_client import Counter
+
+from services.idempotency import CLAIMED, IN_PROGRESS, MISMATCH, StoredResponse, get_idempotency_store
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# Create endpoints that generate ids server-side, so a blind retry would create a duplicate
+DEFAULT_ENDPOINTS = (
+    "jobs.create_job,participants.create_participant,sessions.create_session,"
+    "job_matches.create_job_match,job_matches.create_job_suggestion"
+)
+
+IDEMPOTENT_REQUESTS = Counter(
+    "idempotent_requests",
+    "Requests carrying an Idempotency-Key, by outcome",
+    ["endpoint", "outcome"],
+)
+
+def request_fingerprint() -> str:
+    """Method, path and body of the current request; a key may only be reused for the same request"""
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}\n".encode())
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+def _error(message: str, status_code: int, retry_after: Optional[int] = None):
+    response = jsonify({"error": message})
+    response.status_code = status_code
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return response
+
+def init_idempotency(app: Flask) -> None:
+    """
+    Honour the Idempotency-Key header on the create endpoints in IDEMPOTENCY_ENDPOINTS
+
+    The first request with a key runs normally and its response is stored for
+    IDEMPOTENCY_TTL_SECONDS. A retry with the same key and body gets the stored response, marked
+    with Idempotent-Replayed, without running the view again. A retry while the first attempt is
+    still running gets 409, and a key reused with a different body gets 422. Server errors are not
+    stored, so the request can be retried. Register after init_compression so the stored body is
+    uncompressed.
+    """
+    endpoints = {name.strip() for name in os.environ.get("IDEMPOTENCY_ENDPOINTS", DEFAULT_ENDPOINTS).split(",")}
+
+    @app.before_request
+    def claim_idempotency_key():
+        key = request.headers.get(HEADER)
+        if not key or request.method != "POST" or request.endpoint not in endpoints:
+            return None
+        if len(key) > MAX_KEY_LENGTH:
+            return _error(f"{HEADER} must be at most {MAX_KEY_LENGTH} characters", 400)
+
+        outcome, stored = get_idempotency_store().claim(key, request_fingerprint())
+        IDEMPOTENT_REQUESTS.labels(request.endpoint, outcome).inc()
+        if outcome == CLAIMED:
+            g.idempotency_key = key
+            return None
+        if outcome == IN_PROGRESS:
+            return _error("A request with this Idempotency-Key is still in progress", 409, retry_after=1)
+        if outcome == MISMATCH:
+            return _error("Idempotency-Key was already used for a different request", 422)
+
+        response = Response(stored.body, status=stored.status, headers=stored.headers)
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    @app.after_request
+    def store_idempotent_response(response):
+        key = g.pop("idempotency_key", None)
+        if key is None:
+            return response
+        store = get_idempotency_store()
+        if response.status_code >= 500 or response.is_streamed:
+            store.release(key)
+            return response
+        headers = [(name, value) for name, value in response.headers.items() if name.lower() != "content-length"]
+        store.complete(key, StoredResponse(response.status_code, headers, response.get_data()))
+        return response
+
+    @app.teardown_request
+    def release_idempotency_key(exc):
+        # Still set only when the view raised before a response was made
+        key = g.pop("idempotency_key", None)
+        if key is not None:
+            get_idempotency_store().release(key)
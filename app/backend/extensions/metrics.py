@@ -0,0 +1,96 @@
+import os
+import time
+
+from flask import Flask, Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+# Latency buckets in seconds; call-center analyses can run for minutes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 180)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, until the view returns",
+    ["blueprint", "endpoint", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "http_requests",
+    "Requests handled",
+    ["blueprint", "endpoint", "method", "status"],
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    ["blueprint"],
+    # Summed over live gunicorn workers only
+    multiprocess_mode="livesum",
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes",
+    "Request body size",
+    ["blueprint", "endpoint"],
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size as sent, after compression; streamed responses are not counted",
+    ["blueprint", "endpoint"],
+    buckets=SIZE_BUCKETS,
+)
+
+def request_labels():
+    # Unmatched URLs share one label so 404 scans cannot blow up the series count
+    return request.blueprint or "app", request.endpoint or "unmatched"
+
+def metrics_view():
+    """Prometheus text exposition of the metrics of every worker"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+def init_metrics(app: Flask) -> None:
+    """
+    Record per-blueprint and per-endpoint request metrics and serve them on /metrics
+
+    Under gunicorn, PROMETHEUS_MULTIPROC_DIR must be set before the app is imported so every
+    worker writes its samples there; gunicorn.conf.py takes care of that. Register this before
+    other after_request hooks (such as compression) so response sizes are measured as sent.
+    """
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+
+    @app.before_request
+    def start_timer():
+        if request.endpoint == "metrics":
+            return
+        blueprint, endpoint = request_labels()
+        g.metrics_start = time.perf_counter()
+        g.metrics_in_flight = blueprint
+        IN_FLIGHT.labels(blueprint).inc()
+        if request.content_length:
+            REQUEST_SIZE.labels(blueprint, endpoint).observe(request.content_length)
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        blueprint, endpoint = request_labels()
+        labels = (blueprint, endpoint, request.method, str(response.status_code))
+        REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - start)
+        REQUESTS.labels(*labels).inc()
+        if not response.is_streamed and response.content_length is not None:
+            RESPONSE_SIZE.labels(blueprint, endpoint).observe(response.content_length)
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        # Runs even when after_request was skipped by an unhandled error
+        blueprint = g.pop("metrics_in_flight", None)
+        if blueprint is not None:
+            IN_FLIGHT.labels(blueprint).dec()
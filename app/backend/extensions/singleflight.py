@@ -0,0 +1,72 @@
+import os
+from functools import wraps
+
+from flask import Flask, Response, g, request
+from prometheus_client import Counter
+
+from services.singleflight import get_single_flight
+
+DEFAULT_BLUEPRINTS = "participants,jobs,sessions,job_matches"
+
+COALESCED_REQUESTS = Counter(
+    "singleflight_coalesced_requests",
+    "GET requests answered with the response of an identical request already in flight",
+    ["endpoint"],
+)
+
+def request_key():
+    """Route plus normalized parameters: path arguments and query arguments in sorted order"""
+    return (
+        request.endpoint,
+        tuple(sorted(request.view_args.items())),
+        tuple(sorted(request.args.items(multi=True))),
+    )
+
+def _capture(app: Flask, view, view_args):
+    response = app.make_response(view(**view_args))
+    # The leader always answers with its own response object
+    g.singleflight_response = response
+    if response.is_streamed or response.direct_passthrough:
+        return None
+    headers = [(name, value) for name, value in response.headers.items() if name.lower() != "content-length"]
+    return response.status_code, headers, response.get_data()
+
+def coalesce_view(app: Flask, flight, endpoint: str, view):
+    @wraps(view)
+    def coalesced(**view_args):
+        if request.method != "GET":
+            return view(**view_args)
+
+        shared = flight.do(request_key(), lambda: _capture(app, view, view_args))
+        leader_response = g.pop("singleflight_response", None)
+        if leader_response is not None:
+            return leader_response
+        if shared is None:
+            # The leader's response was streamed and cannot be shared
+            return view(**view_args)
+
+        COALESCED_REQUESTS.labels(endpoint).inc()
+        status, headers, body = shared
+        return Response(body, status=status, headers=headers)
+
+    coalesced.singleflight = True
+    return coalesced
+
+def init_singleflight(app: Flask) -> None:
+    """
+    Share one in-flight computation between identical concurrent GET requests
+
+    Wraps the GET views of the blueprints in SINGLEFLIGHT_BLUEPRINTS. Requests with the same
+    endpoint, path arguments and query arguments that arrive while one is being computed wait for
+    it and get a copy of its response. Call after the blueprints are registered.
+    """
+    blueprints = {name.strip() for name in os.environ.get("SINGLEFLIGHT_BLUEPRINTS", DEFAULT_BLUEPRINTS).split(",")}
+    flight = get_single_flight("responses")
+
+    for rule in app.url_map.iter_rules():
+        if "GET" not in rule.methods or rule.endpoint.split(".")[0] not in blueprints:
+            continue
+        view = app.view_functions[rule.endpoint]
+        if getattr(view, "singleflight", False):
+            continue
+        app.view_functions[rule.endpoint] = coalesce_view(app, flight, rule.endpoint, view)
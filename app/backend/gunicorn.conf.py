@@ -0,0 +1,24 @@
+# Gunicorn settings picked up automatically when gunicorn is started from app/backend.
+# Command-line flags (bind, workers, timeout) in the Dockerfile still take precedence.
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+# Workers write their metrics here so /metrics can aggregate across all of them
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+# Sync workers each serve one request, so admission limits and request coalescing only work
+# when shared between them
+os.environ.setdefault("ADMISSION_BACKEND", "file")
+os.environ.setdefault("SINGLEFLIGHT_BACKEND", "file")
+
+def on_starting(server):
+    # Samples left by a previous run would be added to this one
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+def child_exit(server, worker):
+    # Drop the live gauges of workers that exited
+    multiprocess.mark_process_dead(worker.pid)
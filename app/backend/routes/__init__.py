@@ -14,7 +14,7 @@ job_matches_bp = Blueprint('job_matches', __name__)
 
 # Import route definitions to register them with the blueprints
 # Make sure test package has an __init__.py file to make it a proper package
-from .test import health, api, pokemon, call_center
+from .test import health, api, pokemon, call_center, uploads
 
 from . import participants
 from . import sessions
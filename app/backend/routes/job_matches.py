@@ -5,13 +5,18 @@ import json
 from . import job_matches_bp
 from db.repositories.job_repository import JobRepository
 from db.repositories.job_match_repository import JobMatchRepository
-from db.models.job_match import JobMatchStatus, MatchSource
+from db.repositories import LazyRepository
+from db.models.job_match import (
+    JobMatch, JobMatchCreateRequest, JobMatchStatus, JobMatchStatusUpdate, JobMatchUpdate, MatchSource
+)
+from extensions.validation import body_fields, model_response, parse_body
 # Import the job matching service
+from services.job_matches.catalogue import catalogue_job, get_job_catalogue
 from services.job_matches.main import run as run_job_matching_service
 
-# Initialize the repositories
-job_repository = JobRepository()
-job_match_repository = JobMatchRepository()
+# Initialize the repositories; they connect to Cosmos DB on first use
+job_repository = LazyRepository(JobRepository)
+job_match_repository = LazyRepository(JobMatchRepository)
 
 # Routes
 @job_matches_bp.route('', methods=['GET'])
@@ -21,39 +26,36 @@ def get_job_matches():
     participant_id = request.args.get('participantId')
     job_id = request.args.get('jobId')
     status = request.args.get('status')
+    # Matches moved to job_matches_archive are only listed when asked for
+    include_archived = request.args.get('includeArchived') == 'true'
     
     # Determine which repository method to use based on filters
     if participant_id:
-        matches = job_match_repository.get_job_matches_for_participant(participant_id)
+        matches = job_match_repository.get_job_matches_for_participant(participant_id, include_archived)
     elif job_id:
-        matches = job_match_repository.get_job_matches_for_job(job_id)
+        matches = job_match_repository.get_job_matches_for_job(job_id, include_archived)
     elif status:
-        matches = job_match_repository.get_job_matches_by_status(status)
+        matches = job_match_repository.get_job_matches_by_status(status, include_archived)
     else:
-        matches = job_match_repository.get_all_job_matches()
+        matches = job_match_repository.get_all_job_matches(include_archived=include_archived)
         
-    return jsonify(matches)
+    return model_response(JobMatch, matches)
 
 @job_matches_bp.route('/<match_id>', methods=['GET'])
 def get_job_match(match_id):
     """Get a specific job match by ID"""
-    match = job_match_repository.get_job_match(match_id)
+    match = job_match_repository.get_job_match(match_id, request.args.get('includeArchived') == 'true')
     
     if not match:
         return jsonify({"error": "Job match not found"}), 404
     
-    return jsonify(match)
+    return model_response(JobMatch, match)
 
 @job_matches_bp.route('', methods=['POST'])
 def create_job_match():
     """Create job match between participant and job"""
-    data = request.json
-    
-    # Validate required fields
-    required_fields = ["participantId", "jobId"]
-    for field in required_fields:
-        if field not in data:
-            return jsonify({"error": f"Missing required field: {field}"}), 400
+    # Validate the body; a missing or mistyped field is answered with a 400
+    data = body_fields(parse_body(JobMatchCreateRequest))
     
     # Set default status if not provided
     if "status" not in data:
@@ -76,12 +78,12 @@ def create_job_match():
     
     # Use repository to create the job match
     created_match = job_match_repository.create_job_match(data)
-    return jsonify(created_match), 201
+    return model_response(JobMatch, created_match, 201)
 
 @job_matches_bp.route('/<match_id>', methods=['PUT'])
 def update_job_match(match_id):
     """Update job match data"""
-    data = request.json
+    data = body_fields(parse_body(JobMatchUpdate))
     
     # Check if match exists
     existing_match = job_match_repository.get_job_match(match_id)
@@ -94,31 +96,43 @@ def update_job_match(match_id):
     if not updated_match:
         return jsonify({"error": "Failed to update job match"}), 500
     
-    return jsonify(updated_match)
+    return model_response(JobMatch, updated_match)
 
 @job_matches_bp.route('/<match_id>/status', methods=['PUT'])
 def update_job_match_status(match_id):
     """Update job match status"""
-    data = request.json
-    
-    # Validate required field
-    if "status" not in data:
-        return jsonify({"error": "Missing required field: status"}), 400
-    
-    # Get optional notes
-    notes = data.get("notes")
+    body = parse_body(JobMatchStatusUpdate)
     
     # Update status using repository
     updated_match = job_match_repository.update_job_match_status(
         match_id,
-        data["status"],
-        notes
+        body.status,
+        body.notes
     )
     
     if not updated_match:
         return jsonify({"error": "Failed to update job match status"}), 500
     
-    return jsonify(updated_match)
+    return model_response(JobMatch, updated_match)
+
+@job_matches_bp.route('/<match_id>/history', methods=['GET'])
+def get_job_match_history(match_id):
+    """Get a page of a job match's status history, newest first"""
+    # Pass the previous page's nextBefore as before to get the next one
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        before = int(request.args['before']) if request.args.get('before') else None
+    except ValueError:
+        return jsonify({"error": "limit and before must be integers"}), 400
+    
+    history = job_match_repository.get_status_history(
+        match_id, limit, before, request.args.get('includeArchived') == 'true'
+    )
+    
+    if not history:
+        return jsonify({"error": "Job match not found"}), 404
+    
+    return jsonify(history)
 
 @job_matches_bp.route('/suggestions/<participant_id>', methods=['GET'])
 def get_job_suggestions(participant_id):
@@ -137,51 +151,21 @@ def get_job_suggestions(participant_id):
     # Run job matching service using participant profile
     matching_results = run_job_matching_service(participant)
     
-    # Transform results to expected format
-    suggested_jobs = []
-    
-    # Extract participant attributes used in the analysis
-    participant_attributes = extract_relevant_participant_attributes(participant)
-    
-    for match in matching_results.get('matches', []):
-        job_details = match.get('job_details', {})
-        job_id = job_details.get('id')
-        match_score = int(match.get('match_score', 0) * 6.5)  # Scale match score to 0-100 range
-        
-        # Fetch complete job data from repository to access all fields
-        complete_job = job_match_repository._get_job(job_id) or job_details
-        
-        # Create job object with required fields
-        job = {
-            "id": job_id,
-            "title": job_details.get('title', ''),
-            "employer": job_details.get('employer', ''),
-            "location": job_details.get('location', ''),
-            "employmentType": job_details.get('employmentType', ''),
-            "shortDescription": job_details.get('description', '')[:200] + '...' if job_details.get('description') else '',
-            "matchScore": match_score,
-            "compatibilityElements": [],
-            "participantAttributesUsed": participant_attributes
-        }
-        
-        # Generate compatibility elements based on participant and job data
-        compatibility_elements = generate_compatibility_elements(participant, complete_job, match_score)
-        job["compatibilityElements"] = compatibility_elements[:5]  # Limit to 5 elements
-        
-        suggested_jobs.append(job)
-    
-    # Limit results as requested
-    suggested_jobs = suggested_jobs[:limit]
+    # Take the jobs from the worker's catalogue; only jobs created since it was built are read
+    catalogue = get_job_catalogue()
+    complete_jobs = {
+        job_id: catalogue.get(job_id) or job_match_repository._get_job(job_id)
+        for job_id in suggested_job_ids(matching_results)
+    }
     
-    # Sort by match score (highest first)
-    suggested_jobs.sort(key=lambda x: x.get("matchScore", 0), reverse=True)
+    suggested_jobs = build_job_suggestions(participant, matching_results, complete_jobs, limit)
     
     return jsonify(suggested_jobs)
 
 @job_matches_bp.route('/create-suggestion/<participant_id>/<job_id>', methods=['POST'])
 def create_job_suggestion(participant_id, job_id):
     """Create a system-suggested job match"""
-    # Get job and participant
+    # Get job and participant; the point read, not the worker's catalogue, so a deleted job is not found
     job = job_match_repository._get_job(job_id)
     participant = job_match_repository._get_participant(participant_id)
     
@@ -245,12 +229,12 @@ def create_job_suggestion(participant_id, job_id):
     
     # Create the match
     created_match = job_match_repository.create_job_match(match_data)
-    return jsonify(created_match), 201
+    return model_response(JobMatch, created_match, 201)
 
 @job_matches_bp.route('/compatibility/<participant_id>/<job_id>', methods=['GET'])
 def calculate_job_compatibility(participant_id, job_id):
     """Calculate compatibility between a participant and job"""
-    # Get job and participant
+    # Get job and participant; the point read, not the worker's catalogue, so a deleted job is not found
     job = job_match_repository._get_job(job_id)
     participant = job_match_repository._get_participant(participant_id)
     
@@ -297,6 +281,53 @@ def calculate_job_compatibility(participant_id, job_id):
     
     return jsonify(compatibility)
 
+def suggested_job_ids(matching_results):
+    """IDs of the jobs returned by the job matching service"""
+    return [match.get('job_details', {}).get('id') for match in matching_results.get('matches', [])]
+
+def build_job_suggestions(participant, matching_results, complete_jobs, limit):
+    """Transform job matching service results into job suggestions for a participant"""
+    # Transform results to expected format
+    suggested_jobs = []
+    
+    # Extract participant attributes used in the analysis
+    participant_attributes = extract_relevant_participant_attributes(participant)
+    
+    for match in matching_results.get('matches', []):
+        job_details = match.get('job_details', {})
+        job_id = job_details.get('id')
+        match_score = int(match.get('match_score', 0) * 6.5)  # Scale match score to 0-100 range
+        
+        # Fall back to the search result when the job is missing from the repository
+        complete_job = complete_jobs.get(job_id) or job_details
+        
+        # Create job object with required fields
+        job = {
+            "id": job_id,
+            "title": job_details.get('title', ''),
+            "employer": job_details.get('employer', ''),
+            "location": job_details.get('location', ''),
+            "employmentType": job_details.get('employmentType', ''),
+            "shortDescription": job_details.get('description', '')[:200] + '...' if job_details.get('description') else '',
+            "matchScore": match_score,
+            "compatibilityElements": [],
+            "participantAttributesUsed": participant_attributes
+        }
+        
+        # Generate compatibility elements based on participant and job data
+        compatibility_elements = generate_compatibility_elements(participant, complete_job, match_score)
+        job["compatibilityElements"] = compatibility_elements[:5]  # Limit to 5 elements
+        
+        suggested_jobs.append(job)
+    
+    # Limit results as requested
+    suggested_jobs = suggested_jobs[:limit]
+    
+    # Sort by match score (highest first)
+    suggested_jobs.sort(key=lambda x: x.get("matchScore", 0), reverse=True)
+    
+    return suggested_jobs
+
 def extract_relevant_participant_attributes(participant):
     """
     Extract the relevant participant attributes used in the matching analysis
@@ -329,21 +360,22 @@ def generate_compatibility_elements(participant, job, match_score):
     
     Args:
         participant: The participant data dictionary
-        job: The job data dictionary
+        job: The job, as a catalogue record or a job document
         match_score: The overall match score (0-100)
         
     Returns:
         List of compatibility elements
     """
+    job = catalogue_job(job)
     compatibility_elements = []
     base_score = max(15, min(95, int(match_score * 0.9)))
-    job_description = job.get('description', '').lower()
+    job_description = job.description
     
     # 1. Location Compatibility
     participant_locations = participant.get('preferredLocations', [])
-    job_location = job.get('location', '')
+    job_location = job.location
     if job_location and participant_locations:
-        location_match = any(location.lower() in job_location.lower() or job_location.lower() in location.lower() 
+        location_match = any(location.lower() in job_location or job_location in location.lower() 
                              for location in participant_locations)
         if location_match:
             compatibility_elements.append({
@@ -366,9 +398,9 @@ def generate_compatibility_elements(participant, job, match_score):
     
     # 2. Industry Match
     participant_industries = participant.get('preferredIndustries', [])
-    job_industry = job.get('industry', '')
+    job_industry = job.industry
     if job_industry and participant_industries:
-        industry_match = any(industry.lower() in job_industry.lower() or job_industry.lower() in industry.lower() 
+        industry_match = any(industry.lower() in job_industry or job_industry in industry.lower() 
                              for industry in participant_industries)
         if industry_match:
             compatibility_elements.append({
@@ -380,8 +412,8 @@ def generate_compatibility_elements(participant, job, match_score):
     
     # 3. Employment Type Match
     desired_hours = participant.get('desiredHours', '').lower()
-    job_type = job.get('employmentType', '').lower()
-    hours_per_week = job.get('hoursPerWeek', {})
+    job_type = job.employment_type
+    hours_per_week = job.hours_per_week
     
     if job_type and desired_hours:
         employment_match = False
@@ -398,8 +430,7 @@ def generate_compatibility_elements(participant, job, match_score):
                 "reasoning": f"Job's {job_type} schedule aligns with participant's desired hours"
             })
         elif hours_per_week:
-            min_hours = hours_per_week.get('min', 0)
-            max_hours = hours_per_week.get('max', 40)
+            min_hours, max_hours = hours_per_week
             hours_match = False
             
             # Extract numeric ranges from desired_hours
@@ -425,11 +456,11 @@ def generate_compatibility_elements(participant, job, match_score):
     if participant.get('skills', {}).get('soft'):
         participant_skills.extend(participant.get('skills', {}).get('soft', []))
     
-    job_skills = job.get('requiredSkills', [])
+    job_skills = job.required_skills
     
     if participant_skills and job_skills:
         matching_skills = [skill for skill in participant_skills 
-                          if any(job_skill.lower() in skill.lower() or skill.lower() in job_skill.lower() 
+                          if any(job_skill in skill.lower() or skill.lower() in job_skill 
                                 for job_skill in job_skills)]
         
         if matching_skills:
@@ -442,11 +473,11 @@ def generate_compatibility_elements(participant, job, match_score):
     
     # 5. Accommodations Match
     participant_accommodations = participant.get('accommodationsNeeded', [])
-    job_accommodations = job.get('availableAccommodations', [])
+    job_accommodations = job.available_accommodations
     
     if participant_accommodations and job_accommodations:
         matching_accommodations = [acc for acc in participant_accommodations 
-                                  if any(job_acc.lower() in acc.lower() or acc.lower() in job_acc.lower() 
+                                  if any(job_acc in acc.lower() or acc.lower() in job_acc 
                                         for job_acc in job_accommodations)]
         
         if matching_accommodations:
@@ -459,7 +490,7 @@ def generate_compatibility_elements(participant, job, match_score):
     
     # 6. Supportive Environment
     disability_type = participant.get('disabilityType', '').lower()
-    supportive_env = job.get('supportiveEnvironment', [])
+    supportive_env = job.supportive_environment
     
     if disability_type and supportive_env:
         relevant_support = []
@@ -476,9 +507,9 @@ def generate_compatibility_elements(participant, job, match_score):
         else:
             keywords = ['training', 'inclusive', 'supportive', 'mentoring']
             
-        for support in supportive_env:
-            if any(keyword in support.lower() for keyword in keywords):
-                relevant_support.append(support)
+        for support, support_text in zip(supportive_env, job.supportive_environment_text):
+            if any(keyword in support for keyword in keywords):
+                relevant_support.append(support_text)
                 
         if relevant_support:
             compatibility_elements.append({
@@ -491,13 +522,8 @@ def generate_compatibility_elements(participant, job, match_score):
     # 7. Employment Goal Match
     employment_goal = participant.get('employmentGoal', '').lower()
     if employment_goal:
-        job_title = job.get('title', '').lower()
-        job_industry = job.get('industry', '').lower()
-        job_department = job.get('department', '').lower()
-        
         goal_keywords = employment_goal.split()
-        goal_match = any(keyword in job_title or keyword in job_industry or keyword in job_department 
-                         for keyword in goal_keywords if len(keyword) > 3)
+        goal_match = any(keyword in job.role_text for keyword in goal_keywords if len(keyword) > 3)
         
         if goal_match:
             compatibility_elements.append({
@@ -509,7 +535,7 @@ def generate_compatibility_elements(participant, job, match_score):
     
     # 8. Accessibility Features
     participant_disability = participant.get('disabilityType', '').lower()
-    job_accessibility = job.get('accessibilityFeatures', [])
+    job_accessibility = job.accessibility_features
     
     if participant_disability and job_accessibility:
         relevant_features = []
@@ -524,9 +550,9 @@ def generate_compatibility_elements(participant, job, match_score):
         else:
             keywords = ['accessible', 'rest areas', 'quiet space', 'accommodations']
             
-        for feature in job_accessibility:
-            if any(keyword in feature.lower() for keyword in keywords):
-                relevant_features.append(feature)
+        for feature, feature_text in zip(job_accessibility, job.accessibility_features_text):
+            if any(keyword in feature for keyword in keywords):
+                relevant_features.append(feature_text)
                 
         if relevant_features:
             compatibility_elements.append({
@@ -538,20 +564,20 @@ def generate_compatibility_elements(participant, job, match_score):
     
     # 9. Schedule Flexibility
     participant_accommodations = [acc.lower() for acc in participant.get('accommodationsNeeded', [])]
-    job_schedule = job.get('schedule', [])
+    job_schedule = job.schedule
     
     schedule_needs = any('schedule' in acc or 'routine' in acc or 'break' in acc 
                           or 'hour' in acc or 'time' in acc for acc in participant_accommodations)
     
     if schedule_needs and job_schedule:
         schedule_matches = []
-        for schedule_item in job_schedule:
-            if 'flexible' in schedule_item.lower():
+        for schedule_item, schedule_text in zip(job_schedule, job.schedule_text):
+            if 'flexible' in schedule_item:
                 schedule_matches.append('flexible scheduling')
-            if 'break' in schedule_item.lower():
+            if 'break' in schedule_item:
                 schedule_matches.append('regular breaks')
-            if any(time_period in schedule_item.lower() for time_period in ['morning', 'afternoon', 'evening']):
-                schedule_matches.append(f"{schedule_item} available")
+            if any(time_period in schedule_item for time_period in ['morning', 'afternoon', 'evening']):
+                schedule_matches.append(f"{schedule_text} available")
                 
         if schedule_matches:
             compatibility_elements.append({
@@ -565,9 +591,6 @@ def generate_compatibility_elements(participant, job, match_score):
     work_history = participant.get('workHistory', [])
     
     if work_history:
-        job_title = job.get('title', '').lower()
-        job_industry = job.get('industry', '').lower()
-        job_department = job.get('department', '').lower()
         relevant_experience = []
         
         for work in work_history:
@@ -575,8 +598,7 @@ def generate_compatibility_elements(participant, job, match_score):
             employer = work.get('employer', '').lower()
             resp = ' '.join(work.get('responsibilities', [])).lower()
             
-            if any(keyword in job_title or keyword in job_industry or keyword in job_department 
-                  for keyword in position.split() if len(keyword) > 3):
+            if any(keyword in job.role_text for keyword in position.split() if len(keyword) > 3):
                 relevant_experience.append(f"similar role at {work.get('employer')}")
             elif any(resp_keyword in job_description for resp_keyword in resp.split() if len(resp_keyword) > 3):
                 relevant_experience.append(f"relevant responsibilities at {work.get('employer')}")
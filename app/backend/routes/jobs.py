@@ -4,9 +4,10 @@ import uuid
 import json
 from . import jobs_bp
 from db.repositories.job_repository import JobRepository
+from db.repositories import LazyRepository
 
-# Initialize the job repository
-job_repository = JobRepository()
+# Initialize the job repository; it connects to Cosmos DB on first use
+job_repository = LazyRepository(JobRepository)
 
 # Routes
 @jobs_bp.route('', methods=['GET'])
@@ -4,9 +4,14 @@ import uuid
 import json
 from . import participants_bp
 from db.repositories.participant_repository import ParticipantRepository
+from db.repositories import LazyRepository
+from db.models.participant import (
+    JobMatch, Participant, ParticipantCreateRequest, ParticipantPreview, ParticipantUpdate
+)
+from extensions.validation import body_fields, model_response, parse_body
 
-# Initialize the participant repository
-participant_repository = ParticipantRepository()
+# Initialize the participant repository; it connects to Cosmos DB on first use
+participant_repository = LazyRepository(ParticipantRepository)
 
 # Routes
 @participants_bp.route('', methods=['GET'])
@@ -26,7 +31,7 @@ def get_participants():
         coach_id=coach_id
     )
     
-    return jsonify(participants)
+    return model_response(ParticipantPreview, participants)
 
 @participants_bp.route('/<participant_id>', methods=['GET'])
 def get_participant(participant_id):
@@ -36,26 +41,21 @@ def get_participant(participant_id):
     if not participant:
         return jsonify({"error": "Participant not found"}), 404
     
-    return jsonify(participant)
+    return model_response(Participant, participant)
 
 @participants_bp.route('', methods=['POST'])
 def create_participant():
     """Create a new participant"""
-    data = request.json
-    
-    # Validate required fields (minimal validation)
-    required_fields = ["firstName", "lastName", "email", "disabilityType", "currentStatus"]
-    for field in required_fields:
-        if field not in data:
-            return jsonify({"error": f"Missing required field: {field}"}), 400
+    # Validate the body; a missing or mistyped field is answered with a 400
+    data = body_fields(parse_body(ParticipantCreateRequest))
     
     # Ensure fullName is created if not provided
-    if "fullName" not in data:
+    if not data.get("fullName"):
         data["fullName"] = f"{data['firstName']} {data['lastName']}"
     
     # Use repository to create the participant
     created_participant = participant_repository.create_participant(data)
-    return jsonify(created_participant), 201
+    return model_response(Participant, created_participant, 201)
 
 @participants_bp.route('/<participant_id>', methods=['PUT'])
 def update_participant(participant_id):
@@ -66,7 +66,7 @@ def update_participant(participant_id):
     if not existing_participant:
         return jsonify({"error": "Participant not found"}), 404
     
-    data = request.json
+    data = body_fields(parse_body(ParticipantUpdate))
     
     # Update participant using repository
     updated_participant = participant_repository.update_participant(participant_id, data)
@@ -74,7 +74,7 @@ def update_participant(participant_id):
     if not updated_participant:
         return jsonify({"error": "Failed to update participant"}), 500
     
-    return jsonify(updated_participant)
+    return model_response(Participant, updated_participant)
 
 @participants_bp.route('/<participant_id>', methods=['DELETE'])
 def delete_participant(participant_id):
@@ -116,5 +116,7 @@ def get_participant_job_matches(participant_id):
         return jsonify({"error": "Participant not found"}), 404
     
     # Get job matches using repository
-    job_matches = participant_repository.get_participant_job_matches(participant_id)
-    return jsonify(job_matches)
+    job_matches = participant_repository.get_participant_job_matches(
+        participant_id, request.args.get('includeArchived') == 'true'
+    )
+    return model_response(JobMatch, job_matches)
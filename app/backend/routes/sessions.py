@@ -3,10 +3,11 @@ from datetime import datetime
 import uuid
 import json
 from . import sessions_bp
-from db.repositories.session_repository import SessionRepository
+from db.repositories.session_repository import OBSERVATION_SUMMARY_FIELDS, SessionRepository
+from db.repositories import LazyRepository
 
-# Initialize the session repository
-session_repository = SessionRepository()
+# Initialize the session repository; it connects to Cosmos DB on first use
+session_repository = LazyRepository(SessionRepository)
 
 # Routes
 
@@ -31,8 +32,8 @@ def get_sessions():
 
 @sessions_bp.route('/<session_id>', methods=['GET'])
 def get_session(session_id):
-    """Get a specific session by ID"""
-    session = session_repository.get_session(session_id)
+    """Get a specific session by ID; an optional participantId query parameter saves a fan-out lookup"""
+    session = session_repository.get_session(session_id, request.args.get('participantId'))
     
     if not session:
         return jsonify({"error": "Session not found"}), 404
@@ -84,16 +85,34 @@ def create_session():
 def update_session(session_id):
     """Update an existing session"""
     # Check if session exists
-    existing_session = session_repository.get_session(session_id)
+    existing_session = session_repository.get_session(session_id, request.args.get('participantId'))
     
     if not existing_session:
         return jsonify({"error": "Session not found"}), 404
     
+    # Move observations the session still keeps inline first, so replacing it cannot drop them
+    existing_session = session_repository.move_inline_observations(existing_session)
+    if not existing_session:
+        return jsonify({"error": "Failed to update session"}), 500
+    
     data = request.json
     
     # Ensure ID is not changed
     data['id'] = session_id
     
+    # participantId is the partition key of the migrated sessions container, so it cannot change either
+    data['participantId'] = existing_session.get('participantId')
+    
+    # The session keeps no notes text: notes sent here are added as an observation, like POST
+    # /observations, so the next analysis includes them. The summary is maintained by those writes.
+    notes = data.pop('notes', None)
+    data.pop('observations', None)
+    if notes and not session_repository.add_notes(existing_session, notes):
+        return jsonify({"error": "Failed to update session"}), 500
+    for field in OBSERVATION_SUMMARY_FIELDS:
+        if field in existing_session:
+            data[field] = existing_session[field]
+    
     # Update session using repository
     updated_session = session_repository.update_session(session_id, data)
     
@@ -106,24 +125,41 @@ def update_session(session_id):
 def delete_session(session_id):
     """Delete a session"""
     # Check if session exists
-    existing_session = session_repository.get_session(session_id)
+    existing_session = session_repository.get_session(session_id, request.args.get('participantId'))
     
     if not existing_session:
         return jsonify({"error": "Session not found"}), 404
     
     # Delete session using repository
-    result = session_repository.delete_session(session_id)
+    result = session_repository.delete_session(session_id, existing_session.get('participantId'))
     
     if not result:
         return jsonify({"error": "Failed to delete session"}), 500
     
     return jsonify({"message": "Session deleted successfully"}), 200
 
+@sessions_bp.route('/<session_id>/observations', methods=['GET'])
+def get_observations(session_id):
+    """Get a page of a session's observations, oldest first"""
+    # Pass the previous page's nextAfter as after to get the next one
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        after = int(request.args.get('after', 0))
+    except ValueError:
+        return jsonify({"error": "limit and after must be integers"}), 400
+    
+    page = session_repository.get_observations(session_id, limit, after, request.args.get('participantId'))
+    
+    if not page:
+        return jsonify({"error": "Session not found"}), 404
+    
+    return jsonify(page)
+
 @sessions_bp.route('/<session_id>/observations', methods=['POST'])
 def add_observations(session_id):
     """Add observations to a session"""
     # Check if session exists
-    existing_session = session_repository.get_session(session_id)
+    existing_session = session_repository.get_session(session_id, request.args.get('participantId'))
     
     if not existing_session:
         return jsonify({"error": "Session not found"}), 404
@@ -135,7 +171,7 @@ def add_observations(session_id):
         return jsonify({"error": "Missing required field: notes"}), 400
     
     # Use repository to add observations (notes only)
-    updated_session = session_repository.add_observations(session_id, data)
+    updated_session = session_repository.add_observations(session_id, data, existing_session.get('participantId'))
     
     if not updated_session:
         return jsonify({"error": "Failed to add observations"}), 500
@@ -146,13 +182,13 @@ def add_observations(session_id):
 def generate_analysis(session_id):
     """Generate AI analysis for a session"""
     # Check if session exists
-    existing_session = session_repository.get_session(session_id)
+    existing_session = session_repository.get_session(session_id, request.args.get('participantId'))
     
     if not existing_session:
         return jsonify({"error": "Session not found"}), 404
     
     # Use repository to generate analysis
-    analysis_result = session_repository.generate_analysis(session_id)
+    analysis_result = session_repository.generate_analysis(session_id, participant_id=existing_session.get('participantId'))
     
     if isinstance(analysis_result, dict) and "error" in analysis_result:
         return jsonify(analysis_result), 400
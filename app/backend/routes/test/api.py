@@ -1,6 +1,7 @@
 import logging
-from flask import jsonify
+from flask import jsonify, request
 from .. import api_bp  # Import from parent package
+from services.health.probes import get_dependency_probes
 
 logger = logging.getLogger(__name__)
 
@@ -12,4 +13,20 @@ def health_check():
         'services': {
             'api': 'available'
         }
-    })
\ No newline at end of file
+    })
+
+@api_bp.route('/health/live', methods=['GET'])
+def liveness():
+    """Liveness probe: the worker is up and serving requests; dependencies are not checked"""
+    return jsonify({'status': 'alive'})
+
+@api_bp.route('/health/ready', methods=['GET'])
+def readiness():
+    """
+    Readiness probe: 200 when every required dependency answers within its latency budget, 503 otherwise
+
+    Results are cached for HEALTH_CACHE_SECONDS; pass refresh=true to probe again immediately.
+    """
+    report = get_dependency_probes().check(refresh=request.args.get('refresh') == 'true')
+    report['status'] = 'ready' if report['ready'] else 'not-ready'
+    return jsonify(report), 200 if report['ready'] else 503
@@ -1,11 +1,18 @@
 import logging
 import json
-from flask import jsonify, request
+from flask import Response, jsonify, request, stream_with_context
 from .. import call_center_bp
-from services.call_center.main import run
+from extensions.admission import AdmissionRejected, admitted
+from services.call_center.cache import AnalysisInProgress
+from services.call_center.output import MIMETYPES, OUTPUT_FORMATS, render
+from services.uploads.storage import get_upload_manager
 
 logger = logging.getLogger(__name__)
 
+# Admission limit held while an analysis runs or is waited for in another worker; cache hits
+# are answered without it
+ANALYSIS_LIMIT = "call_center.analysis"
+
 def validate_call_center_data(data):
     """
     Validates the call center request data.
@@ -15,8 +22,8 @@ def validate_call_center_data(data):
         return False, "No data provided", 400
         
     # Check for required field
-    if not data.get('input_audio_url'):
-        return False, "input_audio_url is required and cannot be empty", 400
+    if not data.get('input_audio_url') and not data.get('upload_id'):
+        return False, "input_audio_url or upload_id is required and cannot be empty", 400
         
     # Validate optional parameters if provided
     if 'language' in data and not data['language']:
@@ -28,6 +35,24 @@ def validate_call_center_data(data):
     if 'use_stereo' in data and not isinstance(data['use_stereo'], bool):
         return False, "use_stereo must be a boolean", 400
     
+    if 'use_cache' in data and not isinstance(data['use_cache'], bool):
+        return False, "use_cache must be a boolean", 400
+    
+    if 'hash_content' in data and not isinstance(data['hash_content'], bool):
+        return False, "hash_content must be a boolean", 400
+    
+    if 'content_hash' in data and not isinstance(data['content_hash'], str):
+        return False, "content_hash must be a string", 400
+    
+    if 'summary_window_seconds' in data and (
+            isinstance(data['summary_window_seconds'], bool)
+            or not isinstance(data['summary_window_seconds'], (int, float))
+            or data['summary_window_seconds'] <= 0):
+        return False, "summary_window_seconds must be a positive number", 400
+    
+    if 'format' in data and data['format'] not in OUTPUT_FORMATS:
+        return False, f"format must be one of: {', '.join(OUTPUT_FORMATS)}", 400
+    
     return True, None, None
 
 @call_center_bp.route('', methods=['POST'])
@@ -37,9 +62,16 @@ def analyze_call():
     
     Expects JSON payload with the following parameters:
     - input_audio_url: URL to the audio file
+    - upload_id: ID of a completed upload from /api/call-center/uploads, instead of input_audio_url
     - language: Language code for analysis (default: 'en')
     - locale: Locale for transcription (default: 'en-US')
     - use_stereo: Boolean to indicate if audio is stereo (default: False)
+    - use_cache: Boolean to reuse a previous analysis of the same recording (default: True)
+    - content_hash: Hash of the audio bytes to key the cache by content instead of URL (optional)
+    - hash_content: Boolean to download and hash the audio when no content_hash is given (default: False)
+    - summary_window_seconds: Length of the time windows in the sentiment summary (default: 60)
+    - format: Response format, 'json' for the merged transcription or 'ndjson'/'text'
+      to stream one phrase record at a time (default: 'json')
     """
     logger.info("Handling POST request for /api/call-center endpoint")
     
@@ -52,8 +84,14 @@ def analyze_call():
         if not is_valid:
             return jsonify({"error": error_message}), status_code
         
-        # Extract input_audio_url which is required
-        input_audio_url = data['input_audio_url']  # Already validated above
+        # Resolve an uploaded recording to the URL the transcription service fetches it from
+        if data.get('upload_id'):
+            upload = get_upload_manager().get(data['upload_id'])
+            if not upload or upload['status'] != 'completed':
+                return jsonify({"error": "upload_id does not refer to a completed upload"}), 400
+            data['input_audio_url'] = upload['url']
+            # The verified checksum lets the result cache recognise the same recording
+            data.setdefault('content_hash', upload['sha256'])
         
         # Set defaults for optional parameters if not provided
         defaults = {
@@ -65,11 +103,28 @@ def analyze_call():
         # Create a new dict with defaults and update with provided data
         params = {**defaults, **data}
         
+        # Imported on first use; the analysis pipeline pulls in numpy and is not needed at start-up
+        from services.call_center.main import run
+        
         # Call the run function with the parameters
-        result = run(params)
+        result = run(params, guard=admitted(ANALYSIS_LIMIT))
+        
+        output_format = data.get('format', 'json')
+        if output_format == 'json':
+            return jsonify(result)
         
-        return jsonify(result)
+        # Stream phrase records straight to the client instead of encoding one large body
+        return Response(stream_with_context(render(result, output_format)), mimetype=MIMETYPES[output_format])
         
+    except AdmissionRejected:
+        # Answered with 429 and Retry-After by init_admission
+        raise
+    except AnalysisInProgress as e:
+        # The same request sent again is answered from the cache once the running analysis ends
+        response = jsonify({"status": "in_progress", "message": str(e)})
+        response.status_code = 202
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response
     except Exception as e:
         logger.error(f"Error analyzing call: {e}")
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,103 @@
+import logging
+import os
+from flask import jsonify, request, send_file
+from .. import call_center_bp
+from services.uploads.storage import UploadError, get_upload_manager
+
+logger = logging.getLogger(__name__)
+
+def public_base_url():
+    """Base URL the Speech service can reach this API on"""
+    return os.environ.get("PUBLIC_BASE_URL") or request.host_url
+
+def upload_response(upload, status_code=200):
+    response = jsonify(upload)
+    response.status_code = status_code
+    # Lets clients resume with a HEAD request without parsing the body
+    response.headers["Upload-Offset"] = str(upload["offset"])
+    response.headers["Upload-Length"] = str(upload["size"])
+    return response
+
+@call_center_bp.route('/uploads', methods=['POST'])
+def create_upload():
+    """
+    Start a resumable audio upload
+
+    Expects JSON payload with the following parameters:
+    - filename: Original file name
+    - size: Total size of the file in bytes
+    - sha256: Hex SHA-256 of the complete file, verified once all bytes arrive
+    - contentType: MIME type of the audio (default: 'application/octet-stream')
+    """
+    data = request.get_json() or {}
+
+    required_fields = ["filename", "size", "sha256"]
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Missing required field: {field}"}), 400
+
+    if not isinstance(data["size"], int) or isinstance(data["size"], bool):
+        return jsonify({"error": "size must be an integer"}), 400
+
+    try:
+        upload = get_upload_manager().create(
+            data["filename"],
+            data["size"],
+            data["sha256"],
+            data.get("contentType", "application/octet-stream")
+        )
+    except UploadError as e:
+        return jsonify({"error": e.message}), e.status_code
+
+    return upload_response(upload, 201)
+
+@call_center_bp.route('/uploads/<upload_id>', methods=['GET', 'HEAD'])
+def get_upload(upload_id):
+    """Get upload status; Upload-Offset tells the client where to resume"""
+    upload = get_upload_manager().get(upload_id)
+
+    if not upload:
+        return jsonify({"error": "Upload not found"}), 404
+
+    return upload_response(upload)
+
+@call_center_bp.route('/uploads/<upload_id>', methods=['PATCH'])
+def append_upload_chunk(upload_id):
+    """
+    Append the raw request body to an upload
+
+    The Upload-Offset header must match the current offset of the upload. The body is streamed
+    to disk, so chunks can be as large as the client likes. A 503 on the final chunk means the
+    file was received but not yet stored; send an empty chunk at the final offset to retry.
+    """
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return jsonify({"error": "Upload-Offset header is required"}), 400
+
+    try:
+        upload = get_upload_manager().write_chunk(upload_id, offset, request.stream, public_base_url())
+    except UploadError as e:
+        logger.warning(f"Rejected chunk for upload {upload_id}: {e.message}")
+        return jsonify({"error": e.message}), e.status_code
+
+    return upload_response(upload)
+
+@call_center_bp.route('/uploads/<upload_id>/content', methods=['GET'])
+def get_upload_content(upload_id):
+    """Serve a completed upload stored by the local blob backend"""
+    upload = get_upload_manager().get(upload_id)
+    path = get_upload_manager().blob_store.local_path(upload_id) if upload else None
+
+    if not upload or upload["status"] != "completed" or not path:
+        return jsonify({"error": "Upload not found"}), 404
+
+    return send_file(path, mimetype=upload["contentType"], conditional=True)
+
+@call_center_bp.route('/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Delete an upload and its stored audio"""
+    if not get_upload_manager().delete(upload_id):
+        return jsonify({"error": "Upload not found"}), 404
+
+    return jsonify({"message": "Upload deleted successfully"}), 200
@@ -1,12 +1,41 @@
 import logging
 from flask import Flask, jsonify
 from flask_cors import CORS
+from extensions.json_provider import OrjsonProvider
+from extensions.compression import init_compression
+from extensions.metrics import init_metrics
+from extensions.cosmos_accounting import init_cosmos_accounting
+from extensions.admission import init_admission
+from extensions.singleflight import init_singleflight
+from extensions.idempotency import init_idempotency
+from extensions.validation import init_validation
 
 app = Flask(__name__)
 
+# Serialize responses and parse request bodies with orjson
+app.json = OrjsonProvider(app)
+
 # Configure CORS for specific origins in production for better security
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
+# Per-route latency, status and size metrics on /metrics; registered first so sizes are measured after compression
+init_metrics(app)
+
+# Cosmos DB request charge per request, reported in Server-Timing and exported as metrics
+init_cosmos_accounting(app)
+
+# Concurrency limits for expensive endpoints so they cannot occupy every worker
+init_admission(app)
+
+# Compress large and streamed responses with zstd or gzip
+init_compression(app)
+
+# Idempotency-Key support for create endpoints; after compression so stored bodies are uncompressed
+init_idempotency(app)
+
+# Invalid request bodies are answered with a 400 listing the failing fields
+init_validation(app)
+
 # Configure logging for production monitoring
 logging.basicConfig(level=logging.INFO,  # Set logging level (e.g., INFO, DEBUG, ERROR)
                     format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,6 +45,9 @@ logger = logging.getLogger(__name__)
 from routes import register_routes
 register_routes(app)
 
+# Identical concurrent GETs share one computation
+init_singleflight(app)
+
 # Error handlers for common HTTP errors - improve user experience and logging
 @app.errorhandler(403)
 def forbidden(e):
@@ -0,0 +1,242 @@
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+import requests
+
+# Configuration values that change the outcome of an analysis and therefore take part in the cache key.
+CACHE_KEY_FIELDS = ("input_audio_url", "locale", "language", "use_stereo_audio", "summary_window_seconds")
+
+DEFAULT_CACHE_DIR = ".cache/call_center"
+DEFAULT_MAX_MB = 512
+
+# A running analysis holds an flock on its key's lock file, which the kernel drops if the worker
+# dies. Requests for the same key wait for it at most this long, well under gunicorn's 180 s
+# worker timeout, and are then told to retry.
+DEFAULT_WAIT_SECONDS = 60
+LOCK_POLL_SECONDS = 1.0
+RETRY_AFTER_SECONDS = 30
+
+class AnalysisInProgress(Exception):
+    """Raised when an identical analysis is still running after the wait; retry to get its result"""
+
+    def __init__(self, retry_after: int = RETRY_AFTER_SECONDS):
+        super().__init__("An identical analysis is still running, retry later")
+        self.retry_after = retry_after
+
+def make_cache_key(config: Dict[str, Any], content_hash: Optional[str] = None) -> str:
+    """
+    Build a content-addressed key for an analysis request
+
+    Args:
+        config: The effective call-center configuration
+        content_hash: Optional hash of the audio bytes; it replaces the URL in the key, so a
+            re-uploaded recording at a new URL still hits
+
+    Returns:
+        Hex digest identifying the analysis
+    """
+    material = {field: config.get(field) for field in CACHE_KEY_FIELDS}
+    if content_hash:
+        del material["input_audio_url"]
+        material["content_hash"] = content_hash
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+def hash_audio_content(url: str, chunk_size: int = 1024 * 1024) -> str:
+    """Stream the audio at url and return the SHA-256 of its bytes without holding it in memory"""
+    digest = hashlib.sha256()
+    with requests.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        for block in response.iter_content(chunk_size=chunk_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Persistent store of finished call-center analyses
+
+    Results are kept as one JSON file per key and evicted least-recently-used once the directory
+    grows past max_bytes. Concurrent requests for the same key share one analysis: threads in the
+    same worker wait on a future, other gunicorn workers wait on a lock file in the cache directory.
+    Either wait ends after wait_seconds with AnalysisInProgress.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, wait_seconds: float = DEFAULT_WAIT_SECONDS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def _result_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _lock_path(self, key: str) -> Path:
+        return self.directory / f"{key}.lock"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None on a miss"""
+        path = self._result_path(key)
+        try:
+            with open(path, mode="r") as f:
+                result = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store result under key and evict old entries if the cache is over budget"""
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="w") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, self._result_path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        # Oldest entries go first
+        entries.sort(key=lambda entry: entry[0])
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    def _acquire(self, key: str, deadline: float) -> int:
+        """Lock the key's lock file, waiting for another worker's analysis until deadline; returns its fd"""
+        lock_path = self._lock_path(key)
+        while True:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                while True:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise AnalysisInProgress()
+                        time.sleep(min(LOCK_POLL_SECONDS, remaining))
+                # The previous holder unlinks the file when done; lock the one now at the path
+                try:
+                    if os.stat(lock_path).st_ino == os.fstat(fd).st_ino:
+                        return fd
+                except FileNotFoundError:
+                    pass
+            except BaseException:
+                os.close(fd)
+                raise
+            os.close(fd)
+
+    def _release(self, key: str, fd: int) -> None:
+        # Unlink while still holding the lock, so lock files do not accumulate; a worker waiting
+        # on this one sees it replaced and locks a new file
+        try:
+            self._lock_path(key).unlink()
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]],
+                       guard: Optional[ContextManager] = None) -> Dict[str, Any]:
+        """
+        Return the cached result for key, running compute at most once across concurrent callers
+
+        Args:
+            key: Cache key from make_cache_key
+            compute: Callable producing the result on a miss
+            guard: Optional context manager held while this worker computes the result or waits
+                for another worker computing it, e.g. an admission limit; cache hits skip it
+
+        Returns:
+            The cached or freshly computed result
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        # Attach to an analysis already running in this worker
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            try:
+                return future.result(timeout=self.wait_seconds)
+            except FutureTimeoutError:
+                raise AnalysisInProgress()
+
+        try:
+            with guard or nullcontext():
+                result = self._compute_once(key, compute)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _compute_once(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        # Attach to an analysis already running in another worker
+        fd = self._acquire(key, time.monotonic() + self.wait_seconds)
+        try:
+            # Another worker may have finished between our miss and taking the lock
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            result = compute()
+            self.put(key, result)
+            return result
+        finally:
+            self._release(key, fd)
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide result cache, configured from the environment on first use"""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            directory = os.environ.get("CALL_CENTER_CACHE_DIR", DEFAULT_CACHE_DIR)
+            max_mb = int(os.environ.get("CALL_CENTER_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            wait_seconds = float(os.environ.get("CALL_CENTER_CACHE_WAIT_SECONDS", DEFAULT_WAIT_SECONDS))
+            _result_cache = ResultCache(directory, max_mb * 1024 * 1024, wait_seconds)
+        return _result_cache
@@ -3,18 +3,21 @@
 # Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
 #
 
+from contextlib import nullcontext
 from datetime import datetime
 from functools import reduce
 from http import HTTPStatus
 from itertools import chain
-from json import dumps, loads
 from os import linesep, environ
 from pathlib import Path
 from time import sleep
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import uuid
+from . import cache
 from . import helper
+from . import output
 from . import rest_helper
+from .phrases import PhraseStore
 from dotenv import load_dotenv
 
 # This should not change unless you switch to a new version of the Speech REST API.
@@ -25,9 +28,12 @@ SENTIMENT_ANALYSIS_PATH = "/language/:analyze-text"
 SENTIMENT_ANALYSIS_QUERY = "?api-version=2024-11-01"
 
 # How long to wait while polling batch transcription status.
-WAIT_SECONDS = 10
+# Can be lowered through the environment when running against the local stand-in (tools/speech_stub.py).
+WAIT_SECONDS = float(environ.get("CALL_CENTER_POLL_SECONDS", 10))
 
 class TranscriptionPhrase(object) :
+    __slots__ = ("id", "text", "itn", "lexical", "speaker_number", "offset", "offset_in_ticks")
+
     def __init__(self, id : int, text : str, itn : str, lexical : str, speaker_number : int, offset : str, offset_in_ticks : float) :
         self.id = id
         self.text = text
@@ -38,13 +44,21 @@ class TranscriptionPhrase(object) :
         self.offset_in_ticks = offset_in_ticks
         
 class SentimentAnalysisResult(object) :
+    __slots__ = ("speaker_number", "offset_in_ticks", "document")
+
     def __init__(self, speaker_number : int, offset_in_ticks : float, document : Dict) :
         self.speaker_number = speaker_number
         self.offset_in_ticks = offset_in_ticks
         self.document = document
 
+def get_base_uri(endpoint : str) -> str :
+    # Endpoints are normally host names, but may carry their own scheme (e.g. http:// for a local stand-in).
+    if endpoint.startswith("http://") or endpoint.startswith("https://") :
+        return endpoint.rstrip("/")
+    return f"https://{endpoint.rstrip('/')}"
+
 def create_transcription(user_config : helper.Read_Only_Dict) -> str :
-    uri = f"https://{user_config['speech_endpoint']}{SPEECH_TRANSCRIPTION_PATH}"
+    uri = f"{get_base_uri(user_config['speech_endpoint'])}{SPEECH_TRANSCRIPTION_PATH}"
 
     # Create Transcription API JSON request sample and schema:
     # https://westus.dev.cognitive.microsoft.com/docs/services/speech-to-text-api-v3-0/operations/CreateTranscription
@@ -76,7 +90,7 @@ def create_transcription(user_config : helper.Read_Only_Dict) -> str :
         raise Exception(f"Unable to parse response from Create Transcription API:{linesep}{response['text']}")
 
 def get_transcription_status(transcription_id : str, user_config : helper.Read_Only_Dict) -> bool :
-    uri = f"https://{user_config['speech_endpoint']}{SPEECH_TRANSCRIPTION_PATH}/{transcription_id}"
+    uri = f"{get_base_uri(user_config['speech_endpoint'])}{SPEECH_TRANSCRIPTION_PATH}/{transcription_id}"
     response = rest_helper.send_get(uri=uri, key=user_config["subscription_key"], expected_status_codes=[HTTPStatus.OK])
     if "failed" == response["json"]["status"].lower() :
         raise Exception(f"Unable to transcribe audio input. Response:{linesep}{response['text']}")
@@ -91,7 +105,7 @@ def wait_for_transcription(transcription_id : str, user_config : helper.Read_Onl
         done = get_transcription_status(transcription_id, user_config=user_config)
 
 def get_transcription_files(transcription_id : str, user_config : helper.Read_Only_Dict) -> Dict :
-    uri = f"https://{user_config['speech_endpoint']}{SPEECH_TRANSCRIPTION_PATH}/{transcription_id}/files"
+    uri = f"{get_base_uri(user_config['speech_endpoint'])}{SPEECH_TRANSCRIPTION_PATH}/{transcription_id}/files"
     response = rest_helper.send_get(uri=uri, key=user_config["subscription_key"], expected_status_codes=[HTTPStatus.OK])
     return response["json"]
 
@@ -111,26 +125,17 @@ def get_transcription_phrases(transcription : Dict, user_config : helper.Read_On
     def helper(id_and_phrase : Tuple[int, Dict]) -> TranscriptionPhrase :
         (id, phrase) = id_and_phrase
         best = phrase["nBest"][0]
-        speaker_number : int
-        # If the user specified stereo audio, and therefore we turned off diarization,
-        # only the channel property is present.
-        # Note: Channels are numbered from 0. Speakers are numbered from 1.
-        if "speaker" in phrase :
-            speaker_number = phrase["speaker"] - 1
-        elif "channel" in phrase :
-            speaker_number = phrase["channel"]
-        else :
-            raise Exception(f"nBest item contains neither channel nor speaker attribute.{linesep}{best}")
+        speaker_number = output.get_speaker_number(phrase)
         return TranscriptionPhrase(id, best["display"], best["itn"], best["lexical"], speaker_number, phrase["offset"], phrase["offsetInTicks"])
     # For stereo audio, the phrases are sorted by channel number, so resort them by offset.
     return list(map(helper, enumerate(transcription["recognizedPhrases"])))
 
 def delete_transcription(transcription_id : str, user_config : helper.Read_Only_Dict) -> None :
-    uri = f"https://{user_config['speech_endpoint']}{SPEECH_TRANSCRIPTION_PATH}/{transcription_id}"
+    uri = f"{get_base_uri(user_config['speech_endpoint'])}{SPEECH_TRANSCRIPTION_PATH}/{transcription_id}"
     rest_helper.send_delete(uri=uri, key=user_config["subscription_key"], expected_status_codes=[HTTPStatus.NO_CONTENT])
 
 def get_sentiments_helper(documents : List[Dict], user_config : helper.Read_Only_Dict) -> Dict :
-    uri = f"https://{user_config['language_endpoint']}{SENTIMENT_ANALYSIS_PATH}{SENTIMENT_ANALYSIS_QUERY}"
+    uri = f"{get_base_uri(user_config['language_endpoint'])}{SENTIMENT_ANALYSIS_PATH}{SENTIMENT_ANALYSIS_QUERY}"
     content = {
         "kind" : "SentimentAnalysis",
         "analysisInput" : { "documents" : documents },
@@ -142,47 +147,45 @@ def get_sentiment_analysis(phrases : List[TranscriptionPhrase], user_config : he
     retval : List[SentimentAnalysisResult] = []
     # Create a map of phrase ID to phrase data so we can retrieve it later.
     phrase_data : Dict = {}
-    # Convert each transcription phrase to a "document" as expected by the sentiment analysis REST API.
-    # Include a counter to use as a document ID.
-    documents : List[Dict] = []
-    for phrase in phrases :
-        phrase_data[phrase.id] = (phrase.speaker_number, phrase.offset_in_ticks)
-        documents.append({
-            "id" : phrase.id,
-            "language" : user_config["language"],
-            "text" : phrase.text,
-        })
     # We can only analyze sentiment for 10 documents per request.
-    # Get the sentiments for each chunk of documents.
-    result_chunks = list(map(lambda xs : get_sentiments_helper(xs, user_config), helper.chunk (documents, 10)))
-    for result_chunk in result_chunks :
-        for document in result_chunk :
+    # Build the documents for one chunk at a time so only a single request body is alive at once.
+    for phrase_chunk in helper.chunk(phrases, 10) :
+        # Convert each transcription phrase to a "document" as expected by the sentiment analysis REST API.
+        # Include a counter to use as a document ID.
+        documents : List[Dict] = []
+        for phrase in phrase_chunk :
+            phrase_data[phrase.id] = (phrase.speaker_number, phrase.offset_in_ticks)
+            documents.append({
+                "id" : phrase.id,
+                "language" : user_config["language"],
+                "text" : phrase.text,
+            })
+        for document in get_sentiments_helper(documents, user_config) :
             retval.append(SentimentAnalysisResult(phrase_data[int(document["id"])][0], phrase_data[int(document["id"])][1], document))
     return retval
 
 def get_sentiments_for_simple_output(sentiment_analysis_results : List[SentimentAnalysisResult]) -> List[str] :
-    sorted_by_offset = sorted(sentiment_analysis_results, key=lambda x : x.offset_in_ticks)
-    return list(map(lambda result : result.document["sentiment"], sorted_by_offset))
+    return PhraseStore.from_results(sentiment_analysis_results).sentiments()
 
 def get_sentiment_confidence_scores(sentiment_analysis_results : List[SentimentAnalysisResult]) -> List[Dict] :
-    sorted_by_offset = sorted(sentiment_analysis_results, key=lambda x : x.offset_in_ticks)
-    return list(map(lambda result : result.document["confidenceScores"], sorted_by_offset))
+    return PhraseStore.from_results(sentiment_analysis_results).confidence_scores()
 
-def merge_sentiment_confidence_scores_into_transcription(transcription : Dict, sentiment_confidence_scores : List[Dict]) -> Dict :
+def merge_sentiment_confidence_scores_into_transcription(transcription : Dict, sentiment_confidence_scores : List[Dict], sentiments : Optional[List[str]] = None) -> Dict :
     for id, phrase in enumerate(transcription["recognizedPhrases"]) :
         for best_item in phrase["nBest"] :
             best_item["sentiment"] = sentiment_confidence_scores[id]
+            # The service's own label, which can be "mixed"; the streamed formats report it as is
+            if sentiments is not None :
+                best_item["sentimentLabel"] = sentiments[id]
     return transcription
 
 def get_simple_output(phrases : List[TranscriptionPhrase], sentiments : List[str]) -> str :
-    result = ""
-    for index, phrase in enumerate(phrases) :
-        result += f"Phrase: {phrase.text}{linesep}"
-        result += f"Speaker: {phrase.speaker_number}{linesep}"
-        if index < len(sentiments) :
-            result += f"Sentiment: {sentiments[index]}{linesep}"
-        result += linesep
-    return result
+    records = ({
+        "text" : phrase.text,
+        "speaker" : phrase.speaker_number,
+        "sentiment" : sentiments[index] if index < len(sentiments) else None,
+    } for index, phrase in enumerate(phrases))
+    return "".join(output.render_text(records))
 
 def print_simple_output(phrases : List[TranscriptionPhrase], sentiment_analysis_results : List[SentimentAnalysisResult]) -> None :
     sentiments = get_sentiments_for_simple_output(sentiment_analysis_results)
@@ -192,11 +195,42 @@ def print_full_output(output_file_path : str, transcription : Dict, sentiment_co
     result = {
         "transcription" : merge_sentiment_confidence_scores_into_transcription(transcription, sentiment_confidence_scores)
     }
-    with open(output_file_path, mode = "w", newline = "") as f :
-        f.write(dumps(result, indent=2))
+    output.write_chunks(output_file_path, output.render_json(result))
     return result
 
-def run(params={}) -> Dict:
+def analyze(user_config : helper.Read_Only_Dict) -> Dict :
+    # How to use batch transcription:
+    # https://github.com/MicrosoftDocs/azure-docs/blob/main/articles/cognitive-services/Speech-Service/batch-transcription.md
+    transcription_id = create_transcription(user_config)
+    wait_for_transcription(transcription_id, user_config)
+    print(f"Transcription ID: {transcription_id}")
+    transcription_files = get_transcription_files(transcription_id, user_config)
+    transcription_uri = get_transcription_uri(transcription_files, user_config)
+    print(f"Transcription URI: {transcription_uri}")
+    transcription = get_transcription(transcription_uri)
+    
+    # For stereo audio, the phrases are sorted by channel number, so resort them by offset.
+    transcription["recognizedPhrases"] = sorted(transcription["recognizedPhrases"], key=lambda phrase : phrase["offsetInTicks"])
+    phrases = get_transcription_phrases(transcription, user_config)
+    # Sort the sentiment results once into columns; every view below reads from the store.
+    phrase_store = PhraseStore.from_results(get_sentiment_analysis(phrases, user_config))
+    del phrases
+    sentiment_confidence_scores = phrase_store.confidence_scores()
+    
+    # Merge in place; a copy of a multi-hour transcription only doubles peak memory.
+    return {
+        "transcription": merge_sentiment_confidence_scores_into_transcription(transcription, sentiment_confidence_scores, phrase_store.sentiments()),
+        "sentimentSummary": phrase_store.summary(user_config["summary_window_seconds"])
+    }
+
+def run(params={}, guard=None) -> Dict:
+    """
+    Analyze the recording named by params, reusing a cached analysis when allowed
+
+    guard is an optional context manager held on a cache miss, while this worker runs the analysis
+    or waits for another worker running the same one; callers use it to limit concurrent analyses
+    without holding back cache hits.
+    """
     # Try to load from .env file first for backward compatibility
     load_dotenv(override=True)
     
@@ -206,7 +240,12 @@ def run(params={}) -> Dict:
         "locale": "en-US",
         "use_stereo_audio": False,
         "input_audio_url": None,
-        "output_file_path": None
+        "output_file_path": None,
+        "output_format": "json",
+        "summary_window_seconds": 60,
+        "use_cache": True,
+        "content_hash": None,
+        "hash_content": False
     }
     
     # Environment variables (if any) - kept for backward compatibility
@@ -236,49 +275,35 @@ def run(params={}) -> Dict:
     env_config = {**defaults, **env_vars}
     
     # Update with params (params take highest precedence)
-    if params:
-        config = {**env_config, **params}
+    config = {**env_config, **(params or {})}
     
     # Convert to Read_Only_Dict for compatibility with existing code
     user_config = helper.Read_Only_Dict(config)
 
-    transcription : Dict
-    transcription_id : str
-
-    if user_config["input_audio_url"] is not None:
-        # How to use batch transcription:
-        # https://github.com/MicrosoftDocs/azure-docs/blob/main/articles/cognitive-services/Speech-Service/batch-transcription.md
-        transcription_id = create_transcription(user_config)
-        wait_for_transcription(transcription_id, user_config)
-        print(f"Transcription ID: {transcription_id}")
-        transcription_files = get_transcription_files(transcription_id, user_config)
-        transcription_uri = get_transcription_uri(transcription_files, user_config)
-        print(f"Transcription URI: {transcription_uri}")
-        transcription = get_transcription(transcription_uri)
-        
-        # For stereo audio, the phrases are sorted by channel number, so resort them by offset.
-        transcription["recognizedPhrases"] = sorted(transcription["recognizedPhrases"], key=lambda phrase : phrase["offsetInTicks"])
-        phrases = get_transcription_phrases(transcription, user_config)
-        sentiment_analysis_results = get_sentiment_analysis(phrases, user_config)
-        sentiment_confidence_scores = get_sentiment_confidence_scores(sentiment_analysis_results)
-        
-        # Prepare result to return
-        result = {
-            "transcription": merge_sentiment_confidence_scores_into_transcription(transcription.copy(), sentiment_confidence_scores)
-        }
-        
-        # Save full output to file if requested
-        if user_config["output_file_path"] is not None:
-            # Create directory if it doesn't exist
-            output_path = Path(user_config["output_file_path"])
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(user_config["output_file_path"], mode="w", newline="") as f:
-                f.write(dumps(result, indent=2))
-        
-        return result
-    else:
+    if user_config["input_audio_url"] is None:
         raise Exception(f"Missing input audio URL.")
 
+    if user_config["use_cache"]:
+        # Identical recordings and settings reuse a finished analysis, or attach to one still running.
+        content_hash = user_config["content_hash"]
+        if content_hash is None and user_config["hash_content"]:
+            content_hash = cache.hash_audio_content(user_config["input_audio_url"])
+        cache_key = cache.make_cache_key(config, content_hash)
+        result = cache.get_result_cache().get_or_compute(cache_key, lambda: analyze(user_config), guard)
+    else:
+        with guard or nullcontext():
+            result = analyze(user_config)
+    
+    # Save full output to file if requested
+    if user_config["output_file_path"] is not None:
+        # Create directory if it doesn't exist
+        output_path = Path(user_config["output_file_path"])
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Stream the rendered output to disk instead of building it as one string
+        output.write_chunks(user_config["output_file_path"], output.render(result, user_config["output_format"]))
+    
+    return result
+
 if "__main__" == __name__ :
     run()
\ No newline at end of file
@@ -0,0 +1,95 @@
+#
+# Streaming renderers for call-center transcripts.
+#
+# Every renderer is a generator of string chunks, so a transcript can be written to an HTTP
+# response or to a file phrase by phrase without building the whole document in memory.
+#
+
+from json import JSONEncoder, dumps
+from os import linesep
+from typing import Dict, Iterable, Iterator, Optional
+
+# Chunks are buffered up to this many characters before they are written to a file.
+WRITE_BUFFER_CHARS = 64 * 1024
+
+OUTPUT_FORMATS = ("json", "ndjson", "text")
+
+MIMETYPES = {
+    "json" : "application/json",
+    "ndjson" : "application/x-ndjson",
+    "text" : "text/plain",
+}
+
+def get_speaker_number(phrase : Dict) -> int :
+    # If the user specified stereo audio, and therefore we turned off diarization,
+    # only the channel property is present.
+    # Note: Channels are numbered from 0. Speakers are numbered from 1.
+    if "speaker" in phrase :
+        return phrase["speaker"] - 1
+    elif "channel" in phrase :
+        return phrase["channel"]
+    else :
+        raise Exception(f"nBest item contains neither channel nor speaker attribute.{linesep}{phrase['nBest'][0]}")
+
+def get_sentiment_label(best : Dict) -> Optional[str] :
+    # The label the Language service returned, as in the simple output. Results cached before
+    # the merged transcription carried it only have confidence scores; use the strongest of them.
+    if best.get("sentimentLabel") is not None :
+        return best["sentimentLabel"]
+    confidence_scores = best.get("sentiment")
+    if not confidence_scores :
+        return None
+    return max(confidence_scores, key=confidence_scores.get)
+
+def iter_phrase_records(transcription : Dict) -> Iterator[Dict] :
+    """Yield one flat record per recognized phrase of a transcription merged with sentiment scores"""
+    for id, phrase in enumerate(transcription["recognizedPhrases"]) :
+        best = phrase["nBest"][0]
+        confidence_scores = best.get("sentiment")
+        yield {
+            "id" : id,
+            "speaker" : get_speaker_number(phrase),
+            "offset" : phrase["offset"],
+            "offsetInTicks" : phrase["offsetInTicks"],
+            "text" : best["display"],
+            "sentiment" : get_sentiment_label(best),
+            "confidenceScores" : confidence_scores,
+        }
+
+def render_ndjson(records : Iterable[Dict]) -> Iterator[str] :
+    for record in records :
+        yield dumps(record) + "\n"
+
+def render_text(records : Iterable[Dict]) -> Iterator[str] :
+    for record in records :
+        chunk = f"Phrase: {record['text']}{linesep}Speaker: {record['speaker']}{linesep}"
+        if record.get("sentiment") is not None :
+            chunk += f"Sentiment: {record['sentiment']}{linesep}"
+        yield chunk + linesep
+
+def render_json(result : Dict) -> Iterator[str] :
+    return JSONEncoder(indent=2).iterencode(result)
+
+def render(result : Dict, output_format : str) -> Iterator[str] :
+    """Render a call-center result in one of OUTPUT_FORMATS"""
+    if "json" == output_format :
+        return render_json(result)
+    records = iter_phrase_records(result["transcription"])
+    if "ndjson" == output_format :
+        return render_ndjson(records)
+    elif "text" == output_format :
+        return render_text(records)
+    raise ValueError(f"Unsupported output format: {output_format}")
+
+def write_chunks(output_file_path : str, chunks : Iterable[str]) -> None :
+    buffer = []
+    buffered = 0
+    with open(output_file_path, mode = "w", newline = "") as f :
+        for chunk in chunks :
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= WRITE_BUFFER_CHARS :
+                f.write("".join(buffer))
+                buffer.clear()
+                buffered = 0
+        f.write("".join(buffer))
@@ -0,0 +1,117 @@
+#
+# Columnar storage for per-phrase sentiment results.
+#
+# A long call produces thousands of phrases. Keeping their offsets, speakers and confidence
+# scores in parallel numpy arrays, sorted once by offset, avoids re-sorting object lists for
+# every view and lets per-speaker and per-window aggregates run as vector operations.
+#
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Offsets from the Speech API are in 100-nanosecond ticks.
+TICKS_PER_SECOND = 10_000_000
+
+SENTIMENT_LABELS = ("positive", "neutral", "negative", "mixed")
+_LABEL_CODES = { label : code for code, label in enumerate(SENTIMENT_LABELS) }
+
+class PhraseStore(object) :
+    __slots__ = ("ids", "offsets", "speakers", "positive", "neutral", "negative", "labels")
+
+    def __init__(self, ids : np.ndarray, offsets : np.ndarray, speakers : np.ndarray,
+                 positive : np.ndarray, neutral : np.ndarray, negative : np.ndarray, labels : np.ndarray) :
+        # Sort every column by offset once; all views below rely on this order.
+        order = np.argsort(offsets, kind="stable")
+        self.ids = ids[order]
+        self.offsets = offsets[order]
+        self.speakers = speakers[order]
+        self.positive = positive[order]
+        self.neutral = neutral[order]
+        self.negative = negative[order]
+        self.labels = labels[order]
+
+    @classmethod
+    def from_results(cls, sentiment_analysis_results : Iterable) -> "PhraseStore" :
+        """Build a store from SentimentAnalysisResult objects"""
+        results = list(sentiment_analysis_results)
+        count = len(results)
+        ids = np.empty(count, dtype=np.int64)
+        offsets = np.empty(count, dtype=np.float64)
+        speakers = np.empty(count, dtype=np.int32)
+        positive = np.empty(count, dtype=np.float64)
+        neutral = np.empty(count, dtype=np.float64)
+        negative = np.empty(count, dtype=np.float64)
+        labels = np.empty(count, dtype=np.int8)
+        for index, result in enumerate(results) :
+            document = result.document
+            scores = document["confidenceScores"]
+            ids[index] = int(document["id"])
+            offsets[index] = result.offset_in_ticks
+            speakers[index] = result.speaker_number
+            positive[index] = scores["positive"]
+            neutral[index] = scores["neutral"]
+            negative[index] = scores["negative"]
+            labels[index] = _LABEL_CODES.get(document["sentiment"], _LABEL_CODES["neutral"])
+        return cls(ids, offsets, speakers, positive, neutral, negative, labels)
+
+    def __len__(self) -> int :
+        return len(self.offsets)
+
+    def sentiments(self) -> List[str] :
+        """Sentiment labels in offset order"""
+        return [SENTIMENT_LABELS[code] for code in self.labels.tolist()]
+
+    def confidence_scores(self) -> List[Dict] :
+        """Confidence scores in offset order, in the shape returned by the Language API"""
+        return [
+            { "positive" : positive, "neutral" : neutral, "negative" : negative }
+            for positive, neutral, negative in zip(self.positive.tolist(), self.neutral.tolist(), self.negative.tolist())
+        ]
+
+    def _aggregate(self, groups : np.ndarray) -> List[Dict] :
+        keys, inverse = np.unique(groups, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        means = {
+            name : np.bincount(inverse, weights=column, minlength=len(keys)) / counts
+            for name, column in (("positive", self.positive), ("neutral", self.neutral), ("negative", self.negative))
+        }
+        # Count labels per group in one pass by flattening (group, label) into a single index.
+        label_counts = np.bincount(
+            inverse * len(SENTIMENT_LABELS) + self.labels,
+            minlength=len(keys) * len(SENTIMENT_LABELS)
+        ).reshape(len(keys), len(SENTIMENT_LABELS))
+        return [
+            {
+                "key" : int(key),
+                "phraseCount" : int(counts[index]),
+                "meanConfidenceScores" : { name : round(float(values[index]), 4) for name, values in means.items() },
+                "sentimentCounts" : dict(zip(SENTIMENT_LABELS, label_counts[index].tolist())),
+            }
+            for index, key in enumerate(keys.tolist())
+        ]
+
+    def aggregate_by_speaker(self) -> List[Dict] :
+        """Mean confidence scores and label counts for each speaker"""
+        aggregates = self._aggregate(self.speakers)
+        for aggregate in aggregates :
+            aggregate["speaker"] = aggregate.pop("key")
+        return aggregates
+
+    def aggregate_by_window(self, window_seconds : float) -> List[Dict] :
+        """Mean confidence scores and label counts for each fixed-length time window of the call"""
+        if window_seconds <= 0 :
+            raise ValueError("window_seconds must be positive")
+        windows = (self.offsets // (window_seconds * TICKS_PER_SECOND)).astype(np.int64)
+        aggregates = self._aggregate(windows)
+        for aggregate in aggregates :
+            window = aggregate.pop("key")
+            aggregate["startSeconds"] = window * window_seconds
+            aggregate["endSeconds"] = (window + 1) * window_seconds
+        return aggregates
+
+    def summary(self, window_seconds : Optional[float] = None) -> Dict :
+        result = { "bySpeaker" : self.aggregate_by_speaker() }
+        if window_seconds :
+            result["byWindow"] = self.aggregate_by_window(window_seconds)
+        return result
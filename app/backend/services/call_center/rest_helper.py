@@ -6,11 +6,46 @@
 # To install, run:
 # python -m pip install requests
 import requests
-from typing import Dict, List
+from time import sleep
+from typing import Callable, Dict, List
+
+# Throttled (429) and briefly unavailable (503) requests are retried this many times,
+# honouring the Retry-After header when the service sends one.
+MAX_RETRIES = 3
+RETRY_STATUS_CODES = [429, 503]
+DEFAULT_RETRY_SECONDS = 1.0
+# Each wait, and all waits of one request together, are capped so a throttled call cannot hold
+# a sync worker anywhere near gunicorn's 180 s timeout; past the budget the response is returned.
+MAX_RETRY_SECONDS = 10.0
+MAX_TOTAL_RETRY_SECONDS = 20.0
+
+def retry_delay(response : requests.Response, attempt : int) -> float :
+    backoff = DEFAULT_RETRY_SECONDS * (2 ** attempt)
+    try :
+        delay = float(response.headers.get("Retry-After", ""))
+    except ValueError :
+        # Missing, or an HTTP-date
+        return backoff
+    if not 0 <= delay < float("inf") :
+        return backoff
+    return min(delay, MAX_RETRY_SECONDS)
+
+def send_with_retry(send : Callable[[], requests.Response]) -> requests.Response :
+    waited = 0.0
+    for attempt in range(MAX_RETRIES + 1) :
+        response = send()
+        if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES :
+            return response
+        delay = retry_delay(response, attempt)
+        if waited + delay > MAX_TOTAL_RETRY_SECONDS :
+            return response
+        sleep(delay)
+        waited += delay
+    return response
 
 def send_get(uri : str, key : str, expected_status_codes : List[int]) -> Dict :
     headers = {"Ocp-Apim-Subscription-Key": key}
-    response = requests.get(uri, headers=headers)
+    response = send_with_retry(lambda : requests.get(uri, headers=headers))
     if response.status_code not in expected_status_codes :
         raise Exception(f"The GET request to {uri} returned a status code {response.status_code} that was not in the expected status codes: {expected_status_codes}")
     else :
@@ -24,7 +59,7 @@ def send_get(uri : str, key : str, expected_status_codes : List[int]) -> Dict :
 def send_post(uri : str, content : Dict, key : str, expected_status_codes : List[int]) -> Dict :
     headers = {"Ocp-Apim-Subscription-Key": key}
     
-    response = requests.post(uri, headers=headers, json=content)
+    response = send_with_retry(lambda : requests.post(uri, headers=headers, json=content))
     if response.status_code not in expected_status_codes :
         raise Exception(f"The POST request to {uri} returned a status code {response.status_code} that was not in the expected status codes: {expected_status_codes}")
     else :
@@ -36,6 +71,6 @@ def send_post(uri : str, content : Dict, key : str, expected_status_codes : List
 
 def send_delete(uri : str, key : str, expected_status_codes : List[int]) -> None :
     headers = {"Ocp-Apim-Subscription-Key": key}
-    response = requests.delete(uri, headers=headers)
+    response = send_with_retry(lambda : requests.delete(uri, headers=headers))
     if response.status_code not in expected_status_codes :
         raise Exception(f"The DELETE request to {uri} returned a status code {response.status_code} that was not in the expected status codes: {expected_status_codes}")
@@ -0,0 +1,252 @@
+"""
+Change-feed processor that keeps the job and participant snapshots in job_matches current
+
+Every match carries a jobReference and a participantReference copied from the job and the
+participant when the match was created, so a match is read as one document. This processor
+follows the change feeds of the jobs and participants containers and patches the references of
+the affected matches whenever a referenced field changes.
+
+Progress is checkpointed per feed range in the leases container after each page, so a restarted
+processor resumes where it stopped. Delivery is at least once: a page replayed after a crash
+finds its matches already up to date and patches nothing. Checkpoints are written with an ETag
+precondition, so two processors on the same feed cannot move a checkpoint backwards.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError, CosmosResourceExistsError, CosmosResourceNotFoundError
+)
+from prometheus_client import Counter
+
+from db.config import CONTAINERS, DB_NAME
+from db.cosmos_client import get_container, get_cosmos_client, get_database
+from db.repositories.job_match_repository import (
+    JOB_REFERENCE_FIELDS, PARTICIPANT_REFERENCE_FIELDS, make_reference, refresh_job_match_summary
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_POLL_SECONDS = 5
+
+CHANGES_PROCESSED = Counter(
+    "change_feed_changes",
+    "Changed documents read from a change feed",
+    ["source"],
+)
+MATCHES_PATCHED = Counter(
+    "change_feed_matches_patched",
+    "Job matches whose denormalized reference was patched",
+    ["source"],
+)
+
+class ReferenceFeed(NamedTuple):
+    """A source container and the match reference its documents are copied into"""
+    source: str
+    reference: str
+    fields: Tuple[str, ...]
+    # Selects the matches that reference one source document
+    match_query: str
+    # Whether the matches of one source document share a job_matches partition
+    partition_local: bool
+    # Whether the participants' jobMatchSummary lists fields of this reference
+    in_summary: bool
+
+REFERENCE_FEEDS = (
+    ReferenceFeed(
+        source="jobs",
+        reference="jobReference",
+        fields=JOB_REFERENCE_FIELDS,
+        match_query="SELECT c.id, c.participantId, c.jobReference FROM c WHERE c.jobId = @id",
+        partition_local=False,
+        in_summary=True,
+    ),
+    ReferenceFeed(
+        source="participants",
+        reference="participantReference",
+        fields=PARTICIPANT_REFERENCE_FIELDS,
+        match_query="SELECT c.id, c.participantId, c.participantReference FROM c WHERE c.participantId = @id",
+        partition_local=True,
+        in_summary=False,
+    ),
+)
+
+def feed_range_key(feed_range: Dict[str, Any]) -> str:
+    """Stable short name for a feed range, used in its checkpoint id"""
+    return hashlib.sha256(json.dumps(feed_range, sort_keys=True).encode()).hexdigest()[:16]
+
+class CheckpointStore:
+    """Continuation tokens per source container and feed range, kept as documents in the leases container"""
+
+    def __init__(self, container, processor_name: str):
+        self.container = container
+        self.processor_name = processor_name
+
+    def _id(self, source: str, range_key: str) -> str:
+        return f"{self.processor_name}.{source}.{range_key}"
+
+    def load(self, source: str, range_key: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return (continuation, etag) of a checkpoint, or (None, None) before the first one"""
+        try:
+            lease = self.container.read_item(item=self._id(source, range_key), partition_key=self._id(source, range_key))
+        except CosmosResourceNotFoundError:
+            return None, None
+        return lease.get('continuation'), lease.get('_etag')
+
+    def save(self, source: str, range_key: str, continuation: str, etag: Optional[str]) -> Optional[str]:
+        """
+        Store a continuation token if the checkpoint is unchanged since it was loaded
+
+        Returns:
+            The new ETag, or None when another processor moved the checkpoint first
+        """
+        lease = {
+            'id': self._id(source, range_key),
+            'processor': self.processor_name,
+            'source': source,
+            'continuation': continuation,
+            'updatedAt': datetime.utcnow().isoformat(),
+        }
+        try:
+            if etag is None:
+                saved = self.container.create_item(body=lease)
+            else:
+                saved = self.container.replace_item(
+                    item=lease['id'], body=lease, etag=etag, match_condition=MatchConditions.IfNotModified
+                )
+        except (CosmosAccessConditionFailedError, CosmosResourceExistsError):
+            # Another processor replaced, or first created, the checkpoint
+            return None
+        return saved.get('_etag')
+
+class MatchReferenceProcessor:
+    """Follows the jobs and participants change feeds and patches stale match references"""
+
+    def __init__(self, database, processor_name: str = "match-references",
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, page_size: int = DEFAULT_PAGE_SIZE):
+        self.matches = get_container(database, CONTAINERS['job_matches']['name'], CONTAINERS['job_matches']['partition_key'])
+        self.sources = {
+            feed.source: get_container(database, CONTAINERS[feed.source]['name'], CONTAINERS[feed.source]['partition_key'])
+            for feed in REFERENCE_FEEDS
+        }
+        self.checkpoints = CheckpointStore(
+            get_container(database, CONTAINERS['leases']['name'], CONTAINERS['leases']['partition_key']),
+            processor_name,
+        )
+        self.page_size = page_size
+        # Bounds the patches in flight, so catching up on a large backlog cannot exhaust the RU budget
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="change-feed")
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    def stale_matches(self, feed: ReferenceFeed, document: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Matches of a changed document whose reference differs from it, with the new reference"""
+        reference = make_reference(document, feed.fields)
+        options = {'partition_key': document['id']} if feed.partition_local else {'enable_cross_partition_query': True}
+        matches = self.matches.query_items(
+            query=feed.match_query,
+            parameters=[{"name": "@id", "value": document['id']}],
+            **options
+        )
+        return [(match, reference) for match in matches if match.get(feed.reference) != reference]
+
+    def patch_reference(self, feed: ReferenceFeed, match: Dict[str, Any], reference: Dict[str, Any]) -> bool:
+        try:
+            self.matches.patch_item(
+                item=match['id'],
+                partition_key=match['participantId'],
+                # updatedAt is left alone: a refreshed snapshot is not a change to the match
+                patch_operations=[{"op": "set", "path": f"/{feed.reference}", "value": reference}],
+            )
+        except CosmosResourceNotFoundError:
+            # Deleted since the query; nothing left to keep current
+            return False
+        return True
+
+    def refresh_summary(self, participant_id: str) -> None:
+        try:
+            refresh_job_match_summary(self.matches, self.sources['participants'], participant_id)
+        except CosmosResourceNotFoundError:
+            pass
+
+    def apply_changes(self, feed: ReferenceFeed, documents: List[Dict[str, Any]]) -> int:
+        """Patch every stale match of a page of changed documents; returns how many were patched"""
+        # Only the latest version of a document in the page matters
+        latest = {document['id']: document for document in documents}
+        stale = [
+            pair
+            for stale_pairs in self.executor.map(lambda document: self.stale_matches(feed, document), latest.values())
+            for pair in stale_pairs
+        ]
+        outcomes = list(self.executor.map(lambda pair: self.patch_reference(feed, *pair), stale))
+        patched = sum(outcomes)
+        if feed.in_summary:
+            participants = {match['participantId'] for (match, _), outcome in zip(stale, outcomes) if outcome}
+            list(self.executor.map(self.refresh_summary, participants))
+        CHANGES_PROCESSED.labels(feed.source).inc(len(documents))
+        MATCHES_PATCHED.labels(feed.source).inc(patched)
+        return patched
+
+    def process_range(self, feed: ReferenceFeed, feed_range: Dict[str, Any]) -> int:
+        """Drain the pending changes of one feed range, checkpointing after each page"""
+        container = self.sources[feed.source]
+        range_key = feed_range_key(feed_range)
+        continuation, etag = self.checkpoints.load(feed.source, range_key)
+
+        options = {'continuation': continuation} if continuation else {'start_time': "Beginning"}
+        pages = container.query_items_change_feed(
+            feed_range=feed_range,
+            max_item_count=self.page_size,
+            **options
+        ).by_page()
+
+        patched = 0
+        for page in pages:
+            documents = list(page)
+            if documents:
+                patched += self.apply_changes(feed, documents)
+            # Checkpoint only once every match of the page is patched
+            if pages.continuation_token:
+                etag = self.checkpoints.save(feed.source, range_key, pages.continuation_token, etag)
+                if etag is None:
+                    logger.warning(f"Checkpoint for {feed.source} range {range_key} moved by another processor; skipping range")
+                    break
+        return patched
+
+    def run_once(self) -> Dict[str, int]:
+        """Process the pending changes of every source; returns the patched matches per source"""
+        patched = {}
+        for feed in REFERENCE_FEEDS:
+            container = self.sources[feed.source]
+            patched[feed.source] = sum(self.process_range(feed, feed_range) for feed_range in container.read_feed_ranges())
+        return patched
+
+    def run_forever(self, poll_seconds: float = DEFAULT_POLL_SECONDS, should_stop: Callable[[], bool] = lambda: False) -> None:
+        while not should_stop():
+            try:
+                patched = self.run_once()
+                if any(patched.values()):
+                    logger.info(f"Patched match references: {patched}")
+            except Exception as e:
+                # Nothing past the last checkpoint is lost; the next round retries it
+                logger.error(f"Error processing change feed: {e}")
+            time.sleep(poll_seconds)
+
+def get_match_reference_processor() -> MatchReferenceProcessor:
+    """Processor configured from CHANGE_FEED_MAX_CONCURRENCY and CHANGE_FEED_PAGE_SIZE"""
+    database = get_database(get_cosmos_client(), DB_NAME)
+    return MatchReferenceProcessor(
+        database,
+        max_concurrency=int(os.environ.get("CHANGE_FEED_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        page_size=int(os.environ.get("CHANGE_FEED_PAGE_SIZE", DEFAULT_PAGE_SIZE)),
+    )
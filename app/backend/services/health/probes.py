@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from prometheus_client import Gauge
+
+# Latency budgets in milliseconds; a dependency slower than its budget counts as not ready
+DEFAULT_BUDGETS_MS = {
+    "cosmos": 500,
+    "search": 1000,
+    "speech": 1500,
+    "language": 1500,
+}
+DEFAULT_REQUIRED = "cosmos,search"
+DEFAULT_CACHE_SECONDS = 5
+DEFAULT_TIMEOUT_SECONDS = 3
+
+DEPENDENCY_UP = Gauge(
+    "dependency_up",
+    "1 when the last probe of a dependency succeeded within its latency budget",
+    ["dependency"],
+    multiprocess_mode="liveall",
+)
+DEPENDENCY_LATENCY = Gauge(
+    "dependency_latency_seconds",
+    "Latency of the last probe of a dependency",
+    ["dependency"],
+    multiprocess_mode="liveall",
+)
+
+class NotConfigured(Exception):
+    """Raised by a probe when its service has no settings in the environment"""
+
+def _service_url(endpoint: str, path: str) -> str:
+    endpoint = endpoint.rstrip("/")
+    if not endpoint.startswith(("http://", "https://")):
+        endpoint = f"https://{endpoint}"
+    return f"{endpoint}{path}"
+
+def _http_probe(url: str, key: str, timeout: float) -> None:
+    # Any answer from the service proves it is reachable; a rejected key means it is unusable
+    response = requests.get(url, headers={"Ocp-Apim-Subscription-Key": key}, timeout=timeout)
+    if response.status_code in (401, 403) or response.status_code >= 500:
+        raise RuntimeError(f"HTTP {response.status_code}")
+
+def probe_cosmos(timeout: float) -> None:
+    from db.config import DB_NAME
+    from db.cosmos_client import get_cosmos_client, get_database
+    try:
+        client = get_cosmos_client()
+    except ValueError as e:
+        raise NotConfigured(str(e))
+    # A metadata read of the database is the cheapest authenticated round trip
+    get_database(client, DB_NAME).read(timeout=timeout)
+
+def probe_search(timeout: float) -> None:
+    from services.job_matches.main import get_search_client
+    try:
+        client = get_search_client()
+    except ValueError as e:
+        raise NotConfigured(str(e))
+    client.get_document_count(connection_timeout=timeout, read_timeout=timeout)
+
+def probe_speech(timeout: float) -> None:
+    key, endpoint = os.environ.get("AZURE_AI_KEY"), os.environ.get("AZURE_SPEECH_ENDPOINT")
+    if not key or not endpoint:
+        raise NotConfigured("AZURE_AI_KEY and AZURE_SPEECH_ENDPOINT are not set")
+    _http_probe(_service_url(endpoint, "/speechtotext/v3.2/transcriptions?top=1"), key, timeout)
+
+def probe_language(timeout: float) -> None:
+    key, endpoint = os.environ.get("AZURE_AI_KEY"), os.environ.get("AZURE_LANGUAGE_ENDPOINT")
+    if not key or not endpoint:
+        raise NotConfigured("AZURE_AI_KEY and AZURE_LANGUAGE_ENDPOINT are not set")
+    # GET is not a billable analysis; the service answers 404/405 once the key is accepted
+    _http_probe(_service_url(endpoint, "/language/:analyze-text?api-version=2024-11-01"), key, timeout)
+
+PROBES: Dict[str, Callable[[float], None]] = {
+    "cosmos": probe_cosmos,
+    "search": probe_search,
+    "speech": probe_speech,
+    "language": probe_language,
+}
+
+class DependencyProbes:
+    """
+    Probes the external services the API depends on and caches the results briefly
+
+    Probes run concurrently and are cut off at the timeout. A dependency is "ok" when it answered
+    within its latency budget, "slow" when it answered late, "down" when it failed or timed out,
+    and "unconfigured" when it has no settings. The worker is ready when every required
+    dependency is "ok"; the others are reported but do not affect readiness.
+    """
+
+    def __init__(self, budgets_ms: Dict[str, float], required: List[str],
+                 cache_seconds: float = DEFAULT_CACHE_SECONDS, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.budgets_ms = budgets_ms
+        self.required = required
+        self.cache_seconds = cache_seconds
+        self.timeout = timeout
+        # Spare threads so a probe stuck past its timeout does not hold up the next refresh
+        self._executor = ThreadPoolExecutor(max_workers=2 * len(PROBES), thread_name_prefix="health-probe")
+        self._lock = threading.Lock()
+        self._results: Optional[Dict[str, Dict[str, Any]]] = None
+        self._expires = 0.0
+        self._checked_at = None
+
+    def _run_probe(self, name: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            PROBES[name](self.timeout)
+            status, error = "ok", None
+        except NotConfigured as e:
+            status, error = "unconfigured", str(e)
+        except Exception as e:
+            status, error = "down", f"{type(e).__name__}: {e}"
+        latency_ms = (time.perf_counter() - start) * 1000
+        if status == "ok" and latency_ms > self.budgets_ms[name]:
+            status = "slow"
+        return {"status": status, "latencyMs": round(latency_ms, 1), "budgetMs": self.budgets_ms[name], "error": error}
+
+    def _probe_all(self) -> Dict[str, Dict[str, Any]]:
+        futures = {name: self._executor.submit(self._run_probe, name) for name in PROBES}
+        deadline = time.monotonic() + self.timeout
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                # The probe thread finishes on its own; the next refresh starts a new one
+                results[name] = {
+                    "status": "down", "latencyMs": self.timeout * 1000, "budgetMs": self.budgets_ms[name],
+                    "error": f"no answer within {self.timeout}s",
+                }
+            results[name]["required"] = name in self.required
+            DEPENDENCY_UP.labels(name).set(1 if results[name]["status"] == "ok" else 0)
+            DEPENDENCY_LATENCY.labels(name).set(results[name]["latencyMs"] / 1000)
+        return results
+
+    def check(self, refresh: bool = False) -> Dict[str, Any]:
+        """Return readiness and per-dependency results, probing again once the cache has expired"""
+        with self._lock:
+            if refresh or self._results is None or time.monotonic() >= self._expires:
+                self._results = self._probe_all()
+                self._expires = time.monotonic() + self.cache_seconds
+                self._checked_at = datetime.utcnow().isoformat()
+            results = self._results
+        ready = all(results[name]["status"] == "ok" for name in self.required if name in results)
+        return {"ready": ready, "checkedAt": self._checked_at, "dependencies": results}
+
+_probes: Optional[DependencyProbes] = None
+
+def get_dependency_probes() -> DependencyProbes:
+    """Return the dependency probes configured from the environment"""
+    global _probes
+    if _probes is None:
+        budgets = {
+            name: float(os.environ.get(f"HEALTH_BUDGET_{name.upper()}_MS", default))
+            for name, default in DEFAULT_BUDGETS_MS.items()
+        }
+        required = [
+            name.strip() for name in os.environ.get("HEALTH_REQUIRED_DEPENDENCIES", DEFAULT_REQUIRED).split(",")
+            if name.strip()
+        ]
+        _probes = DependencyProbes(
+            budgets,
+            required,
+            float(os.environ.get("HEALTH_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)),
+            float(os.environ.get("HEALTH_PROBE_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS)),
+        )
+    return _probes
@@ -0,0 +1,142 @@
+"""
+Idempotency key store: remembers the response to a request so a retry can be answered from it
+
+Each key moves through two states. A request claims the key before doing its work, and the
+claim is completed with the response once the work is done. A retry of a completed key gets
+the stored response. A retry while the first attempt is still running is told it is in progress.
+A key reused for a different request is rejected.
+
+Keys live in one SQLite database, shared by every gunicorn worker on the host, and expire after
+a time to live.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+DEFAULT_DB_PATH = ".cache/idempotency.sqlite3"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# A claim not completed within this long is assumed to belong to a worker that died
+DEFAULT_CLAIM_SECONDS = 5 * 60
+
+SWEEP_EVERY = 200
+
+CLAIMED = "claimed"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+class StoredResponse(NamedTuple):
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+class IdempotencyStore:
+    """SQLite-backed idempotency keys with a time to live"""
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 claim_seconds: float = DEFAULT_CLAIM_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.claim_seconds = claim_seconds
+        self._local = threading.local()
+        self._completed = 0
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                " key TEXT PRIMARY KEY,"
+                " fingerprint TEXT NOT NULL,"
+                " status INTEGER,"
+                " headers TEXT,"
+                " body BLOB,"
+                " expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def claim(self, key: str, fingerprint: str) -> Tuple[str, Optional[StoredResponse]]:
+        """
+        Claim key for a request identified by fingerprint
+
+        Returns:
+            (CLAIMED, None) when the caller should do the work and then complete or release the key,
+            (REPLAY, response) when the key already holds a response for this request,
+            (IN_PROGRESS, None) when another attempt holds the claim,
+            (MISMATCH, None) when the key was used for a different request
+        """
+        now = time.time()
+        connection = self._connection()
+        # IMMEDIATE takes the write lock up front so two workers cannot both claim the key
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT fingerprint, status, headers, body FROM idempotency_keys"
+                " WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                connection.execute(
+                    "INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, expires_at) VALUES (?, ?, ?)",
+                    (key, fingerprint, now + self.claim_seconds),
+                )
+                connection.execute("COMMIT")
+                return CLAIMED, None
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        stored_fingerprint, status, headers, body = row
+        if stored_fingerprint != fingerprint:
+            return MISMATCH, None
+        if status is None:
+            return IN_PROGRESS, None
+        return REPLAY, StoredResponse(status, [tuple(header) for header in json.loads(headers)], body)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        """Store the response for a claimed key; it is replayed until the key expires"""
+        self._connection().execute(
+            "UPDATE idempotency_keys SET status = ?, headers = ?, body = ?, expires_at = ? WHERE key = ?",
+            (response.status, json.dumps(response.headers), response.body, time.time() + self.ttl_seconds, key),
+        )
+        self._completed += 1
+        if self._completed % SWEEP_EVERY == 0:
+            self.sweep()
+
+    def release(self, key: str) -> None:
+        """Drop a claim without a response, so a retry does the work again"""
+        self._connection().execute("DELETE FROM idempotency_keys WHERE key = ? AND status IS NULL", (key,))
+
+    def sweep(self) -> int:
+        """Delete expired keys and return how many were removed"""
+        return self._connection().execute(
+            "DELETE FROM idempotency_keys WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+
+_store: Optional[IdempotencyStore] = None
+_store_lock = threading.Lock()
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Return the process-wide idempotency store, configured from the environment on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = IdempotencyStore(
+                os.environ.get("IDEMPOTENCY_DB_PATH", DEFAULT_DB_PATH),
+                ttl_seconds=float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                claim_seconds=float(os.environ.get("IDEMPOTENCY_CLAIM_SECONDS", DEFAULT_CLAIM_SECONDS)),
+            )
+        return _store
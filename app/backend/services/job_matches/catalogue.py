@@ -0,0 +1,150 @@
+"""
+Compact in-memory job catalogue for the matching engine
+
+Compatibility scoring compares a participant with many jobs, and only ever reads the jobs'
+lowercased text. CatalogueJob keeps just those fields, lowercased once when the catalogue is
+built, in a __slots__ record; the short, frequently repeated values (locations, employment
+types, skills, accommodations) are interned, so every job shares one copy of each. The
+original text is kept only where a compatibility reasoning quotes it.
+
+Each worker builds the catalogue on first use and rebuilds it when it is older than
+JOB_CATALOGUE_TTL_SECONDS; jobs created since are looked up one by one by the callers.
+`python -m tools.catalogue_report` compares its memory and scoring time with the dict form.
+"""
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+DEFAULT_TTL_SECONDS = 300
+
+# Every job field the compatibility rules read, and nothing else
+CATALOGUE_QUERY = (
+    "SELECT c.id, c.title, c.location, c.employmentType, c.description, c.industry, c.department, "
+    "c.hoursPerWeek, c.requiredSkills, c.availableAccommodations, c.supportiveEnvironment, "
+    "c.accessibilityFeatures, c.schedule FROM c"
+)
+
+def _lower(value: Any) -> str:
+    return sys.intern(value.lower()) if value else ''
+
+def _lowered_all(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    return tuple(sys.intern(value.lower()) for value in values or ())
+
+def _interned_all(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    return tuple(sys.intern(value) for value in values or ())
+
+class CatalogueJob:
+    """The fields of a job the compatibility rules read, lowercased; built by from_document"""
+
+    __slots__ = (
+        'id',
+        'location',
+        'industry',
+        'employment_type',
+        'description',
+        # title, industry and department on separate lines: a search term without whitespace
+        # is in it exactly when it is in one of the three
+        'role_text',
+        'hours_per_week',
+        'required_skills',
+        'available_accommodations',
+        'supportive_environment',
+        'supportive_environment_text',
+        'accessibility_features',
+        'accessibility_features_text',
+        'schedule',
+        'schedule_text',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    @classmethod
+    def from_document(cls, job: Dict[str, Any]) -> "CatalogueJob":
+        hours_per_week = job.get('hoursPerWeek') or None
+        return cls(
+            id=job.get('id'),
+            location=_lower(job.get('location')),
+            industry=_lower(job.get('industry')),
+            employment_type=_lower(job.get('employmentType')),
+            # Long and unique, so not worth interning
+            description=(job.get('description') or '').lower(),
+            role_text='\n'.join((
+                (job.get('title') or '').lower(),
+                (job.get('industry') or '').lower(),
+                (job.get('department') or '').lower(),
+            )),
+            hours_per_week=(hours_per_week.get('min', 0), hours_per_week.get('max', 40)) if hours_per_week else None,
+            required_skills=_lowered_all(job.get('requiredSkills')),
+            available_accommodations=_lowered_all(job.get('availableAccommodations')),
+            # Lowercased for matching, plus the original text quoted in reasonings
+            supportive_environment=_lowered_all(job.get('supportiveEnvironment')),
+            supportive_environment_text=_interned_all(job.get('supportiveEnvironment')),
+            accessibility_features=_lowered_all(job.get('accessibilityFeatures')),
+            accessibility_features_text=_interned_all(job.get('accessibilityFeatures')),
+            schedule=_lowered_all(job.get('schedule')),
+            schedule_text=_interned_all(job.get('schedule')),
+        )
+
+def catalogue_job(job) -> CatalogueJob:
+    """A catalogue record for a job, converting a job document when given one"""
+    return job if isinstance(job, CatalogueJob) else CatalogueJob.from_document(job)
+
+class JobCatalogue:
+    """Catalogue records by job id, built from one query and shared by every request of a worker"""
+
+    def __init__(self, jobs: Dict[str, CatalogueJob]):
+        self.jobs = jobs
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict[str, Any]]) -> "JobCatalogue":
+        return cls({document['id']: CatalogueJob.from_document(document) for document in documents})
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def get(self, job_id: str) -> Optional[CatalogueJob]:
+        return self.jobs.get(job_id)
+
+_catalogue: Optional[JobCatalogue] = None
+_catalogue_lock = threading.Lock()
+
+def load_job_catalogue() -> JobCatalogue:
+    """Build a catalogue of every job in the jobs container"""
+    from db.config import CONTAINERS, DB_NAME
+    from db.cosmos_client import get_container, get_cosmos_client, get_database
+
+    database = get_database(get_cosmos_client(), DB_NAME)
+    container = get_container(database, CONTAINERS['jobs']['name'], CONTAINERS['jobs']['partition_key'])
+    return JobCatalogue.from_documents(container.query_items(query=CATALOGUE_QUERY, enable_cross_partition_query=True))
+
+def get_job_catalogue() -> JobCatalogue:
+    """
+    The worker's job catalogue, built on first use and rebuilt once older than JOB_CATALOGUE_TTL_SECONDS
+
+    While one thread rebuilds, the others keep using the previous catalogue. If the jobs cannot be
+    read, the previous catalogue is kept, or an empty one returned, and the next call tries again;
+    callers look up the jobs it is missing.
+    """
+    global _catalogue
+    ttl = float(os.environ.get("JOB_CATALOGUE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    catalogue = _catalogue
+    if catalogue is not None and time.monotonic() - catalogue.built_at < ttl:
+        return catalogue
+
+    if not _catalogue_lock.acquire(blocking=catalogue is None):
+        return catalogue
+    try:
+        if _catalogue is catalogue:
+            try:
+                _catalogue = load_job_catalogue()
+            except Exception as e:
+                print(f"Error building job catalogue: {e}")
+                return catalogue or JobCatalogue({})
+        return _catalogue
+    finally:
+        _catalogue_lock.release()
@@ -1,11 +1,8 @@
 import json
 import os
+import threading
 from dotenv import load_dotenv
-from azure.core.credentials import AzureKeyCredential
-from azure.search.documents import SearchClient
-
-# Cargar variables de entorno desde .env
-load_dotenv(override=True)
+from services.singleflight import AsyncSingleFlight, get_single_flight
 
 # ----------------------------
 # 1. Función para procesar el perfil de usuario
@@ -50,40 +47,74 @@ def process_user_profile(profile_json):
     
     return processed_profile, consulta
 
-# Azure Search client initialization (done once outside the function)
-admin_key = os.environ.get("AZURE_SEARCH_KEY")
-index_name = os.environ.get("AZURE_SEARCH_INDEX")
-endpoint = os.environ.get("AZURE_SEARCH_ENDPOINT")
+_search_client = None
+_search_client_lock = threading.Lock()
 
-search_client = SearchClient(
-    endpoint=endpoint, 
-    index_name=index_name, 
-    credential=AzureKeyCredential(admin_key)
-)
+# Búsquedas idénticas simultáneas (misma consulta) comparten una sola llamada a Azure Search
+_search_flight = None
+_async_search_flight = AsyncSingleFlight()
 
-def run(user_profile, save_to_file=False, output_filename="job_matches.json"):
+def get_search_flight():
+    global _search_flight
+    if _search_flight is None:
+        _search_flight = get_single_flight("job_search")
+    return _search_flight
+
+def get_search_settings():
     """
-    Procesa un perfil de usuario y encuentra trabajos coincidentes.
+    Lee la configuración de Azure Search del entorno.
     
-    Args:
-        user_profile (dict): Perfil de usuario completo en formato JSON
-        save_to_file (bool): Si es True, guarda los resultados en un archivo
-        output_filename (str): Nombre del archivo de salida si save_to_file es True
-        
     Returns:
-        dict: Resultados de los trabajos coincidentes
+        tuple: (endpoint, index_name, admin_key)
     """
-    # Procesar el perfil usando la función existente
-    perfil_usuario, consulta = process_user_profile(user_profile)
+    # Cargar variables de entorno desde .env
+    load_dotenv(override=True)
+    endpoint = os.environ.get("AZURE_SEARCH_ENDPOINT")
+    index_name = os.environ.get("AZURE_SEARCH_INDEX")
+    admin_key = os.environ.get("AZURE_SEARCH_KEY")
     
-    # Ejecutar la búsqueda semántica en Azure
-    resultados = search_client.search(
-        search_text=consulta,
-        top=5,
-        query_type="semantic",
-        semantic_configuration_name="semantic-config"
-    )
+    if not endpoint or not index_name or not admin_key:
+        raise ValueError("Azure Search connection details not found in environment variables")
+    
+    return endpoint, index_name, admin_key
+
+def get_search_client():
+    """
+    Devuelve el cliente de Azure Search, creado en el primer uso (una vez por proceso).
+    """
+    global _search_client
+    if _search_client is None:
+        with _search_client_lock:
+            if _search_client is None:
+                # Importados bajo demanda para no cargar el SDK al arrancar los workers
+                from azure.core.credentials import AzureKeyCredential
+                from azure.search.documents import SearchClient
+                
+                endpoint, index_name, admin_key = get_search_settings()
+                _search_client = SearchClient(
+                    endpoint=endpoint,
+                    index_name=index_name,
+                    credential=AzureKeyCredential(admin_key)
+                )
+    return _search_client
+
+# Parámetros de la búsqueda semántica, compartidos por run y arun
+SEARCH_OPTIONS = {
+    "top": 5,
+    "query_type": "semantic",
+    "semantic_configuration_name": "semantic-config"
+}
+
+def build_matches(resultados):
+    """
+    Convierte los resultados de Azure Search en la estructura de trabajos coincidentes.
     
+    Args:
+        resultados (iterable): Documentos devueltos por la búsqueda
+        
+    Returns:
+        dict: Total de coincidencias y la lista de trabajos ordenada por puntuación
+    """
     # Crear una lista para almacenar los resultados
     resultados_lista = []
     for resultado in resultados:
@@ -118,10 +149,31 @@ def run(user_profile, save_to_file=False, output_filename="job_matches.json"):
         detailed_matches.append(job_match)
     
     # Crear estructura JSON final con todos los matches
-    final_matches = {
+    return {
         "total_matches": len(resultados_lista),
         "matches": detailed_matches
     }
+
+def run(user_profile, save_to_file=False, output_filename="job_matches.json"):
+    """
+    Procesa un perfil de usuario y encuentra trabajos coincidentes.
+    
+    Args:
+        user_profile (dict): Perfil de usuario completo en formato JSON
+        save_to_file (bool): Si es True, guarda los resultados en un archivo
+        output_filename (str): Nombre del archivo de salida si save_to_file es True
+        
+    Returns:
+        dict: Resultados de los trabajos coincidentes
+    """
+    # Procesar el perfil usando la función existente
+    perfil_usuario, consulta = process_user_profile(user_profile)
+    
+    # Ejecutar la búsqueda semántica en Azure
+    final_matches = get_search_flight().do(
+        consulta,
+        lambda: build_matches(get_search_client().search(search_text=consulta, **SEARCH_OPTIONS))
+    )
     
     # Opcionalmente guardar en archivo
     if save_to_file:
@@ -131,6 +183,40 @@ def run(user_profile, save_to_file=False, output_filename="job_matches.json"):
     
     return final_matches
 
+async def arun(user_profile, async_search_client):
+    """
+    Versión asyncio de run para el modo de servicio ASGI.
+    
+    Args:
+        user_profile (dict): Perfil de usuario completo en formato JSON
+        async_search_client: azure.search.documents.aio.SearchClient abierto por la aplicación
+        
+    Returns:
+        dict: Resultados de los trabajos coincidentes
+    """
+    perfil_usuario, consulta = process_user_profile(user_profile)
+    
+    async def buscar():
+        resultados = await async_search_client.search(search_text=consulta, **SEARCH_OPTIONS)
+        return build_matches([resultado async for resultado in resultados])
+    
+    return await _async_search_flight.do(consulta, buscar)
+
+def get_async_search_client():
+    """
+    Crea un cliente asyncio de Azure Search; debe cerrarse con `await client.close()`
+    """
+    # Importado bajo demanda para que el modo WSGI no cargue el transporte aiohttp
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents.aio import SearchClient as AsyncSearchClient
+    
+    endpoint, index_name, admin_key = get_search_settings()
+    return AsyncSearchClient(
+        endpoint=endpoint,
+        index_name=index_name,
+        credential=AzureKeyCredential(admin_key)
+    )
+
 # Ejemplo de cómo se llamaría desde una API
 if __name__ == "__main__":
     # Ejemplo de perfil de usuario
@@ -0,0 +1,113 @@
+import copy
+from typing import Any, Dict, Iterable, List, Optional
+
+# Returned when no AI service is configured
+MOCK_ANALYSIS = {
+    "recommendedTopics": [
+        "Communication skills",
+        "Interview preparation",
+        "Job search strategies"
+    ],
+    "sentimentAnalysis": {
+        "positive": [
+            "Excited about new opportunities",
+            "Confident in technical abilities",
+            "Eager to learn new skills"
+        ],
+        "negative": [
+            "Concerned about transportation",
+            "Anxious about interviews",
+            "Worried about schedule flexibility"
+        ]
+    },
+    "jobRecommendations": [
+        {
+            "id": "job-789",
+            "title": "Sales Assistant - Department Store",
+            "match": 92,
+            "reason": "Compatible with previous experience and communication skills"
+        },
+        {
+            "id": "job-456",
+            "title": "Customer Service Assistant",
+            "match": 85,
+            "reason": "Interactive environment that matches preferences"
+        },
+        {
+            "id": "job-234",
+            "title": "Retail Associate",
+            "match": 78,
+            "reason": "Good fit for skill level and interests"
+        }
+    ]
+}
+
+def empty_analysis() -> Dict[str, Any]:
+    """Analysis with no suggestions, in the shape stored on a session"""
+    return {
+        "recommendedTopics": [],
+        "sentimentAnalysis": {
+            "positive": [],
+            "negative": []
+        },
+        "jobRecommendations": []
+    }
+
+def analyze_segment(text: str, ai_service=None) -> Dict[str, Any]:
+    """
+    Analyze the text of a single observation segment
+
+    Args:
+        text: Observation text
+        ai_service: Optional service exposing analyze_session_notes(text)
+
+    Returns:
+        Analysis in the aiSuggestions shape
+    """
+    # In a real implementation, this would call an AI service
+    # Here we'll use either the provided AI service or return mock data
+    if ai_service:
+        return ai_service.analyze_session_notes(text)
+    return copy.deepcopy(MOCK_ANALYSIS)
+
+def _extend_unique(target: List[str], values: Iterable[str], seen: set) -> None:
+    for value in values:
+        key = value.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            target.append(value)
+
+def merge_analyses(analyses: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Combine per-segment analyses into session-level suggestions
+
+    Topics and sentiment notes are de-duplicated in segment order, job recommendations keep the
+    best match per job, and the summary comes from the most recent segment that has one.
+    No AI calls are made, so this is cheap to rerun whenever a segment is added.
+    """
+    merged = empty_analysis()
+    seen_topics, seen_positive, seen_negative = set(), set(), set()
+    jobs: Dict[str, Dict[str, Any]] = {}
+    summary = None
+
+    for analysis in analyses:
+        if not analysis:
+            continue
+        _extend_unique(merged["recommendedTopics"], analysis.get("recommendedTopics", []), seen_topics)
+        sentiment = analysis.get("sentimentAnalysis", {})
+        _extend_unique(merged["sentimentAnalysis"]["positive"], sentiment.get("positive", []), seen_positive)
+        _extend_unique(merged["sentimentAnalysis"]["negative"], sentiment.get("negative", []), seen_negative)
+
+        for job in analysis.get("jobRecommendations", []):
+            job_key = job.get("id") or job.get("title")
+            current = jobs.get(job_key)
+            if current is None or job.get("match", 0) > current.get("match", 0):
+                jobs[job_key] = job
+
+        if analysis.get("summary"):
+            summary = analysis["summary"]
+
+    merged["jobRecommendations"] = sorted(jobs.values(), key=lambda job: job.get("match", 0), reverse=True)
+    if summary:
+        merged["summary"] = summary
+    return merged
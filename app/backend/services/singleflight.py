@@ -0,0 +1,225 @@
+"""
+Single-flight execution: concurrent calls with the same key share one computation
+
+The first caller for a key runs the function; callers that arrive while it is running wait for
+it and receive the same result instead of repeating the work. Nothing is cached: once the
+computation finishes, the next caller starts a new one.
+
+LocalSingleFlight coalesces threads of one process, AsyncSingleFlight coalesces tasks of one
+event loop, and FileSingleFlight coalesces across gunicorn workers on the same host.
+"""
+import asyncio
+import fcntl
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class LocalSingleFlight:
+    """Coalesces concurrent calls within this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            # Exceptions are shared too, so followers do not retry a failing call in a burst
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+class AsyncSingleFlight:
+    """Coalesces concurrent coroutine calls on one event loop"""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is not None:
+            # shield: a follower that is cancelled must not cancel the leader's work
+            return await asyncio.shield(future)
+
+        future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no follower was waiting for it
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+class FileSingleFlight:
+    """
+    Coalesces concurrent calls across processes with lock files and a result file per key
+
+    The leader holds an flock on the key's lock file while it computes. Followers first take a
+    shared flock on the key's waiters file, then wait for the lock; the leader writes its result
+    to disk only if it finds that waiters file held, so uncontended calls never pickle anything.
+    Followers use the result if it was written after they arrived; if the leader failed, finished
+    just before they registered, or they waited past the timeout, they compute it themselves.
+    Results must be picklable.
+    """
+
+    # Result files, and lock files nobody holds, older than this are swept away
+    RESULT_TTL_SECONDS = 60
+    SWEEP_EVERY = 100
+
+    def __init__(self, directory: str, wait_timeout: float = 30, poll_interval: float = 0.02):
+        self.directory = Path(directory)
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._completed = 0
+
+    def _paths(self, key: Hashable):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return (
+            self.directory / f"{digest}.lock",
+            self.directory / f"{digest}.waiters",
+            self.directory / f"{digest}.result",
+        )
+
+    def _write_result(self, path: Path, result: Any) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _read_result(self, path: Path, arrived_ns: int):
+        try:
+            if path.stat().st_mtime_ns < arrived_ns:
+                return False, None
+            with open(path, "rb") as f:
+                return True, pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+    def _sweep(self) -> None:
+        cutoff = time.time() - self.RESULT_TTL_SECONDS
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+                if entry.name.endswith((".result", ".tmp")):
+                    os.unlink(entry.path)
+                elif entry.name.endswith((".lock", ".waiters")):
+                    self._unlink_idle(entry.path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _unlink_idle(path: str) -> None:
+        # A lock file is idle when nobody holds it; _acquire checks that it still leads on the
+        # file at the path, so a caller that opened it just before the unlink cannot lead twice
+        fd = os.open(path, os.O_RDWR)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            os.unlink(path)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _acquire(lock_path: Path):
+        """Open the key's lock file and try to lead; returns (fd, leader)"""
+        while True:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return fd, False
+            try:
+                if os.stat(lock_path).st_ino == os.fstat(fd).st_ino:
+                    return fd, True
+            except FileNotFoundError:
+                pass
+            # Swept between our open and flock: lead on the file now at the path instead
+            os.close(fd)
+
+    @staticmethod
+    def _has_waiters(waiters_fd: int) -> bool:
+        try:
+            fcntl.flock(waiters_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(waiters_fd, fcntl.LOCK_UN)
+        return False
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        lock_path, waiters_path, result_path = self._paths(key)
+        arrived_ns = time.time_ns()
+        waiters_fd = os.open(waiters_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            # Register as a waiter before trying the lock, so a leader finishing in between
+            # still publishes its result for us
+            fcntl.flock(waiters_fd, fcntl.LOCK_SH)
+            fd, leader = self._acquire(lock_path)
+            try:
+                if not leader:
+                    return self._follow(fd, result_path, arrived_ns, fn)
+
+                fcntl.flock(waiters_fd, fcntl.LOCK_UN)
+                try:
+                    result = fn()
+                    if self._has_waiters(waiters_fd):
+                        self._write_result(result_path, result)
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+        finally:
+            os.close(waiters_fd)
+
+        self._completed += 1
+        if self._completed % self.SWEEP_EVERY == 0:
+            self._sweep()
+        return result
+
+    def _follow(self, fd: int, result_path: Path, arrived_ns: int, fn: Callable[[], Any]) -> Any:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            found, result = self._read_result(result_path, arrived_ns)
+            if found:
+                return result
+            break
+        return fn()
+
+def get_single_flight(namespace: str):
+    """Single-flight for the backend named by SINGLEFLIGHT_BACKEND: local (default) or file"""
+    if os.environ.get("SINGLEFLIGHT_BACKEND", "local") == "file":
+        directory = os.path.join(os.environ.get("SINGLEFLIGHT_DIR", "/tmp/singleflight"), namespace)
+        return FileSingleFlight(directory, float(os.environ.get("SINGLEFLIGHT_WAIT_SECONDS", 30)))
+    return LocalSingleFlight()
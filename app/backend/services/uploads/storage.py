@@ -0,0 +1,307 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+# Request bodies are copied to disk in blocks of this size, never read whole into memory
+COPY_BLOCK_SIZE = 1024 * 1024
+
+DEFAULT_SPOOL_DIR = ".uploads/spool"
+DEFAULT_LOCAL_BLOB_DIR = ".uploads/blobs"
+DEFAULT_MAX_UPLOAD_MB = 1024
+
+class UploadError(Exception):
+    """Raised for upload requests that cannot be applied; carries the HTTP status to return"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def _safe_filename(filename: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", os.path.basename(filename or ""))
+    return name.strip(".") or "audio"
+
+def file_sha256(path: Path) -> str:
+    """Hash a file in blocks without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COPY_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class BlobStore(ABC):
+    """Destination for completed uploads; returns a URL the Speech service can fetch"""
+
+    @abstractmethod
+    def store(self, upload_id: str, path: Path, filename: str, content_type: str, public_base_url: str) -> str:
+        """Take over the file at path; path is only removed once the upload is stored, so a failed call can be retried"""
+
+    def local_path(self, upload_id: str) -> Optional[Path]:
+        """Path of a stored upload when this backend serves it from local disk"""
+        return None
+
+    @abstractmethod
+    def delete(self, upload_id: str) -> None:
+        """Remove a stored upload, if there is one"""
+
+class LocalFileBlobStore(BlobStore):
+    """Keeps completed uploads on local disk and serves them through the uploads content route"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def store(self, upload_id, path, filename, content_type, public_base_url):
+        target_dir = self.directory / upload_id
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / filename
+        # A retry after the move went through only needs the URL
+        if path.exists() or not target.exists():
+            os.replace(path, target)
+        return f"{public_base_url.rstrip('/')}/api/call-center/uploads/{upload_id}/content"
+
+    def local_path(self, upload_id):
+        target_dir = self.directory / upload_id
+        if not target_dir.is_dir():
+            return None
+        return next(target_dir.iterdir(), None)
+
+    def delete(self, upload_id):
+        shutil.rmtree(self.directory / upload_id, ignore_errors=True)
+
+class AzureBlobStore(BlobStore):
+    """Uploads completed files to Azure Blob Storage and returns a read-only SAS URL"""
+
+    def __init__(self, connection_string: str, container_name: str, sas_hours: int = 24):
+        # Imported lazily so the local backend works without the storage SDK installed
+        from azure.storage.blob import BlobServiceClient
+        self.service = BlobServiceClient.from_connection_string(connection_string)
+        self.container = self.service.get_container_client(container_name)
+        self.sas_hours = sas_hours
+
+    def _blob_name(self, upload_id: str, filename: str) -> str:
+        return f"{upload_id}/{filename}"
+
+    def store(self, upload_id, path, filename, content_type, public_base_url):
+        from datetime import timedelta
+        from azure.storage.blob import BlobSasPermissions, ContentSettings, generate_blob_sas
+
+        blob = self.container.get_blob_client(self._blob_name(upload_id, filename))
+        with open(path, "rb") as f:
+            # The SDK streams the file in blocks
+            blob.upload_blob(f, overwrite=True, content_settings=ContentSettings(content_type=content_type))
+
+        sas = generate_blob_sas(
+            account_name=self.service.account_name,
+            container_name=self.container.container_name,
+            blob_name=blob.blob_name,
+            account_key=self.service.credential.account_key,
+            permission=BlobSasPermissions(read=True),
+            expiry=datetime.utcnow() + timedelta(hours=self.sas_hours),
+        )
+        os.remove(path)
+        return f"{blob.url}?{sas}"
+
+    def delete(self, upload_id):
+        for blob in self.container.list_blobs(name_starts_with=f"{upload_id}/"):
+            self.container.delete_blob(blob.name)
+
+class UploadManager:
+    """
+    Resumable chunked uploads spooled to disk
+
+    Each upload has a metadata file and a .part file in the spool directory. Chunks must be
+    sent in order at the current offset, so a client that lost its connection asks for the
+    offset and continues from there. Once the last byte arrives the file is checked against the
+    declared SHA-256 and handed to the blob store. The upload is "completing" until the blob
+    store has it; if storing fails, resending the final empty chunk at offset == size retries it.
+    """
+
+    def __init__(self, spool_dir: str, blob_store: BlobStore, max_bytes: int):
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.blob_store = blob_store
+        self.max_bytes = max_bytes
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.spool_dir / f"{upload_id}.json"
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.spool_dir / f"{upload_id}.part"
+
+    def _save(self, upload: Dict[str, Any]) -> None:
+        tmp_path = self._meta_path(upload["id"]).with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(upload, f)
+        os.replace(tmp_path, self._meta_path(upload["id"]))
+
+    @contextmanager
+    def _locked(self, upload_id: str) -> Iterator[None]:
+        # An exclusive lock on the part file serialises writers across gunicorn workers
+        with open(self._part_path(upload_id), "ab") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def create(self, filename: str, size: int, sha256: str, content_type: str = "application/octet-stream") -> Dict[str, Any]:
+        """Register a new upload and return its metadata"""
+        if size <= 0:
+            raise UploadError("size must be a positive integer")
+        if size > self.max_bytes:
+            raise UploadError(f"size exceeds the maximum upload size of {self.max_bytes} bytes", 413)
+        if not re.fullmatch(r"[0-9a-fA-F]{64}", sha256 or ""):
+            raise UploadError("sha256 must be a hex-encoded SHA-256 digest")
+
+        upload = {
+            "id": str(uuid.uuid4()),
+            "filename": _safe_filename(filename),
+            "contentType": content_type,
+            "size": size,
+            "sha256": sha256.lower(),
+            "offset": 0,
+            "status": "pending",
+            "url": None,
+            "createdAt": datetime.utcnow().isoformat(),
+        }
+        self._part_path(upload["id"]).touch()
+        self._save(upload)
+        return upload
+
+    def get(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Get upload metadata, or None if the upload does not exist"""
+        if not re.fullmatch(r"[0-9a-f-]{36}", upload_id):
+            return None
+        try:
+            with open(self._meta_path(upload_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write_chunk(self, upload_id: str, offset: int, stream: BinaryIO, public_base_url: str) -> Dict[str, Any]:
+        """
+        Append a chunk read from stream at offset
+
+        Args:
+            upload_id: The upload to append to
+            offset: Offset the client believes it is writing at; must match the stored offset
+            stream: File-like request body, copied to disk block by block
+            public_base_url: Base URL of this API, used by the local blob store
+
+        Returns:
+            The updated upload metadata
+        """
+        if self.get(upload_id) is None:
+            raise UploadError("Upload not found", 404)
+
+        with self._locked(upload_id):
+            upload = self.get(upload_id)
+            if upload["status"] == "completing":
+                # Every byte was received and verified; only storing it is left to retry
+                if offset != upload["size"]:
+                    raise UploadError(f"Offset mismatch: upload is at byte {upload['offset']}", 409)
+                self._store(upload, public_base_url)
+                return upload
+            if upload["status"] != "pending":
+                raise UploadError("Upload is already complete", 409)
+            if offset != upload["offset"]:
+                raise UploadError(f"Offset mismatch: upload is at byte {upload['offset']}", 409)
+
+            remaining = upload["size"] - offset
+            written = 0
+            with open(self._part_path(upload_id), "r+b") as f:
+                f.seek(offset)
+                # Drop anything past the offset left by an interrupted earlier attempt
+                f.truncate()
+                while True:
+                    block = stream.read(COPY_BLOCK_SIZE)
+                    if not block:
+                        break
+                    written += len(block)
+                    if written > remaining:
+                        f.truncate(offset)
+                        raise UploadError("Chunk extends past the declared upload size", 413)
+                    f.write(block)
+
+            upload["offset"] = offset + written
+            if upload["offset"] == upload["size"]:
+                self._complete(upload, public_base_url)
+            else:
+                self._save(upload)
+            return upload
+
+    def _complete(self, upload: Dict[str, Any], public_base_url: str) -> None:
+        part_path = self._part_path(upload["id"])
+        if file_sha256(part_path) != upload["sha256"]:
+            # Start over; the client has to resend the file
+            part_path.write_bytes(b"")
+            upload["offset"] = 0
+            self._save(upload)
+            raise UploadError("Checksum mismatch: the received file does not match sha256", 422)
+
+        # Keep an empty part file behind so the lock file stays valid for late requests; the
+        # received file stays in .done until the blob store has it
+        os.replace(part_path, part_path.with_suffix(".done"))
+        part_path.touch()
+        upload["status"] = "completing"
+        self._save(upload)
+        self._store(upload, public_base_url)
+
+    def _store(self, upload: Dict[str, Any], public_base_url: str) -> None:
+        """Hand a verified upload to the blob store and mark it completed"""
+        try:
+            upload["url"] = self.blob_store.store(
+                upload["id"], self._part_path(upload["id"]).with_suffix(".done"), upload["filename"],
+                upload["contentType"], public_base_url
+            )
+        except Exception as e:
+            raise UploadError(f"Upload received but not stored ({e}); resend the final chunk to retry", 503)
+        upload["status"] = "completed"
+        upload["completedAt"] = datetime.utcnow().isoformat()
+        self._save(upload)
+
+    def delete(self, upload_id: str) -> bool:
+        """Delete an upload and any stored data"""
+        if self.get(upload_id) is None:
+            return False
+        self.blob_store.delete(upload_id)
+        for suffix in (".part", ".done", ".json"):
+            try:
+                (self.spool_dir / f"{upload_id}{suffix}").unlink()
+            except FileNotFoundError:
+                pass
+        return True
+
+_upload_manager: Optional[UploadManager] = None
+_upload_manager_lock = threading.Lock()
+
+def get_upload_manager() -> UploadManager:
+    """Return the upload manager configured from the environment"""
+    global _upload_manager
+    with _upload_manager_lock:
+        if _upload_manager is None:
+            backend = os.environ.get("UPLOAD_BLOB_BACKEND", "local")
+            if backend == "azure":
+                blob_store = AzureBlobStore(
+                    os.environ["AZURE_STORAGE_CONNECTION_STRING"],
+                    os.environ.get("AZURE_STORAGE_UPLOAD_CONTAINER", "call-center-uploads"),
+                )
+            else:
+                blob_store = LocalFileBlobStore(os.environ.get("UPLOAD_LOCAL_BLOB_DIR", DEFAULT_LOCAL_BLOB_DIR))
+            _upload_manager = UploadManager(
+                os.environ.get("UPLOAD_SPOOL_DIR", DEFAULT_SPOOL_DIR),
+                blob_store,
+                int(os.environ.get("UPLOAD_MAX_MB", DEFAULT_MAX_UPLOAD_MB)) * 1024 * 1024,
+            )
+        return _upload_manager
@@ -0,0 +1,103 @@
+"""
+Moves job matches closed for longer than JOB_MATCH_ARCHIVE_AFTER_DAYS to job_matches_archive
+
+A match is closed once its status is accepted, rejected or not-suitable. Each one is copied to
+job_matches_archive, then marked archivedAt in job_matches, where reads skip it, with a ttl
+after which Cosmos DB deletes it. The jobMatchSummary of every participant with an archived
+match is refreshed. Routes list archived matches only when asked to includeArchived. Run it on
+a schedule; a match written to since it was read is left for the next run.
+
+The ttl only takes effect on a container with a default TTL. job_matches is created with one,
+but a container created before it was declared in db/config.py has none, and the app leaves
+existing containers alone unless COSMOS_RECONCILE_INDEXING is enabled. Deploy it once with
+    python -m tools.indexing_report --container job_matches --apply
+before the first run; until then this tool refuses to archive, since the matches would stay in
+job_matches for good.
+
+Usage (from app/backend):
+    python -m tools.archive_job_matches --dry-run
+    python -m tools.archive_job_matches --days 30 --concurrency 8
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from db.config import CONTAINERS, DB_NAME
+from db.cosmos_client import get_container, get_cosmos_client, get_database
+from db.repositories.job_match_repository import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_CANDIDATES_QUERY, ARCHIVED_HOT_TTL_SECONDS, TERMINAL_MATCH_STATUSES,
+    archive_cutoff, archive_job_match, refresh_job_match_summary
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Move long-closed job matches to job_matches_archive")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="Days a match has been closed before it is archived")
+    parser.add_argument("--hot-ttl", type=int, default=ARCHIVED_HOT_TTL_SECONDS, help="Seconds before an archived match is deleted from job_matches")
+    parser.add_argument("--concurrency", type=int, default=8, help="Matches archived at once")
+    parser.add_argument("--dry-run", action="store_true", help="Count the matches due without moving them")
+    args = parser.parse_args()
+
+    database = get_database(get_cosmos_client(), DB_NAME)
+    containers = {
+        key: get_container(database, CONTAINERS[key]['name'], CONTAINERS[key]['partition_key'])
+        for key in ('job_matches', 'job_matches_archive', 'participants')
+    }
+
+    # Without a default TTL on job_matches the per-item ttl is ignored
+    ttl_enabled = containers['job_matches'].read().get('defaultTtl') is not None
+    if not ttl_enabled and not args.dry_run:
+        sys.exit(
+            "job_matches has no default TTL, so archived matches would never leave it; run "
+            "python -m tools.indexing_report --container job_matches --apply first"
+        )
+
+    before = archive_cutoff(args.days)
+    candidates = list(containers['job_matches'].query_items(
+        query=ARCHIVE_CANDIDATES_QUERY,
+        parameters=[
+            {"name": "@statuses", "value": list(TERMINAL_MATCH_STATUSES)},
+            {"name": "@before", "value": before}
+        ],
+        enable_cross_partition_query=True
+    ))
+    results = {"closedBefore": before, "due": len(candidates), "archived": 0, "changed": 0, "failed": [], "summariesRefreshed": 0,
+               "hotTtlEnabled": ttl_enabled}
+    if args.dry_run:
+        print(json.dumps(results, indent=2))
+        return
+
+    def archive(match):
+        try:
+            return match, archive_job_match(containers['job_matches'], containers['job_matches_archive'], match, args.hot_ttl), None
+        except Exception as e:
+            return match, False, f"{match['id']}: {e}"
+
+    participants = set()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for match, archived, error in executor.map(archive, candidates):
+            if error:
+                results["failed"].append(error)
+            elif archived:
+                results["archived"] += 1
+                participants.add(match['participantId'])
+            else:
+                results["changed"] += 1
+
+        # Summaries count the matches still in job_matches
+        def refresh(participant_id):
+            try:
+                refresh_job_match_summary(containers['job_matches'], containers['participants'], participant_id)
+                return None
+            except Exception as e:
+                return f"summary {participant_id}: {e}"
+
+        for error in executor.map(refresh, sorted(participants)):
+            if error:
+                results["failed"].append(error)
+            else:
+                results["summariesRefreshed"] += 1
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Load driver for POST /api/call-center
+
+Fires concurrent analysis requests at a running backend and reports end-to-end latency
+percentiles, throughput, status codes and how busy the gunicorn workers were kept.
+Run the backend against tools/speech_stub.py to measure the pipeline without Azure.
+
+Usage (from app/backend):
+    python -m tools.bench_call_center --base-url http://localhost:5001 --requests 50 --concurrency 10 --workers 5
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import requests
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def worker_occupancy(spans: List[Tuple[float, float]], workers: int, started: float, finished: float) -> Dict[str, float]:
+    """
+    Time-weighted view of how many requests were in flight
+
+    Every in-flight request occupies one sync gunicorn worker, so in-flight requests capped at
+    the worker count, divided by the worker count, is the fraction of workers kept busy.
+    """
+    events = sorted([(start, 1) for start, _ in spans] + [(end, -1) for _, end in spans])
+    in_flight = 0
+    peak = 0
+    last = started
+    busy_area = 0.0
+    in_flight_area = 0.0
+    for moment, delta in events:
+        in_flight_area += in_flight * (moment - last)
+        busy_area += min(in_flight, workers) * (moment - last)
+        last = moment
+        in_flight += delta
+        peak = max(peak, in_flight)
+    wall = max(finished - started, 1e-9)
+    return {
+        "meanInFlight": in_flight_area / wall,
+        "peakInFlight": peak,
+        "workerOccupancy": busy_area / (wall * workers),
+    }
+
+def run_benchmark(base_url: str, total: int, concurrency: int, workers: int,
+                  audio_url: str, unique_urls: bool, use_cache: bool, timeout: float) -> Dict[str, Any]:
+    endpoint = f"{base_url.rstrip('/')}/api/call-center"
+    spans: List[Tuple[float, float]] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+    session = requests.Session()
+
+    def one(index: int) -> None:
+        payload = {
+            # Unique URLs keep every request a cache miss unless we are measuring the cache itself
+            "input_audio_url": f"{audio_url}?run={index}" if unique_urls else audio_url,
+            "use_cache": use_cache,
+        }
+        start = time.perf_counter()
+        try:
+            status = session.post(endpoint, json=payload, timeout=timeout).status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        end = time.perf_counter()
+        with lock:
+            spans.append((start, end))
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    finished = time.perf_counter()
+
+    latencies = sorted(end - start for start, end in spans)
+    wall = finished - started
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "workers": workers,
+        "wallSeconds": round(wall, 3),
+        "throughputPerSecond": round(total / wall, 3) if wall else 0,
+        "statusCodes": {str(code): count for code, count in statuses.items()},
+        "latencySeconds": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p90": round(percentile(latencies, 0.90), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0,
+        },
+        **{key: round(value, 3) for key, value in worker_occupancy(spans, workers, started, finished).items()},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark POST /api/call-center under concurrent load")
+    parser.add_argument("--base-url", default="http://localhost:5001")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=5, help="Gunicorn worker count of the backend")
+    parser.add_argument("--audio-url", default="https://example.com/audio.wav")
+    parser.add_argument("--same-url", action="store_true", help="Send the same audio URL on every request")
+    parser.add_argument("--use-cache", action="store_true", help="Let the backend serve cached analyses")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        base_url=args.base_url,
+        total=args.requests,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        audio_url=args.audio_url,
+        unique_urls=not args.same_url,
+        use_cache=args.use_cache,
+        timeout=args.timeout,
+    )
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
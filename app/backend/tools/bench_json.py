@@ -0,0 +1,107 @@
+"""
+Encode-time benchmark for the API's JSON providers
+
+Times Flask's default stdlib provider against extensions.json_provider.OrjsonProvider on the
+payloads of the list endpoints. Payloads are fetched from a running backend, or generated
+when no backend is given.
+
+Usage (from app/backend):
+    python -m tools.bench_json --base-url http://localhost:5001
+    python -m tools.bench_json --synthetic 500
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import requests
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from extensions.json_provider import OrjsonProvider
+
+LIST_ENDPOINTS = ("/api/jobs", "/api/participants", "/api/sessions", "/api/job-matches")
+
+def fetch_payloads(base_url: str) -> Dict[str, Any]:
+    payloads = {}
+    for path in LIST_ENDPOINTS:
+        response = requests.get(f"{base_url.rstrip('/')}{path}", timeout=60)
+        response.raise_for_status()
+        payloads[path] = response.json()
+    return payloads
+
+def synthetic_payloads(count: int, seed: int = 7) -> Dict[str, Any]:
+    """Documents shaped like the Cosmos items behind the list endpoints"""
+    rng = random.Random(seed)
+    words = "customer service retail warehouse inventory cashier training support schedule team".split()
+
+    def text(length: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(length))
+
+    now = datetime.utcnow()
+    jobs = [{
+        "id": f"job-{i}",
+        "title": text(3).title(),
+        "employer": text(2).title(),
+        "location": text(2).title(),
+        "employmentType": rng.choice(["Full-time", "Part-time", "Contract"]),
+        "description": text(250),
+        "requiredSkills": [text(2) for _ in range(8)],
+        "accommodations": [text(4) for _ in range(5)],
+        "salary": {"min": rng.randint(15, 20), "max": rng.randint(21, 35), "period": "hourly"},
+        "postedDate": (now - timedelta(days=rng.randint(0, 60))).isoformat(),
+        "status": "open",
+    } for i in range(count)]
+    participants = [{
+        "id": f"participant-{i}",
+        "fullName": text(2).title(),
+        "email": f"participant{i}@example.com",
+        "disabilityType": text(2),
+        "skills": {"technical": [text(2) for _ in range(6)], "soft": [text(2) for _ in range(6)]},
+        "workHistory": [{"employer": text(2), "role": text(2), "description": text(80)} for _ in range(4)],
+        "jobMatches": [{"jobId": f"job-{rng.randrange(count)}", "matchScore": rng.randint(40, 99)} for _ in range(5)],
+        "sessionCount": rng.randint(0, 20),
+    } for i in range(count)]
+    return {"/api/jobs": jobs, "/api/participants": participants}
+
+def time_encode(encode: Callable[[Any], Any], payload: Any, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode(payload)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def run_benchmark(payloads: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    app = Flask(__name__)
+    providers = {"stdlib": DefaultJSONProvider(app), "orjson": OrjsonProvider(app)}
+    report = {}
+    for path, payload in payloads.items():
+        row = {"items": len(payload) if isinstance(payload, list) else 1}
+        for name, provider in providers.items():
+            # response() is what jsonify calls, so this includes building the Response body
+            timings = time_encode(lambda obj: provider.response(obj).get_data(), payload, repeat)
+            row[name] = {
+                "bytes": len(provider.response(payload).get_data()),
+                "medianMs": round(statistics.median(timings) * 1000, 3),
+                "minMs": round(min(timings) * 1000, 3),
+            }
+        row["speedup"] = round(row["stdlib"]["medianMs"] / max(row["orjson"]["medianMs"], 1e-6), 2)
+        report[path] = row
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare stdlib and orjson encode time on the list endpoint payloads")
+    parser.add_argument("--base-url", help="Fetch real payloads from a running backend")
+    parser.add_argument("--synthetic", type=int, default=200, help="Documents per endpoint when no backend is given")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    payloads = fetch_payloads(args.base_url) if args.base_url else synthetic_payloads(args.synthetic)
+    print(json.dumps(run_benchmark(payloads, args.repeat), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Validation and encode cost per endpoint at the API boundary
+
+For each request body, times the hand-written checks the routes used before (orjson parse and
+a required-field loop) against TypeAdapter validation from the raw bytes, in lax and strict
+mode. For each response, times OrjsonProvider's jsonify against model_dump_json through
+extensions.validation.encode. Bodies and documents are generated.
+
+Usage (from app/backend):
+    python -m tools.bench_validation
+    python -m tools.bench_validation --items 500 --repeat 200
+"""
+import argparse
+import json
+import random
+import statistics
+from typing import Any, Callable, Dict, List
+
+import orjson
+from flask import Flask
+
+from db.models.job_match import JobMatch, JobMatchCreateRequest, JobMatchStatusUpdate, JobMatchUpdate
+from db.models.participant import (
+    JobMatch as ParticipantJobMatch, Participant, ParticipantCreateRequest, ParticipantPreview, ParticipantUpdate
+)
+from extensions.json_provider import OrjsonProvider
+from extensions.validation import encode, get_adapter
+from tools.bench_json import time_encode
+
+def participant_document(rng: random.Random, i: int) -> Dict[str, Any]:
+    return {
+        "id": f"participant-{i}",
+        "firstName": "Ana",
+        "lastName": f"Lopez {i}",
+        "fullName": f"Ana Lopez {i}",
+        "email": f"participant{i}@example.com",
+        "phone": "555-0100",
+        "dateOfBirth": "1990-04-12",
+        "gender": "female",
+        "primaryLanguage": "Spanish",
+        "disabilityType": "Visual impairment",
+        "accommodationsNeeded": ["Screen reader", "Large print"],
+        "transportationStatus": "public-transport",
+        "currentStatus": "job-search",
+        "employmentGoal": "Customer service",
+        "desiredHours": "part-time",
+        "skills": {"technical": ["Excel", "Typing"], "soft": ["Communication", "Teamwork"]},
+        "workHistory": [{
+            "employer": "Retail Co",
+            "position": "Cashier",
+            "startDate": "2019-01-01",
+            "endDate": "2021-06-30",
+            "responsibilities": ["Customer service", "Cash handling"],
+        }],
+        "preferredLocations": ["Coyoacan"],
+        "preferredIndustries": ["Retail"],
+        "goals": [],
+        "jobMatchSummary": {"total": 2, "byStatus": {"applied": 2}, "topMatches": [], "updatedAt": "2024-05-20T14:30:00"},
+        "createdAt": "2024-05-20T14:30:00",
+        "updatedAt": "2024-05-20T14:30:00",
+        "sessionCount": rng.randint(0, 20),
+        "_rid": "abc==",
+        "_etag": "\"0000\"",
+        "_ts": 1716215400,
+    }
+
+def job_match_document(rng: random.Random, i: int) -> Dict[str, Any]:
+    return {
+        **JobMatch.model_json_schema()["example"],
+        "id": f"match-{i}",
+        "matchScore": rng.randint(40, 99),
+        "statusSeq": 1,
+        "_rid": "abc==",
+        "_etag": "\"0000\"",
+        "_ts": 1716215400,
+    }
+
+def request_bodies() -> Dict[str, Dict[str, Any]]:
+    """Each endpoint's body model, a typical body, and the fields its route used to check by hand"""
+    example = JobMatch.model_json_schema()["example"]
+    participant = participant_document(random.Random(1), 0)
+    return {
+        "POST /api/participants": {
+            "model": ParticipantCreateRequest,
+            "body": {key: value for key, value in participant.items() if not key.startswith("_") and key != "id"},
+            "required": ["firstName", "lastName", "email", "disabilityType", "currentStatus"],
+        },
+        "PUT /api/participants/<id>": {
+            "model": ParticipantUpdate,
+            "body": {"currentStatus": "interviewing", "goals": [], "skills": participant["skills"]},
+            "required": [],
+        },
+        "POST /api/job-matches": {
+            "model": JobMatchCreateRequest,
+            "body": {key: example[key] for key in ("participantId", "jobId", "status", "source", "matchScore", "compatibilityElements")},
+            "required": ["participantId", "jobId"],
+        },
+        "PUT /api/job-matches/<id>": {
+            "model": JobMatchUpdate,
+            "body": {"coachNotes": "Follow up next week", "recommendedActions": ["Update CV"]},
+            "required": [],
+        },
+        "PUT /api/job-matches/<id>/status": {
+            "model": JobMatchStatusUpdate,
+            "body": {"status": "applied", "notes": "Sent application"},
+            "required": ["status"],
+        },
+    }
+
+def response_documents(items: int) -> Dict[str, Any]:
+    rng = random.Random(7)
+    participants = [participant_document(rng, i) for i in range(items)]
+    matches = [job_match_document(rng, i) for i in range(items)]
+    rows = [{
+        "id": match["id"],
+        "jobId": match["jobId"],
+        "title": match["jobReference"]["title"],
+        "employer": match["jobReference"]["employer"],
+        "description": match["jobReference"]["shortDescription"],
+        "matchScore": match["matchScore"],
+        "status": match["status"],
+        "updatedAt": match["updatedAt"],
+    } for match in matches]
+    return {
+        "GET /api/participants": (ParticipantPreview, participants),
+        "GET /api/participants/<id>": (Participant, participants[0]),
+        "GET /api/participants/<id>/job-matches": (ParticipantJobMatch, rows),
+        "GET /api/job-matches": (JobMatch, matches),
+        "GET /api/job-matches/<id>": (JobMatch, matches[0]),
+    }
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    return {"medianUs": round(statistics.median(timings) * 1e6, 2), "minUs": round(min(timings) * 1e6, 2)}
+
+def time_call(call: Callable[[], Any], repeat: int) -> List[float]:
+    return time_encode(lambda _: call(), None, repeat)
+
+def bench_requests(repeat: int) -> Dict[str, Any]:
+    report = {}
+    for endpoint, spec in request_bodies().items():
+        raw = orjson.dumps(spec["body"])
+        adapter = get_adapter(spec["model"])
+
+        def by_hand():
+            data = orjson.loads(raw)
+            for field in spec["required"]:
+                if field not in data:
+                    raise ValueError(field)
+            return data
+
+        row = {
+            "bytes": len(raw),
+            "handWritten": summarize(time_call(by_hand, repeat)),
+            "lax": summarize(time_call(lambda: adapter.validate_json(raw), repeat)),
+        }
+        try:
+            adapter.validate_json(raw, strict=True)
+            row["strict"] = summarize(time_call(lambda: adapter.validate_json(raw, strict=True), repeat))
+        except Exception as e:
+            # The body relies on coercion, so strict mode would reject it
+            row["strict"] = {"rejected": str(e).splitlines()[0]}
+        report[endpoint] = row
+    return report
+
+def bench_responses(items: int, repeat: int) -> Dict[str, Any]:
+    app = Flask(__name__)
+    provider = OrjsonProvider(app)
+    report = {}
+    for endpoint, (model, document) in response_documents(items).items():
+        jsonified = provider.response(document).get_data()
+        row = {
+            "items": len(document) if isinstance(document, list) else 1,
+            "orjson": {"bytes": len(jsonified), **summarize(time_call(lambda: provider.response(document).get_data(), repeat))},
+            "modelDumpJson": {"bytes": len(encode(model, document)), **summarize(time_call(lambda: encode(model, document), repeat))},
+        }
+        row["ratio"] = round(row["modelDumpJson"]["medianUs"] / max(row["orjson"]["medianUs"], 1e-6), 2)
+        report[endpoint] = row
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Time request validation and response encoding per endpoint")
+    parser.add_argument("--items", type=int, default=100, help="Documents in each list response")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "requests": bench_requests(args.repeat),
+        "responses": bench_responses(args.items, args.repeat),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
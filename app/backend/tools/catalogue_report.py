@@ -0,0 +1,146 @@
+"""
+Memory and scoring time of the job catalogue against the job documents it replaces
+
+Measures with tracemalloc the memory held by the jobs as full documents (as read from Cosmos,
+system fields included), as documents projected to the fields the compatibility rules read,
+and as services.job_matches.catalogue records. Then times generate_compatibility_elements for
+one participant against every job, given documents and given records. Jobs are read from the
+jobs container, or generated.
+
+Usage (from app/backend):
+    python -m tools.catalogue_report --synthetic 5000
+    python -m tools.catalogue_report --cosmos
+"""
+import argparse
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import orjson
+
+from routes.job_matches import generate_compatibility_elements
+from services.job_matches.catalogue import CatalogueJob, JobCatalogue
+
+# The fields CATALOGUE_QUERY projects
+CATALOGUE_FIELDS = (
+    "id", "title", "location", "employmentType", "description", "industry", "department", "hoursPerWeek",
+    "requiredSkills", "availableAccommodations", "supportiveEnvironment", "accessibilityFeatures", "schedule",
+)
+
+PARTICIPANT = {
+    "primaryLanguage": "Spanish",
+    "disabilityType": "Physical disability",
+    "accommodationsNeeded": ["Flexible schedule", "Accessible workstation"],
+    "transportationStatus": "bus",
+    "employmentGoal": "Customer service in retail",
+    "desiredHours": "20-30 hours",
+    "skills": {"technical": ["Cash handling", "Inventory"], "soft": ["Communication", "Teamwork"]},
+    "workHistory": [{"position": "Cashier", "employer": "Retail Co", "responsibilities": ["Customer service", "Cash handling"]}],
+    "preferredLocations": ["Coyoacan"],
+    "preferredIndustries": ["Retail"],
+}
+
+def fetch_jobs() -> List[Dict[str, Any]]:
+    from db.config import CONTAINERS, DB_NAME
+    from db.cosmos_client import get_container, get_cosmos_client, get_database
+
+    database = get_database(get_cosmos_client(), DB_NAME)
+    container = get_container(database, CONTAINERS['jobs']['name'], CONTAINERS['jobs']['partition_key'])
+    return list(container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True))
+
+def synthetic_jobs(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Documents shaped like the items of the jobs container"""
+    rng = random.Random(seed)
+    words = "customer service retail warehouse inventory cashier training support schedule team".split()
+    locations = ["Coyoacan", "Tlalpan", "Benito Juarez", "Iztapalapa", "Cuauhtemoc"]
+    industries = ["Retail", "Logistics", "Hospitality", "Manufacturing", "Customer Service"]
+    skills = ["Cash handling", "Inventory", "Communication", "Teamwork", "Data entry", "Excel", "Customer service"]
+    accommodations = ["Flexible schedule", "Accessible workstation", "Screen reader", "Written instructions", "Extra breaks"]
+    support = ["Mentoring program", "Clear instructions", "Inclusive team", "Step-by-step training", "Predictable routine"]
+    accessibility = ["Ramp", "Elevator", "Accessible parking", "Visual alerts", "Quiet space"]
+    schedule = ["Morning shift", "Afternoon shift", "Flexible hours", "Regular breaks"]
+
+    def text(length: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(length))
+
+    return [{
+        "id": f"job-{i}",
+        "title": text(3).title(),
+        "employer": text(2).title(),
+        "location": rng.choice(locations),
+        "address": f"{rng.randint(1, 999)} {text(2).title()}",
+        "employmentType": rng.choice(["Full-time", "Part-time", "Contract"]),
+        "description": text(250),
+        "industry": rng.choice(industries),
+        "department": text(1).title(),
+        "hoursPerWeek": {"min": rng.randint(10, 25), "max": rng.randint(26, 40)},
+        "requiredSkills": rng.sample(skills, 4),
+        "availableAccommodations": rng.sample(accommodations, 3),
+        "supportiveEnvironment": rng.sample(support, 3),
+        "accessibilityFeatures": rng.sample(accessibility, 3),
+        "schedule": rng.sample(schedule, 2),
+        "salary": {"min": rng.randint(15, 20), "max": rng.randint(21, 35), "period": "hourly"},
+        "postedDate": "2024-05-20T14:30:00",
+        "status": "active",
+        "_rid": "abc==",
+        "_self": f"dbs/abc==/colls/def==/docs/job-{i}/",
+        "_etag": "\"0000\"",
+        "_attachments": "attachments/",
+        "_ts": 1716215400,
+    } for i in range(count)]
+
+def traced_size(build: Callable[[], Any]) -> Dict[str, Any]:
+    """Memory still held by what build returns, counting only what it allocated"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return {"bytes": size, "bytesPerJob": round(size / max(len(kept), 1), 1)}
+
+def time_scoring(jobs: List[Any], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for job in jobs:
+            generate_compatibility_elements(PARTICIPANT, job, 70)
+        timings.append(time.perf_counter() - start)
+    return {"medianMs": round(statistics.median(timings) * 1e3, 2), "minMs": round(min(timings) * 1e3, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory and scoring time of the job catalogue and job documents")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--cosmos", action="store_true", help="Read the jobs from the jobs container")
+    source.add_argument("--synthetic", type=int, default=2000, help="Generate this many jobs")
+    parser.add_argument("--repeat", type=int, default=5, help="Scoring passes over every job")
+    args = parser.parse_args()
+
+    jobs = fetch_jobs() if args.cosmos else synthetic_jobs(args.synthetic)
+    # Each form is built from the serialized jobs, so none of them shares strings with another
+    serialized = [orjson.dumps(job) for job in jobs]
+
+    memory = {
+        "documents": traced_size(lambda: [orjson.loads(raw) for raw in serialized]),
+        "projectedDocuments": traced_size(lambda: [
+            {key: value for key, value in orjson.loads(raw).items() if key in CATALOGUE_FIELDS} for raw in serialized
+        ]),
+        "catalogue": traced_size(lambda: JobCatalogue.from_documents(orjson.loads(raw) for raw in serialized)),
+    }
+    memory["catalogueToDocumentsRatio"] = round(memory["catalogue"]["bytes"] / max(memory["documents"]["bytes"], 1), 3)
+
+    documents = [orjson.loads(raw) for raw in serialized]
+    records = [CatalogueJob.from_document(document) for document in documents]
+    scoring = {"documents": time_scoring(documents, args.repeat), "catalogue": time_scoring(records, args.repeat)}
+
+    print(json.dumps({"jobs": len(jobs), "memory": memory, "scoring": scoring}, indent=2))
+
+if __name__ == "__main__":
+    main()
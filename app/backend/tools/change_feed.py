@@ -0,0 +1,41 @@
+"""
+Runs the change-feed processor that keeps job and participant references in job_matches current
+
+Run a single instance alongside the API. It resumes from its checkpoints in the leases container,
+so it can be restarted at any time. The first run starts from the beginning of each feed and
+repairs every stale match.
+
+Usage (from app/backend):
+    python -m tools.change_feed
+    python -m tools.change_feed --once
+"""
+import argparse
+import json
+import logging
+import signal
+
+from services.change_feed.processor import DEFAULT_POLL_SECONDS, get_match_reference_processor
+
+def main():
+    parser = argparse.ArgumentParser(description="Propagate job and participant edits into job match references")
+    parser.add_argument("--once", action="store_true", help="Process the pending changes and exit")
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    processor = get_match_reference_processor()
+    try:
+        if args.once:
+            print(json.dumps({"patched": processor.run_once()}, indent=2))
+            return
+
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        processor.run_forever(args.poll_seconds, should_stop=lambda: bool(stopping))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        processor.close()
+
+if __name__ == "__main__":
+    main()
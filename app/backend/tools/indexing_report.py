@@ -0,0 +1,171 @@
+"""
+RU impact of the indexing policies declared in db/config.py
+
+For each container, copies a sample of its documents into two scratch containers: one with the
+container's current indexing policy and one with the declared policy. It then reports the write
+RU per document and the RU of the repository's common queries under both. The scratch containers
+are deleted afterwards. With --apply, the declared policies are then applied to the real
+containers; this is the deploy step for policy changes, since the app only does so at start-up
+when COSMOS_RECONCILE_INDEXING is enabled.
+
+Usage (from app/backend):
+    python -m tools.indexing_report
+    python -m tools.indexing_report --container job_matches --sample 200 --apply
+"""
+import argparse
+import json
+import statistics
+import uuid
+from typing import Any, Callable, Dict, List, Tuple
+
+from azure.cosmos import PartitionKey
+
+from db.config import CONTAINERS, DB_NAME
+from db.cosmos_client import (
+    get_cosmos_client, get_database, normalize_indexing_policy, reconcile_indexing_policy
+)
+from db.diagnostics import OperationStats
+from db.repositories.job_match_repository import (
+    ARCHIVE_CANDIDATES_QUERY, ARCHIVED_PARTICIPANT_MATCHES_QUERY, NOT_ARCHIVED, PARTICIPANT_MATCHES_QUERY,
+    STATUS_HISTORY_QUERY, TERMINAL_MATCH_STATUSES, archive_cutoff
+)
+from db.repositories.job_repository import build_jobs_query, build_search_jobs_query
+from db.repositories.participant_repository import build_participants_query
+from db.repositories.session_repository import OBSERVATIONS_PAGE_QUERY, build_sessions_query
+
+Query = Tuple[str, str, List[Dict[str, Any]]]
+
+def _sessions_queries(sample: Dict[str, Any]) -> List[Query]:
+    return [
+        ("participant sessions", *build_sessions_query(participant_id=sample.get('participantId'))),
+        ("coach sessions by status", *build_sessions_query(coach_id=sample.get('coachId'), status=sample.get('status'))),
+    ]
+
+# The repository queries each container serves, parameterised from a sample document
+QUERIES: Dict[str, Callable[[Dict[str, Any]], List[Query]]] = {
+    'participants': lambda sample: [
+        ("list by status", *build_participants_query(status=sample.get('currentStatus'))),
+    ],
+    'sessions': _sessions_queries,
+    'sessions_by_participant': _sessions_queries,
+    'session_observations': lambda sample: [
+        ("observations page", OBSERVATIONS_PAGE_QUERY, [
+            {"name": "@limit", "value": 20},
+            {"name": "@sessionId", "value": sample.get('sessionId')},
+            {"name": "@after", "value": 0},
+        ]),
+    ],
+    'jobs': lambda sample: [
+        ("list by status", *build_jobs_query(status=sample.get('status'))),
+        ("search", *build_search_jobs_query(query=(sample.get('title') or "").split(" ")[0])),
+        ("latest active", "SELECT TOP 10 * FROM c WHERE c.status = 'active' ORDER BY c.postedDate DESC", []),
+    ],
+    'job_matches': lambda sample: [
+        ("participant matches", PARTICIPANT_MATCHES_QUERY, [{"name": "@participantId", "value": sample.get('participantId')}]),
+        ("matches for job", f"SELECT * FROM c WHERE c.jobId = @jobId AND {NOT_ARCHIVED}",
+         [{"name": "@jobId", "value": sample.get('jobId')}]),
+        ("archive candidates", ARCHIVE_CANDIDATES_QUERY, [
+            {"name": "@statuses", "value": list(TERMINAL_MATCH_STATUSES)},
+            {"name": "@before", "value": archive_cutoff()},
+        ]),
+    ],
+    'job_matches_archive': lambda sample: [
+        ("participant archived matches", ARCHIVED_PARTICIPANT_MATCHES_QUERY,
+         [{"name": "@participantId", "value": sample.get('participantId')}]),
+    ],
+    'job_match_history': lambda sample: [
+        ("match history", STATUS_HISTORY_QUERY, [
+            {"name": "@limit", "value": 20},
+            {"name": "@matchId", "value": sample.get('matchId')},
+            {"name": "@before", "value": sample.get('seq', 0) + 1},
+        ]),
+    ],
+}
+
+def measure(database, partition_key_path: str, policy: Dict[str, Any],
+            documents: List[Dict[str, Any]], queries: List[Query]) -> Dict[str, Any]:
+    """Write RU per document and RU per query in a scratch container with the given policy"""
+    scratch = database.create_container(
+        id=f"indexing-report-{uuid.uuid4().hex[:8]}",
+        partition_key=PartitionKey(path=partition_key_path),
+        indexing_policy=policy,
+        offer_throughput=400,
+    )
+    try:
+        write_charges = []
+        for document in documents:
+            stats = OperationStats()
+            body = {key: value for key, value in document.items() if not key.startswith('_')}
+            scratch.create_item(body=body, response_hook=stats)
+            write_charges.append(stats.charge)
+
+        query_charges = {}
+        for label, query, parameters in queries:
+            stats = OperationStats()
+            list(scratch.query_items(
+                query=query, parameters=parameters, enable_cross_partition_query=True, response_hook=stats
+            ))
+            query_charges[label] = round(stats.charge, 2)
+
+        return {
+            "writeRuPerDocument": round(statistics.mean(write_charges), 2) if write_charges else None,
+            "queryRu": query_charges,
+        }
+    finally:
+        database.delete_container(scratch)
+
+def report_container(database, key: str, sample_size: int) -> Dict[str, Any]:
+    config = CONTAINERS[key]
+    declared = config.get('indexing_policy')
+    container = database.get_container_client(config['name'])
+    current = container.read().get('indexingPolicy', {})
+    report = {
+        "container": config['name'],
+        "policyChanged": normalize_indexing_policy(current) != normalize_indexing_policy(declared),
+    }
+
+    documents = list(container.query_items(
+        query="SELECT TOP @n * FROM c",
+        parameters=[{"name": "@n", "value": sample_size}],
+        enable_cross_partition_query=True,
+    ))
+    report["sampleDocuments"] = len(documents)
+    if not documents:
+        return report
+
+    queries = QUERIES.get(key, lambda sample: [])(documents[0])
+    report["current"] = measure(database, config['partition_key'], current, documents, queries)
+    report["declared"] = measure(database, config['partition_key'], declared, documents, queries)
+    before, after = report["current"]["writeRuPerDocument"], report["declared"]["writeRuPerDocument"]
+    if before:
+        report["writeRuChangePercent"] = round(100 * (after - before) / before, 1)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare write and query RU under the current and declared indexing policies")
+    parser.add_argument("--container", action="append", choices=sorted(CONTAINERS), help="Container key (repeatable); default all")
+    parser.add_argument("--sample", type=int, default=100, help="Documents copied into each scratch container")
+    parser.add_argument("--apply", action="store_true", help="Apply the declared policies to the real containers afterwards")
+    args = parser.parse_args()
+
+    database = get_database(get_cosmos_client(), DB_NAME)
+    keys = [key for key in (args.container or CONTAINERS) if CONTAINERS[key].get('indexing_policy') is not None]
+    reports = []
+    for key in keys:
+        config = CONTAINERS[key]
+        try:
+            database.get_container_client(config['name']).read()
+        except Exception:
+            reports.append({"container": config['name'], "missing": True})
+            continue
+        report = report_container(database, key, args.sample)
+        if args.apply:
+            report["applied"] = reconcile_indexing_policy(
+                database, database.get_container_client(config['name']), config['partition_key'], config['indexing_policy'],
+                config.get('default_ttl')
+            )
+        reports.append(report)
+    print(json.dumps(reports, indent=2))
+
+if __name__ == "__main__":
+    main()
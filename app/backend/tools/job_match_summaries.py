@@ -0,0 +1,58 @@
+"""
+Rebuilds every participant's jobMatchSummary from job_matches and drops the embedded jobMatches copy
+
+Job match writes keep the summaries current; run this once after deploying them, and again
+whenever a summary may have been missed (a refresh failing after its match was saved).
+
+Usage (from app/backend):
+    python -m tools.job_match_summaries
+    python -m tools.job_match_summaries --concurrency 8
+"""
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from db.config import CONTAINERS, DB_NAME
+from db.cosmos_client import get_container, get_cosmos_client, get_database
+from db.repositories.job_match_repository import refresh_job_match_summary
+from db.repositories.participant_repository import LEGACY_MATCH_FIELD
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild participant job match summaries from job_matches")
+    parser.add_argument("--concurrency", type=int, default=8, help="Participants refreshed at once")
+    args = parser.parse_args()
+
+    database = get_database(get_cosmos_client(), DB_NAME)
+    participants = get_container(database, CONTAINERS['participants']['name'], CONTAINERS['participants']['partition_key'])
+    matches = get_container(database, CONTAINERS['job_matches']['name'], CONTAINERS['job_matches']['partition_key'])
+
+    rows = list(participants.query_items(
+        query=f"SELECT c.id, IS_DEFINED(c.{LEGACY_MATCH_FIELD}) AS embedded FROM c",
+        enable_cross_partition_query=True
+    ))
+    results = {"participants": len(rows), "refreshed": 0, "embeddedRemoved": 0, "failed": []}
+
+    def refresh(row):
+        try:
+            refresh_job_match_summary(matches, participants, row['id'])
+            if row.get('embedded'):
+                participants.patch_item(
+                    item=row['id'],
+                    partition_key=row['id'],
+                    patch_operations=[{"op": "remove", "path": f"/{LEGACY_MATCH_FIELD}"}]
+                )
+            return row, None
+        except Exception as e:
+            return row, f"{row['id']}: {e}"
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for row, error in executor.map(refresh, rows):
+            if error:
+                results["failed"].append(error)
+                continue
+            results["refreshed"] += 1
+            results["embeddedRemoved"] += bool(row.get('embedded'))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Sessions partition key migration: copies sessions into the container partitioned by /participantId
+
+Cutover, one SESSIONS_MIGRATION_PHASE at a time (see db/repositories/session_repository.py):
+    1. Deploy with SESSIONS_MIGRATION_PHASE=dual_write; every write now reaches both containers
+    2. python -m tools.migrate_sessions copy
+    3. python -m tools.migrate_sessions verify --repair, then verify until it reports no differences
+    4. Deploy with dual_read; reads move to the new container and fall back to the old one
+    5. Deploy with migrated once the old container is no longer needed
+
+copy never overwrites a session already in the new container, because a dual write there is newer
+than the copy being made. verify compares every session in both containers; --repair re-reads a
+session before writing it and never overwrites a copy the app has written since, so it is safe
+during dual_write. Sessions without a participantId cannot be copied and are reported as
+missingParticipantId until one is set in the old container.
+
+Usage (from app/backend):
+    python -m tools.migrate_sessions status
+    python -m tools.migrate_sessions copy --concurrency 8
+    python -m tools.migrate_sessions verify --repair
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List
+
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError, CosmosResourceExistsError, CosmosResourceNotFoundError
+)
+
+from db.config import CONTAINERS, DB_NAME
+from db.cosmos_client import get_container, get_cosmos_client, get_database
+from db.repositories.session_repository import get_migration_phase, without_system_properties
+
+class Progress:
+    """Prints processed/total, rate and ETA to stderr at most every few seconds"""
+
+    def __init__(self, label: str, total: int, interval: float = 5):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.start = time.monotonic()
+        self.last_report = 0.0
+
+    def advance(self, count: int) -> None:
+        self.done += count
+        now = time.monotonic()
+        if now - self.last_report >= self.interval or self.done >= self.total:
+            self.last_report = now
+            self.report(now)
+
+    def report(self, now: float) -> None:
+        elapsed = max(now - self.start, 1e-6)
+        rate = self.done / elapsed
+        percent = 100 * self.done / self.total if self.total else 100
+        eta = (self.total - self.done) / rate if rate and self.total > self.done else 0
+        print(f"{self.label}: {self.done}/{self.total} ({percent:.1f}%), {rate:.0f}/s, ETA {eta:.0f}s", file=sys.stderr)
+
+def get_containers():
+    database = get_database(get_cosmos_client(), DB_NAME)
+    source = get_container(database, CONTAINERS['sessions']['name'], CONTAINERS['sessions']['partition_key'])
+    target = get_container(
+        database,
+        CONTAINERS['sessions_by_participant']['name'],
+        CONTAINERS['sessions_by_participant']['partition_key']
+    )
+    return source, target
+
+def count(container) -> int:
+    return next(iter(container.query_items(query="SELECT VALUE COUNT(1) FROM c", enable_cross_partition_query=True)), 0)
+
+def pages(container, query: str, page_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Query results in batches of page_size, so each batch is written before the next is read"""
+    items = container.query_items(query=query, enable_cross_partition_query=True, max_item_count=page_size)
+    while True:
+        page = list(islice(items, page_size))
+        if not page:
+            return
+        yield page
+
+def copy_sessions(source, target, concurrency: int, page_size: int) -> Dict[str, Any]:
+    """Create every session of the old container in the new one, skipping those already there"""
+    results = {"copied": 0, "existing": 0, "missingParticipantId": [], "failed": []}
+
+    def copy(session):
+        if not session.get('participantId'):
+            return "missingParticipantId", session['id']
+        try:
+            target.create_item(body=without_system_properties(session))
+            return "copied", None
+        except CosmosResourceExistsError:
+            return "existing", None
+        except Exception as e:
+            return "failed", f"{session['id']}: {e}"
+
+    progress = Progress("copy", count(source))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for page in pages(source, "SELECT * FROM c", page_size):
+            for outcome, detail in executor.map(copy, page):
+                if detail is None:
+                    results[outcome] += 1
+                else:
+                    results[outcome].append(detail)
+            progress.advance(len(page))
+    return results
+
+def verify_sessions(source, target, concurrency: int, page_size: int, repair: bool) -> Dict[str, Any]:
+    """Compare both containers session by session; with repair, make the new one match the old one"""
+    results = {"checked": 0, "missing": [], "different": [], "extra": [], "missingParticipantId": [], "repaired": 0}
+    source_ids = set()
+
+    def read_copy(session):
+        try:
+            return target.read_item(item=session['id'], partition_key=session['participantId'])
+        except CosmosResourceNotFoundError:
+            return None
+
+    def check(session):
+        if not session.get('participantId'):
+            # Never copied, since the new container is partitioned by it
+            return "missingParticipantId", session['id']
+        copied = read_copy(session)
+        if copied is not None and without_system_properties(copied) == without_system_properties(session):
+            return None
+
+        # The page may be stale: a dual write since it was read updates both containers. Compare
+        # against the session as it is now, and repair only a copy nobody has written meanwhile.
+        try:
+            session = source.read_item(item=session['id'], partition_key=session['id'])
+        except CosmosResourceNotFoundError:
+            return None
+        copied = read_copy(session)
+        expected = without_system_properties(session)
+        if copied is not None and without_system_properties(copied) == expected:
+            return None
+        outcome = "missing" if copied is None else "different"
+        if repair:
+            try:
+                if copied is None:
+                    target.create_item(body=expected)
+                else:
+                    target.replace_item(
+                        item=copied['id'], body=expected, etag=copied['_etag'], match_condition=MatchConditions.IfNotModified
+                    )
+            except (CosmosResourceExistsError, CosmosAccessConditionFailedError):
+                # Written by the app since our read, so newer than this copy
+                return None
+        return outcome, session['id']
+
+    def check_extra(session):
+        # Not seen in the source pass; a dual write may have created it since, so only a session
+        # the old container no longer has is extra
+        try:
+            source.read_item(item=session['id'], partition_key=session['id'])
+            return None
+        except CosmosResourceNotFoundError:
+            pass
+        if repair:
+            target.delete_item(item=session['id'], partition_key=session['participantId'])
+        return session['id']
+
+    progress = Progress("verify", count(source))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for page in pages(source, "SELECT * FROM c", page_size):
+            source_ids.update(session['id'] for session in page)
+            for difference in executor.map(check, page):
+                if difference is not None:
+                    outcome, session_id = difference
+                    results[outcome].append(session_id)
+            results["checked"] += len(page)
+            progress.advance(len(page))
+
+        # Sessions deleted from the old container after they were copied
+        for page in pages(target, "SELECT c.id, c.participantId FROM c", page_size):
+            unseen = [session for session in page if session['id'] not in source_ids]
+            for session_id in executor.map(check_extra, unseen):
+                if session_id is not None:
+                    results["extra"].append(session_id)
+
+    if repair:
+        # Sessions without a participantId cannot be repaired; they need one set in the old container
+        results["repaired"] = len(results["missing"]) + len(results["different"]) + len(results["extra"])
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate sessions to the container partitioned by participantId")
+    parser.add_argument("command", choices=("status", "copy", "verify"))
+    parser.add_argument("--concurrency", type=int, default=8, help="Writes or reads in flight at once")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repair", action="store_true", help="verify: upsert missing or different sessions and delete extra ones")
+    args = parser.parse_args()
+
+    source, target = get_containers()
+    if args.command == "status":
+        report = {"phase": get_migration_phase(), "sessions": count(source), "sessionsByParticipant": count(target)}
+    elif args.command == "copy":
+        report = copy_sessions(source, target, args.concurrency, args.page_size)
+    else:
+        report = verify_sessions(source, target, args.concurrency, args.page_size, args.repair)
+    print(json.dumps(report, indent=2))
+
+    if args.command == "verify" and (
+        report["missingParticipantId"]
+        or not args.repair and (report["missing"] or report["different"] or report["extra"])
+    ):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Local stand-in for the Azure Speech batch transcription and Language sentiment APIs
+
+Mimics the endpoints used by services/call_center/main.py so the call-center pipeline can be
+load-tested without live Azure resources. Latency, throttling and failures are configurable.
+
+Usage (from app/backend):
+    python -m tools.speech_stub --port 5100 --latency-ms 50 --processing-seconds 5 --throttle-rps 20
+
+Then point the backend at it:
+    AZURE_AI_KEY=stub
+    AZURE_SPEECH_ENDPOINT=http://localhost:5100
+    AZURE_LANGUAGE_ENDPOINT=http://localhost:5100
+    CALL_CENTER_POLL_SECONDS=1
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from flask import Flask, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPTIONS_PATH = "/speechtotext/v3.2/transcriptions"
+ANALYZE_TEXT_PATH = "/language/:analyze-text"
+
+# The real Language API rejects requests with more than 10 documents.
+MAX_DOCUMENTS_PER_REQUEST = 10
+
+TICKS_PER_SECOND = 10_000_000
+
+SAMPLE_SENTENCES = [
+    "Thanks for calling, how can I help you today?",
+    "I have a question about my work schedule next week.",
+    "Sure, let me pull up your details.",
+    "I am worried the early shift will not work with the bus timetable.",
+    "That makes sense, we can look at the afternoon shift instead.",
+    "That would be great, thank you so much.",
+]
+
+class StubConfig:
+    def __init__(self,
+                 latency_ms: float = 0,
+                 jitter_ms: float = 0,
+                 processing_seconds: float = 5,
+                 phrases: int = 50,
+                 throttle_rps: float = 0,
+                 failure_rate: float = 0,
+                 transcription_failure_rate: float = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.processing_seconds = processing_seconds
+        self.phrases = phrases
+        self.throttle_rps = throttle_rps
+        self.failure_rate = failure_rate
+        self.transcription_failure_rate = transcription_failure_rate
+
+class TokenBucket:
+    """Requests-per-second limiter; a rate of 0 disables throttling"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> Optional[float]:
+        """Take a token, or return how many seconds to wait before retrying"""
+        if self.rate <= 0:
+            return None
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.rate
+
+def build_transcription(phrase_count: int, stereo: bool) -> Dict[str, Any]:
+    """Generate a transcription document shaped like the Speech API output"""
+    phrases = []
+    offset_ticks = 0
+    for index in range(phrase_count):
+        text = SAMPLE_SENTENCES[index % len(SAMPLE_SENTENCES)]
+        duration_ticks = (2 + len(text) // 20) * TICKS_PER_SECOND
+        phrase = {
+            "recognitionStatus": "Success",
+            "offset": f"PT{offset_ticks / TICKS_PER_SECOND:.2f}S",
+            "duration": f"PT{duration_ticks / TICKS_PER_SECOND:.2f}S",
+            "offsetInTicks": float(offset_ticks),
+            "durationInTicks": float(duration_ticks),
+            "nBest": [{
+                "confidence": 0.9,
+                "lexical": text.lower(),
+                "itn": text.lower(),
+                "maskedITN": text.lower(),
+                "display": text,
+            }],
+        }
+        if stereo:
+            phrase["channel"] = index % 2
+        else:
+            phrase["speaker"] = index % 2 + 1
+        phrases.append(phrase)
+        offset_ticks += duration_ticks
+    return {
+        "source": "stub",
+        "durationInTicks": float(offset_ticks),
+        "combinedRecognizedPhrases": [],
+        "recognizedPhrases": phrases,
+    }
+
+def score_sentiment(text: str) -> Dict[str, Any]:
+    lowered = text.lower()
+    if any(word in lowered for word in ("great", "thank", "sure")):
+        scores = {"positive": 0.85, "neutral": 0.1, "negative": 0.05}
+    elif any(word in lowered for word in ("worried", "not work", "problem")):
+        scores = {"positive": 0.05, "neutral": 0.15, "negative": 0.8}
+    else:
+        scores = {"positive": 0.1, "neutral": 0.8, "negative": 0.1}
+    return {"sentiment": max(scores, key=scores.get), "confidenceScores": scores}
+
+def create_app(config: Optional[StubConfig] = None) -> Flask:
+    config = config or StubConfig()
+    app = Flask(__name__)
+    bucket = TokenBucket(config.throttle_rps)
+    transcriptions: Dict[str, Dict[str, Any]] = {}
+    lock = threading.Lock()
+
+    @app.before_request
+    def inject_faults():
+        retry_after = bucket.take()
+        if retry_after is not None:
+            response = jsonify({"error": {"code": "TooManyRequests", "message": "Stub throttling"}})
+            response.headers["Retry-After"] = f"{retry_after:.2f}"
+            return response, 429
+
+        delay_ms = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        if config.failure_rate and random.random() < config.failure_rate:
+            return jsonify({"error": {"code": "InternalServerError", "message": "Injected failure"}}), 500
+
+    @app.route(TRANSCRIPTIONS_PATH, methods=["POST"])
+    def create_transcription():
+        body = request.get_json() or {}
+        if not body.get("contentUrls") or not body.get("locale"):
+            return jsonify({"error": {"code": "InvalidRequest", "message": "contentUrls and locale are required"}}), 400
+
+        transcription_id = str(uuid.uuid4())
+        fails = random.random() < config.transcription_failure_rate
+        with lock:
+            transcriptions[transcription_id] = {
+                "createdAt": time.monotonic(),
+                "stereo": not body.get("properties", {}).get("diarizationEnabled", False),
+                "fails": fails,
+            }
+        return jsonify({
+            "self": f"{request.host_url.rstrip('/')}{TRANSCRIPTIONS_PATH}/{transcription_id}",
+            "status": "NotStarted",
+            "locale": body["locale"],
+            "displayName": body.get("displayName", ""),
+        }), 201
+
+    def find(transcription_id):
+        with lock:
+            return transcriptions.get(transcription_id)
+
+    @app.route(f"{TRANSCRIPTIONS_PATH}/<transcription_id>", methods=["GET"])
+    def get_transcription_status(transcription_id):
+        transcription = find(transcription_id)
+        if not transcription:
+            return jsonify({"error": {"code": "NotFound"}}), 404
+
+        elapsed = time.monotonic() - transcription["createdAt"]
+        if elapsed < config.processing_seconds:
+            status = "Running"
+        elif transcription["fails"]:
+            status = "Failed"
+        else:
+            status = "Succeeded"
+        return jsonify({"self": request.base_url, "status": status})
+
+    @app.route(f"{TRANSCRIPTIONS_PATH}/<transcription_id>/files", methods=["GET"])
+    def get_transcription_files(transcription_id):
+        if not find(transcription_id):
+            return jsonify({"error": {"code": "NotFound"}}), 404
+        base = f"{request.host_url.rstrip('/')}{TRANSCRIPTIONS_PATH}/{transcription_id}"
+        return jsonify({"values": [
+            {"kind": "TranscriptionReport", "links": {"contentUrl": f"{base}/report"}},
+            {"kind": "Transcription", "links": {"contentUrl": f"{base}/content"}},
+        ]})
+
+    @app.route(f"{TRANSCRIPTIONS_PATH}/<transcription_id>/content", methods=["GET"])
+    def get_transcription_content(transcription_id):
+        transcription = find(transcription_id)
+        if not transcription:
+            return jsonify({"error": {"code": "NotFound"}}), 404
+        return jsonify(build_transcription(config.phrases, transcription["stereo"]))
+
+    @app.route(f"{TRANSCRIPTIONS_PATH}/<transcription_id>", methods=["DELETE"])
+    def delete_transcription(transcription_id):
+        with lock:
+            transcriptions.pop(transcription_id, None)
+        return "", 204
+
+    @app.route(ANALYZE_TEXT_PATH, methods=["POST"])
+    def analyze_text():
+        body = request.get_json() or {}
+        documents = body.get("analysisInput", {}).get("documents", [])
+        if body.get("kind") != "SentimentAnalysis":
+            return jsonify({"error": {"code": "InvalidRequest", "message": "Only SentimentAnalysis is supported"}}), 400
+        if len(documents) > MAX_DOCUMENTS_PER_REQUEST:
+            return jsonify({"error": {"code": "InvalidDocumentBatch", "message": "Too many documents"}}), 400
+
+        results = [{"id": str(document["id"]), "warnings": [], **score_sentiment(document.get("text", ""))}
+                   for document in documents]
+        return jsonify({
+            "kind": "SentimentAnalysisResults",
+            "results": {"documents": results, "errors": [], "modelVersion": "stub"},
+        })
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Speech and Language APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency per request")
+    parser.add_argument("--processing-seconds", type=float, default=5, help="Time until a transcription succeeds")
+    parser.add_argument("--phrases", type=int, default=50, help="Phrases per generated transcription")
+    parser.add_argument("--throttle-rps", type=float, default=0, help="Requests per second before returning 429")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Fraction of requests failing with 500")
+    parser.add_argument("--transcription-failure-rate", type=float, default=0,
+                        help="Fraction of transcriptions ending in the Failed status")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    app = create_app(StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        processing_seconds=args.processing_seconds,
+        phrases=args.phrases,
+        throttle_rps=args.throttle_rps,
+        failure_rate=args.failure_rate,
+        transcription_failure_rate=args.transcription_failure_rate,
+    ))
+    app.run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Start-up time report for the backend
+
+Imports the app in a fresh interpreter under `python -X importtime` and summarises where the
+time goes: total wall time, the slowest modules by cumulative and self time, and self time
+per top-level package. Run it with the service environment variables unset to check that the
+app still boots without them.
+
+Usage (from app/backend):
+    python -m tools.startup_report
+    python -m tools.startup_report --module asgi --top 25
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "selfMs": int(self_us) / 1000,
+                "cumulativeMs": int(cumulative_us) / 1000,
+                "depth": (len(indent) - 1) // 2,
+            })
+    return modules
+
+def startup_report(module: str, top: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    modules = parse_importtime(completed.stderr)
+
+    packages: Dict[str, float] = defaultdict(float)
+    for entry in modules:
+        packages[entry["module"].split(".")[0]] += entry["selfMs"]
+
+    def rounded(entries):
+        return [{**entry, "selfMs": round(entry["selfMs"], 1), "cumulativeMs": round(entry["cumulativeMs"], 1)} for entry in entries]
+
+    report = {
+        "module": module,
+        "imported": completed.returncode == 0,
+        "wallSeconds": round(wall, 3),
+        "importSeconds": round(sum(entry["selfMs"] for entry in modules) / 1000, 3),
+        "moduleCount": len(modules),
+        "slowestCumulative": rounded(sorted(modules, key=lambda e: e["cumulativeMs"], reverse=True)[:top]),
+        "slowestSelf": rounded(sorted(modules, key=lambda e: e["selfMs"], reverse=True)[:top]),
+        "byPackage": {
+            name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+    if completed.returncode != 0:
+        # Keep only the traceback, not the importtime lines
+        report["error"] = "\n".join(line for line in completed.stderr.splitlines() if not line.startswith("import time:"))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the backend app")
+    parser.add_argument("--module", default="run", help="Module to import: run (gunicorn) or asgi (uvicorn)")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    report = startup_report(args.module, args.top)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["imported"] else 1)
+
+if __name__ == "__main__":
+    main()
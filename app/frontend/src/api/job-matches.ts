@@ -9,6 +9,7 @@ export async function getJobMatches(filters?: {
   participantId?: string;
   jobId?: string;
   status?: string;
+  includeArchived?: boolean;
 }) {
   return callAPI<JobMatch[]>("/api/job-matches", {
     params: filters,
@@ -18,8 +19,10 @@ export async function getJobMatches(filters?: {
 /**
  * Get a specific job match by ID
  */
-export async function getJobMatch(id: string) {
-  return callAPI<JobMatch>(`/api/job-matches/${id}`);
+export async function getJobMatch(id: string, includeArchived?: boolean) {
+  return callAPI<JobMatch>(`/api/job-matches/${id}`, {
+    params: { includeArchived },
+  });
 }
 
 /**
@@ -66,6 +66,8 @@ export async function getParticipantSessions(id: string) {
 /**
  * Get job matches for a participant
  */
-export async function getParticipantJobMatches(id: string) {
-  return callAPI(`/api/participants/${id}/job-matches`);
+export async function getParticipantJobMatches(id: string, includeArchived?: boolean) {
+  return callAPI(`/api/participants/${id}/job-matches`, {
+    params: { includeArchived },
+  });
 }
@@ -1,5 +1,10 @@
 import { callAPI } from "@/utils/api";
-import { Session, SessionAnalysis, SessionPreview } from "@/types/sessions";
+import {
+  Session,
+  SessionAnalysis,
+  SessionObservationsPage,
+  SessionPreview,
+} from "@/types/sessions";
 
 /**
  * Get all sessions with optional filters
@@ -50,6 +55,18 @@ export async function deleteSession(id: string) {
   });
 }
 
+/**
+ * Get a page of a session's observations, oldest first; pass the previous page's nextAfter as after
+ */
+export async function getSessionObservations(
+  id: string,
+  page?: { limit?: number; after?: number }
+) {
+  return callAPI<SessionObservationsPage>(`/api/sessions/${id}/observations`, {
+    params: page,
+  });
+}
+
 /**
  * Add observations to a session
  */
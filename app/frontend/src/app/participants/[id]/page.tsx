@@ -626,7 +626,7 @@ export default function ParticipantDetail({
             </TableRow>
           </TableHeader>
           <TableBody>
-            {(jobMatches.length > 0 ? jobMatches : participant.jobMatches).map(
+            {jobMatches.map(
               (job, index) => (
                 <TableRow key={index}>
                   <TableCell>
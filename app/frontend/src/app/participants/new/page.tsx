@@ -396,7 +396,6 @@ export default function ParticipantRegister() {
         fullName: `${formState.firstName} ${formState.lastName}`,
         workHistory: [],
         goals: [],
-        jobMatches: [],
       };
 
       await createParticipant(participantData);
@@ -37,8 +37,16 @@ import {
   DeleteRegular,
   AddRegular,
 } from "@fluentui/react-icons";
-import { Session } from "@/types/sessions";
-import { getSession, updateSession } from "@/api/sessions";
+import { Session, SessionObservation } from "@/types/sessions";
+import {
+  addSessionObservations,
+  getSession,
+  getSessionObservations,
+  updateSession,
+} from "@/api/sessions";
+
+// Observations loaded per page in the Session Notes card
+const OBSERVATIONS_PAGE_SIZE = 20;
 
 const useStyles = makeStyles({
   container: {
@@ -183,6 +191,12 @@ const useStyles = makeStyles({
   tagInput: {
     flexGrow: 1,
   },
+  observationItem: {
+    display: "flex",
+    flexDirection: "column",
+    gap: "4px",
+    marginTop: "12px",
+  },
 });
 
 export default function SessionDetail({
@@ -203,6 +217,10 @@ export default function SessionDetail({
   const [isEditingTopics, setIsEditingTopics] = useState(false);
   const [isEditingGoals, setIsEditingGoals] = useState(false);
 
+  // Session notes are observations, paged separately from the session
+  const [observations, setObservations] = useState<SessionObservation[]>([]);
+  const [nextAfter, setNextAfter] = useState<number | null>(null);
+
   // Temporary states to hold edited values
   const [editedNotes, setEditedNotes] = useState("");
   const [editedTopics, setEditedTopics] = useState<string[]>([]);
@@ -219,11 +237,15 @@ export default function SessionDetail({
     const loadSession = async () => {
       try {
         setLoading(true);
-        const data = await getSession(sessionId);
+        const [data, page] = await Promise.all([
+          getSession(sessionId),
+          getSessionObservations(sessionId, { limit: OBSERVATIONS_PAGE_SIZE }),
+        ]);
         setSession(data);
+        setObservations(page.observations);
+        setNextAfter(page.nextAfter);
 
         // Initialize edit states with current values
-        setEditedNotes(data.notes);
         setEditedTopics([...data.topics]);
         setEditedGoals([...data.goals]);
 
@@ -264,26 +286,57 @@ export default function SessionDetail({
     }
   };
 
+  const loadMoreObservations = async () => {
+    if (nextAfter === null) return;
+
+    try {
+      const page = await getSessionObservations(sessionId, {
+        limit: OBSERVATIONS_PAGE_SIZE,
+        after: nextAfter,
+      });
+      setObservations((loaded) => [...loaded, ...page.observations]);
+      setNextAfter(page.nextAfter);
+    } catch (err) {
+      console.error("Error loading notes:", err);
+      showErrorToast("Failed to load more notes");
+    }
+  };
+
   // Save handlers
   const saveNotes = async () => {
     if (!session) return;
 
+    if (!editedNotes.trim()) {
+      setIsEditingNotes(false);
+      return;
+    }
+
     setIsSaving(true);
     try {
-      // Create a copy of the full session and update only the notes field
-      const updatedSessionData = {
-        ...session,
+      // New notes are appended as an observation; earlier ones are kept as written
+      const updatedSession = await addSessionObservations(sessionId, {
         notes: editedNotes,
-      };
-
-      const updatedSession = await updateSession(sessionId, updatedSessionData);
+      });
 
       setSession(updatedSession);
+      // Show the new observation once every earlier one is loaded; otherwise "Load more" reaches it
+      if (nextAfter === null) {
+        const lastSeq = observations.length
+          ? observations[observations.length - 1].seq
+          : 0;
+        const page = await getSessionObservations(sessionId, {
+          limit: OBSERVATIONS_PAGE_SIZE,
+          after: lastSeq,
+        });
+        setObservations((loaded) => [...loaded, ...page.observations]);
+        setNextAfter(page.nextAfter);
+      }
+      setEditedNotes("");
       setIsEditingNotes(false);
-      showSuccessToast("Notes updated successfully");
+      showSuccessToast("Notes added successfully");
     } catch (err) {
       console.error("Error saving notes:", err);
-      showErrorToast("Failed to update notes");
+      showErrorToast("Failed to add notes");
     } finally {
       setIsSaving(false);
     }
@@ -613,27 +666,50 @@ export default function SessionDetail({
               <Button
                 appearance="subtle"
                 className={styles.editButton}
-                icon={isEditingNotes ? <CheckmarkRegular /> : <EditRegular />}
+                icon={isEditingNotes ? <CheckmarkRegular /> : <AddRegular />}
                 onClick={toggleEditNotes}
                 disabled={isSaving}
               />
             </div>
 
-            {isEditingNotes ? (
+            {isEditingNotes && (
               <Textarea
                 value={editedNotes}
                 onChange={(e) => setEditedNotes(e.target.value)}
                 style={{ marginTop: "12px", width: "100%", height: "150px" }}
-                placeholder="Enter session notes..."
+                placeholder="Add session notes..."
                 disabled={isSaving}
               />
+            )}
+
+            {observations.length ? (
+              observations.map((observation) => (
+                <div key={observation.id} className={styles.observationItem}>
+                  <Text size={200} style={{ color: tokens.colorNeutralForeground3 }}>
+                    {new Date(observation.createdAt).toLocaleString("en-US")}
+                  </Text>
+                  <Text style={{ lineHeight: "1.5", whiteSpace: "pre-wrap" }}>
+                    {observation.text}
+                  </Text>
+                </div>
+              ))
             ) : (
               <div className={styles.infoItem}>
                 <Text style={{ marginTop: "12px", lineHeight: "1.5" }}>
-                  {session.notes || <i>No notes recorded for this session.</i>}
+                  <i>No notes recorded for this session.</i>
                 </Text>
               </div>
             )}
+
+            {nextAfter !== null && (
+              <Button
+                appearance="subtle"
+                style={{ marginTop: "8px" }}
+                onClick={loadMoreObservations}
+              >
+                Load more notes
+              </Button>
+            )}
           </div>
         </Card>
       </div>
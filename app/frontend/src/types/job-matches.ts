@@ -72,6 +72,9 @@ export interface JobMatch {
   recommendedActions?: string[];
   nextAppointment?: string;
   applicationDeadline?: string;
+
+  // Set once the match is moved to the archive; listed only with includeArchived
+  archivedAt?: string;
 }
 
 // New type for creating job matches
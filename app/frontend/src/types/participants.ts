@@ -201,12 +201,25 @@ export const getDisplayValue = (
 
 // Job match type
 export interface JobMatch {
+  id: string;
   jobId: string;
   title: string;
   employer: string;
   description: string;
   matchScore: number;
   status: JobMatchStatus;
+  updatedAt?: string;
+  archivedAt?: string;
+}
+
+/**
+ * Counts and best open matches, maintained from the participant's job matches
+ */
+export interface JobMatchSummary {
+  total: number;
+  byStatus: Partial<Record<JobMatchStatus, number>>;
+  topMatches: Pick<JobMatch, "id" | "jobId" | "title" | "employer" | "matchScore" | "status">[];
+  updatedAt: string;
 }
 
 /**
@@ -273,6 +286,6 @@ export interface Participant {
     status: GoalStatus;
   }[];
 
-  // Job matches
-  jobMatches: JobMatch[];
+  // Job matches live in their own container; GET /api/participants/:id/job-matches lists them
+  jobMatchSummary?: JobMatchSummary | null;
 }
@@ -39,11 +39,31 @@ export interface Session {
   status: SessionStatus;
   type: SessionType;
   location: string;
-  notes: string;
+  // Only on sessions created before observations were stored separately; see SessionObservation
+  notes?: string;
   topics: string[];
   goals: string[];
   progressNotes?: string;
   aiSuggestions: SessionAISuggestions;
+  observationCount?: number;
+  latestObservation?: Pick<SessionObservation, "seq" | "text" | "createdAt"> | null;
+}
+
+// Observations are paged separately from the session
+export interface SessionObservation {
+  id: string;
+  sessionId: string;
+  seq: number;
+  text: string;
+  createdAt: string;
+  analyzed: boolean;
+}
+
+export interface SessionObservationsPage {
+  sessionId: string;
+  total: number;
+  observations: SessionObservation[];
+  nextAfter: number | null;
 }
 
 // New SessionPreview type for table view